@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Minified, content-hashed and precompressed copies of the data files.
+
+لكل ملف JSON (new_bots.json وsearch_index.json وpdf_search_index.json) يكتب نسخة مصغّرة باسم يحمل
+بصمة محتواها، مثل ``data/new_bots.<hash>.json``، ومعها ``.gz`` و``.br``
+بأعلى مستوى ضغط، ثم ملف ``data/manifest.json`` صغيراً تقرؤه الواجهة لمعرفة
+الاسم الحالي. الأسماء الثابتة تسمح بتخزين طويل الأمد في المتصفح، ولا يُعاد
+الضغط إذا لم تتغير البصمة.
+
+ضغط brotli اختياري: يُستخدم إن كانت الحزمة ``brotli`` مثبتة، وإلا يُتخطّى.
+مع ``--no-compress`` (وضع المراقبة فقط) تُكتب النسخة المصغّرة والبيان فقط؛ أي
+تشغيل بدون هذا الخيار (``npm run build`` عبر data_worker) يكتب النسخ المضغوطة
+الناقصة لنفس البصمة، و``stale_reasons`` يعدّ غيابها سبباً لإعادة البناء.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from json_output import dumps_bytes, write_bytes_atomic
+from profiling import PROFILE, add_profile_argument
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PUBLIC_DIR = REPO_ROOT / 'public'
+ARTIFACT_DIR = PUBLIC_DIR / 'data'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_SOURCES = (PUBLIC_DIR / 'new_bots.json', PUBLIC_DIR / 'search_index.json', PUBLIC_DIR / 'pdf_search_index.json')
+HASH_LENGTH = 12
+
+
+def minify(path: Path) -> bytes:
+    data = json.loads(path.read_text(encoding='utf-8'))
+    return dumps_bytes(data, indent=None)
+
+
+def gzip_bytes(raw: bytes) -> bytes:
+    # mtime=0 حتى يكون الناتج ثابتاً لنفس المحتوى
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(raw: bytes):
+    if brotli is None:
+        return None
+    return brotli.compress(raw, quality=11, mode=brotli.MODE_TEXT)
+
+
+def _relative(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def compressed_variants(target: Path):
+    """{النوع: المسار} للنسخ المضغوطة المتوقعة بجانب target (br فقط إن كانت brotli مثبتة)."""
+    variants = OrderedDict([('gz', target.with_name(target.name + '.gz'))])
+    if brotli is not None:
+        variants['br'] = target.with_name(target.name + '.br')
+    return variants
+
+
+def build_artifact(source: Path, out_dir: Path, public_dir: Path, compress: bool = True):
+    """يكتب النسخ المجزّأة لملف واحد إن لزم، ويعيد (مدخل البيان، هل كُتب شيء)."""
+    raw = minify(source)
+    digest = hashlib.sha256(raw).hexdigest()[:HASH_LENGTH]
+    stem = source.stem
+    target = out_dir / f'{stem}.{digest}.json'
+    variants = compressed_variants(target)
+
+    wrote = False
+    if not target.exists():
+        write_bytes_atomic(target, raw)
+        wrote = True
+    for kind, path in variants.items():
+        if path.exists() or not compress:
+            continue
+        write_bytes_atomic(path, gzip_bytes(raw) if kind == 'gz' else brotli_bytes(raw))
+        wrote = True
+
+    # احذف النسخ القديمة لنفس الملف
+    current = {target.name, *(p.name for p in variants.values())}
+    for stale in out_dir.glob(f'{stem}.*.json*'):
+        if stale.name not in current:
+            stale.unlink()
+
+    entry = OrderedDict([
+        ('file', _relative(target, public_dir)),
+        ('hash', digest),
+        ('bytes', len(raw)),
+    ])
+    for kind, path in variants.items():
+        if not path.exists():
+            continue
+        entry[kind] = _relative(path, public_dir)
+        entry[f'{kind}Bytes'] = path.stat().st_size
+    return entry, wrote
+
+
+def build_artifacts(sources=DEFAULT_SOURCES, out_dir: Path = ARTIFACT_DIR, public_dir: Path = PUBLIC_DIR,
+                    compress: bool = True):
+    """يبني نسخ كل المصادر الموجودة ويكتب البيان إن تغيّر؛ يعيد البيان."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = OrderedDict()
+    for source in sources:
+        source = Path(source)
+        if not source.exists():
+            continue
+        with PROFILE.stage(f'artifacts.{source.stem}'):
+            entry, wrote = build_artifact(source, out_dir, Path(public_dir), compress=compress)
+        manifest[source.stem] = entry
+        print(f"{'Wrote' if wrote else 'Unchanged'} {entry['file']}")
+
+    manifest_path = out_dir / MANIFEST_NAME
+    raw = dumps_bytes(manifest)
+    if not manifest_path.exists() or manifest_path.read_bytes() != raw:
+        write_bytes_atomic(manifest_path, raw)
+    return manifest
+
+
+def stale_reasons(sources=DEFAULT_SOURCES, out_dir: Path = ARTIFACT_DIR, public_dir: Path = PUBLIC_DIR,
+                  compress: bool = True):
+    """أسباب كون النسخ المجزّأة أو البيان قديمة؛ قائمة فارغة إن كانت محدّثة.
+
+    مع compress=True تُعدّ النسخ المضغوطة الناقصة (أو غير المذكورة في البيان) قديمة أيضاً.
+    """
+    try:
+        manifest = json.loads((Path(out_dir) / MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return [f'missing: {MANIFEST_NAME}']
+    reasons = []
+    present = set()
+    for source in map(Path, sources):
+        if not source.exists():
+            continue
+        present.add(source.stem)
+        entry = manifest.get(source.stem)
+        digest = hashlib.sha256(minify(source)).hexdigest()[:HASH_LENGTH]
+        if not entry or entry.get('hash') != digest:
+            reasons.append(f'changed: {source.name}')
+        elif not (Path(public_dir) / entry['file']).exists():
+            reasons.append(f"missing: {entry['file']}")
+        elif compress:
+            target = Path(public_dir) / entry['file']
+            for kind, path in compressed_variants(target).items():
+                if not path.exists() or entry.get(kind) != _relative(path, Path(public_dir)):
+                    reasons.append(f'missing: {_relative(path, Path(public_dir))}')
+    reasons += [f'removed: {stem}' for stem in manifest if stem not in present]
+    return reasons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write minified, content-hashed and precompressed data artifacts")
+    parser.add_argument('sources', nargs='*', type=Path, default=list(DEFAULT_SOURCES), help="JSON files to publish")
+    parser.add_argument('--out', type=Path, default=ARTIFACT_DIR, help="Artifact directory (inside public/)")
+    parser.add_argument('--no-compress', action='store_true', help="Skip the .gz/.br variants (fast rebuilds while watching)")
+    parser.add_argument('--check', action='store_true', help="Only report whether any artifact is stale (exit 1 if so)")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start('artifacts', args.profile, args.profile_out)
+
+    if args.check:
+        reasons = stale_reasons(args.sources, args.out, PUBLIC_DIR, compress=not args.no_compress)
+        for reason in reasons:
+            print(f'Stale: {reason}')
+        print('artifacts: stale' if reasons else 'artifacts: up to date')
+        return 1 if reasons else 0
+
+    if brotli is None and not args.no_compress:
+        print("brotli not installed; skipping .br variants (pip install brotli)", file=sys.stderr)
+    build_artifacts(args.sources, args.out, PUBLIC_DIR, compress=not args.no_compress)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
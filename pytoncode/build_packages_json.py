@@ -10,15 +10,22 @@
 احفظه باسم build_packages_json.py ثم شغّله.
 """
 
-import json
+import argparse
 import os
 import re
-import difflib
-from collections import OrderedDict, defaultdict
-from docx import Document
-from docx.oxml.ns import qn
+import sys
+from collections import defaultdict
 from pathlib import Path
 
+from catalog_model import Bot, Catalog, to_payload
+from docx_stream import iter_link_cells, read_lines
+from json_output import write_json
+from line_lexer import BOT, CATEGORY, HUDUD_LEXER, PACKAGE
+from pair_scanner import iter_pairs
+from profiling import PROFILE, add_profile_argument
+from text_normalize import match_key as norm_for_match, title_key as normalize_title
+from title_index import TitleIndex
+
 # ======== إعدادات المسارات ========
 # إن كانت ملفاتك في /mnt/data كما في جلسة العمل الحالية، اترك BASE كما هو.
 BASE = Path(__file__).resolve().parent
@@ -30,142 +37,92 @@ OUTPUT_JSON = os.path.join(BASE, "output.json")
 
 
 # ======== أدوات مساعدة ========
-AR_QUOTE_CHARS = '«»“”„‟‚‛'
-EN_QUOTE_CHARS = '"\''
-PUNCT_TO_STRIP = '：:؛،,'
-
-def normalize_title(s: str) -> str:
-    """تطبيع اسم البوت/التصنيف بإزالة محارف البداية والنهاية والاقتباسات."""
-    if not s:
-        return ""
-    s = s.strip()
-    s = re.sub(r'^\s*#\s*', '', s)  # أزل بادئة #
-    s = s.strip(AR_QUOTE_CHARS + EN_QUOTE_CHARS + PUNCT_TO_STRIP)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
-
-def norm_for_match(s: str) -> str:
-    """تطبيع أخف لاستخدامه في المطابقة التقريبية."""
-    if not s: return ""
-    s = re.sub(r'[\u200f\u200e]', '', s)  # محارف اتجاهية
-    s = s.replace("ـ", "")                # كَشْدَة ممتدة
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
+# normalize_title وnorm_for_match في text_normalize (title_key وmatch_key)
+
+def build_title_index(known_titles):
+    """فهرس العناوين المعروفة (يُبنى مرة واحدة ثم يُمرَّر إلى best_match_title)."""
+    return TitleIndex(known_titles, norm_for_match)
 
 def best_match_title(text, known_titles, cutoff=0.88):
-    """يعيد أفضل عنوان معروف يظهر داخل النص أو أقربه تقريبياً."""
-    text_n = norm_for_match(text)
-    # 1) احتواء مباشر (نختار الأطول)
-    cands = [t for t in known_titles if t and norm_for_match(t) in text_n]
-    if cands:
-        return max(cands, key=len)
-    # 2) مطابقة تقريبية
-    matches = difflib.get_close_matches(text_n, [norm_for_match(t) for t in known_titles], n=1, cutoff=cutoff)
-    if matches:
-        # أعد العنوان الأصلي المطابق للمطابقة المُطبّعة
-        match_n = matches[0]
-        for t in known_titles:
-            if norm_for_match(t) == match_n:
-                return t
-    return None
+    """يعيد أفضل عنوان معروف يظهر داخل النص أو أقربه تقريبياً.
+
+    ``known_titles`` إما فهرس من build_title_index أو أي قائمة عناوين.
+    1) احتواء مباشر (نختار الأطول)  2) مطابقة تقريبية بمعيار difflib.
+    """
+    if not isinstance(known_titles, TitleIndex):
+        known_titles = build_title_index(known_titles)
+    if PROFILE.enabled:
+        title, kind = known_titles.match_kind(text, cutoff)
+        PROFILE.count(f'best_match_title.{kind}')
+        return title
+    return known_titles.match(text, cutoff)
 
 def read_docx_lines(path: str):
     """قراءة جميع الفقرات غير الفارغة كسطور نصية."""
     if not os.path.exists(path):
         return []
-    doc = Document(path)
-    lines = []
-    for p in doc.paragraphs:
-        t = p.text.strip()
-        if t:
-            lines.append(t)
-    return lines
-
-def is_package_line(line: str):
-    # مثال: "باقة ...."
-    return bool(re.match(r'^\s*باقة\s+', line))
-
-def is_category_line(line: str):
-    # يدعم: "تصنيف ..." أو "نماذج ..."
-    return bool(re.match(r'^\s*(تصنيف|نماذج)\s+', line))
-
-def is_bot_header_line(line: str):
-    # سطر يبدأ بـ #عنوان_البوت
-    return bool(re.match(r'^\s*#', line))
-
+    return read_lines(path)
 
 # ======== تحليل حدود.docx → (حِزم ← تصنيفات ← بوتات + نص الحدود) ========
 def parse_hudud(lines):
     """
-    يُعيد:
-    OrderedDict {
-        package_name: {'categories': OrderedDict {
-            category_name: {'bots': OrderedDict {
-                bot_title: {'hudud': '...'}
-            }}
-        }}
-    }
+    يُعيد Catalog (باقة ← تصنيف ← بوت) ونص الحدود في ``bot.limits``.
+    العنوان المكرر داخل نفس التصنيف يبقى في موضعه الأول ويأخذ آخر نص.
     """
-    packages = OrderedDict()
+    catalog = Catalog()
+    bots = {}  # (باقة، تصنيف، عنوان) → Bot أثناء التحليل فقط
     current_package = None
     current_category = None
     current_bot = None
     buffer = []
 
     def flush_bot():
-        nonlocal buffer, current_package, current_category, current_bot
+        nonlocal buffer
         if current_package and current_category and current_bot:
             text = "\n".join(buffer).strip()
-            packages.setdefault(current_package, {'categories': OrderedDict()})
-            cats = packages[current_package]['categories']
-            cats.setdefault(current_category, {'bots': OrderedDict()})
-            bots = cats[current_category]['bots']
-            bots.setdefault(current_bot, {})
-            bots[current_bot]['hudud'] = text
+            key = (current_package, current_category, current_bot)
+            bot = bots.get(key)
+            if bot is None:
+                bot = bots[key] = Bot(current_bot)
+                catalog.package(current_package).category(current_category).bots.append(bot)
+            bot.limits = text
         buffer = []
 
+    # الأسطر: "باقة ..."، "تصنيف ..."/"نماذج ..."، "#عنوان_البوت" (انظر HUDUD_LEXER)
     for line in lines:
-        if is_package_line(line):
+        kind, _ = HUDUD_LEXER(line)
+        if kind == PACKAGE:
             flush_bot()
             current_package = normalize_title(line)
             current_category = None
             current_bot = None
-        elif is_category_line(line):
+        elif kind == CATEGORY:
             flush_bot()
             current_category = normalize_title(line)
             current_bot = None
-        elif is_bot_header_line(line):
+        elif kind == BOT:
             flush_bot()
             current_bot = normalize_title(line)
         else:
             if current_bot:
                 buffer.append(line)
     flush_bot()
-    return packages
+    return catalog
 
 
 # ======== تحليل نبذة.docx → {bot_title: 'نبذة...'} ========
-def parse_nobtha(lines):
+def parse_nobtha(lines, problems=None):
     """
     يدعم شكلين:
       1) @@@عنوان_البوت
          ...النص حتى @@@ التالي
       2) "العنوان":"النص"  (بنفس السطر أو بصيغة كسطرين مع "الوصف (نبذة):")
+    الأزواج غير المكتملة تُضاف إلى ``problems`` (إن مُرِّرت) كـ (رقم السطر، وصف).
     """
     # أولاً: محاولة نمط الأزواج (مفيد لو الملف منظّم بهذه الطريقة)
-    text = "\n".join(lines)
-    pair_pattern = re.compile(
-        r'[\"“](.+?)[\"”]\s*[:：]\s*'                 # "العنوان":
-        r'(?:\r?\n\s*)?'                              # كسر سطر اختياري
-        r'(?:الوصف\s*\(?\s*نبذة\s*\)?\s*[:：]\s*)?'   # "الوصف (نبذة):" اختياري
-        r'[\"“](.+?)[\"”]',                           # "النص"
-        flags=re.MULTILINE
-    )
     result = {}
-    for m in pair_pattern.finditer(text):
-        title = normalize_title(m.group(1))
-        desc  = m.group(2).strip()
-        result[title] = desc
+    for pair in iter_pairs(lines, 'نبذة', problems):
+        result[normalize_title(pair.title)] = pair.text.strip()
 
     # ثانياً: دعم أسلوب @@@
     current_title = None
@@ -188,41 +145,52 @@ def parse_nobtha(lines):
 
 
 # ======== تحليل مثال.docx → {bot_title: 'مثال...'} ========
-def parse_mithal(lines):
+def parse_mithal(lines, problems=None):
     """
     يلتقط الصيغ:
     1) "العنوان": "النص"
     2) "العنوان":
        الوصف (مثال): "النص"
+    الأزواج غير المكتملة تُضاف إلى ``problems`` (إن مُرِّرت) كـ (رقم السطر، وصف).
     """
-    text = "\n".join(lines)
-    pair_pattern = re.compile(
-        r'[\"“](.+?)[\"”]\s*[:：]\s*'               # "العنوان":
-        r'(?:\r?\n\s*)?'                            # كسر سطر اختياري
-        r'(?:الوصف\s*\(?\s*مثال\s*\)?\s*[:：]\s*)?' # "الوصف (مثال):" اختياري
-        r'[\"“](.+?)[\"”]',                         # "النص"
-        flags=re.MULTILINE
-    )
-
     result = {}
-    for m in pair_pattern.finditer(text):
-        title = normalize_title(m.group(1))
-        desc  = m.group(2).strip()
-        result[title] = desc
+    for pair in iter_pairs(lines, 'مثال', problems):
+        result[normalize_title(pair.title)] = pair.text.strip()
     return result
 
 
 # ======== تحليل روابط النسخة الكاملة.docx (يدعم الجداول والروابط) ========
+def table_rows(records, free):
+    """يجمع سجلات iter_link_cells في صفوف (قائمة خلايا لكل صف).
+
+    فقرات الجسم ذات الروابط تُحجز في ``free`` لتُعالج بعد كل الجداول.
+    """
+    row, cells = None, []
+    for rec in records:
+        if not rec.in_table:
+            if rec.links:
+                free.append(rec)
+            continue
+        if rec.row != row and cells:
+            yield cells
+            cells = []
+        row = rec.row
+        cells.append(rec)
+    if cells:
+        yield cells
+
 def parse_links(path, known_titles):
     """
     يقرأ الروابط من الجداول والفقرات، ويُرجع:
       { 'عنوان البوت': {'4O': url_or_empty, '5': url_or_empty}, ... }
+
+    المستند يُقرأ في مرور واحد (docx_stream.iter_link_cells): العلاقات مرة واحدة
+    في قاموس rId → URL، ثم سجل لكل خلية/فقرة بنصها وروابطها.
     """
     if not os.path.exists(path):
         return {}
-
-    doc = Document(path)
-    known_titles = list(known_titles)  # لضمان قابلية الفهرسة
+    with PROFILE.stage('parse_links.index'):
+        known_titles = build_title_index(known_titles)  # تطبيع وفهرسة مرة واحدة
 
     def clean_title_in_cell(s: str) -> str:
         if not s: return ""
@@ -246,55 +214,33 @@ def parse_links(path, known_titles):
             return '4O'
         return None
 
-    def hyperlinks_in_paragraph(p):
-        # يعيد قائمة r:id الموجودة داخل الفقرة
-        return [hl.get(qn('r:id'))
-                for hl in p._p.findall('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}hyperlink')
-                if hl.get(qn('r:id'))]
-
     result = defaultdict(lambda: {'4O': '', '5': ''})
+    free = []
 
     # --- 1) الجداول: نختار عنوان الصف ثم نربط كل روابط الصف به ---
-    for table in doc.tables:
-        for row in table.rows:
-            # اجمع نصوص الصف بالكامل لتحديد العنوان الأفضل
-            row_text = " | ".join(c.text.strip() for c in row.cells if c.text.strip())
-            row_title = best_match_title(clean_title_in_cell(row_text), known_titles)
-            # اجمع كل الروابط في الصف
-            for cell in row.cells:
-                cell_text = cell.text.strip()
-                # إن لم يوجد عنوان على مستوى الصف، جرّب على مستوى الخلية
-                cell_title = row_title or best_match_title(clean_title_in_cell(cell_text), known_titles)
-
-                rids = []
-                for p in cell.paragraphs:
-                    rids.extend(hyperlinks_in_paragraph(p))
-
-                for rId in rids:
-                    rel = doc.part.rels.get(rId)
-                    if not rel:
-                        continue
-                    url = rel.target_ref
-                    model = detect_model_from_text(cell_text) or detect_model_from_url(url)
-                    # لو لم نعرف الموديل، عيّنه مؤقتًا 4O لتعبئة خانة واحدة على الأقل
-                    if not model:
-                        model = '4O'
-                    title_key = cell_title
-                    if title_key:
-                        result[title_key][model] = url
+    for cells in PROFILE.iter_stage('parse_links.tables', table_rows(iter_link_cells(path), free)):
+        if not any(cell.links for cell in cells):
+            continue
+        # اجمع نصوص الصف بالكامل لتحديد العنوان الأفضل
+        row_text = " | ".join(c.text.strip() for c in cells if c.text.strip())
+        row_title = best_match_title(clean_title_in_cell(row_text), known_titles)
+        for cell in cells:
+            if not cell.links:
+                continue
+            cell_text = cell.text.strip()
+            # إن لم يوجد عنوان على مستوى الصف، جرّب على مستوى الخلية
+            cell_title = row_title or best_match_title(clean_title_in_cell(cell_text), known_titles)
+            for url in cell.links:
+                # لو لم نعرف الموديل، عيّنه مؤقتًا 4O لتعبئة خانة واحدة على الأقل
+                model = detect_model_from_text(cell_text) or detect_model_from_url(url) or '4O'
+                if cell_title:
+                    result[cell_title][model] = url
 
     # --- 2) الفقرات الحرة خارج الجداول (شبكة أمان) ---
-    for p in doc.paragraphs:
-        rids = hyperlinks_in_paragraph(p)
-        if not rids:
-            continue
+    for p in PROFILE.iter_stage('parse_links.paragraphs', free):
         t = p.text.strip()
         title_in_p = best_match_title(clean_title_in_cell(t), known_titles)
-        for rId in rids:
-            rel = doc.part.rels.get(rId)
-            if not rel:
-                continue
-            url = rel.target_ref
+        for url in p.links:
             model = detect_model_from_text(t) or detect_model_from_url(url) or '4O'
             if title_in_p:
                 result[title_in_p][model] = url
@@ -302,66 +248,88 @@ def parse_links(path, known_titles):
     return dict(result)
 
 
-# ======== بناء JSON النهائي ========
-def build_json_from_docs():
-    hudud_lines = read_docx_lines(HUDUD_PATH)
-    nobtha_lines = read_docx_lines(NOBTHA_PATH)
-    mithal_lines = read_docx_lines(MITHAL_PATH)
+# ======== تحميل المصادر (تسلسلياً أو بالتوازي) ========
+def load_source(kind, path):
+    """يقرأ ملف مصدر واحد ويحلّله؛ يعيد (النتيجة، المشكلات). دالة عليا لتعمل داخل عمليات فرعية."""
+    lines = read_docx_lines(path)
+    problems = []
+    with PROFILE.stage(f"parse.{kind}"):
+        if kind == "hudud":
+            return parse_hudud(lines), problems
+        if kind == "nobtha":
+            return parse_nobtha(lines, problems), problems
+        return parse_mithal(lines, problems), problems
+
+def known_titles_of(catalog):
+    """قائمة بكل عناوين البوتات المعروفة من حدود.docx بترتيبها."""
+    return [bot.title for bot in catalog.iter_bots()]
 
-    packages = parse_hudud(hudud_lines)
-    nobtha_map = parse_nobtha(nobtha_lines)
-    mithal_map = parse_mithal(mithal_lines)
+def source_paths():
+    return (("hudud", HUDUD_PATH), ("nobtha", NOBTHA_PATH), ("mithal", MITHAL_PATH))
 
-    # قائمة بكل عناوين البوتات المعروفة من حدود.docx
-    known_bot_titles = []
-    for pkg in packages.values():
-        for cat in pkg['categories'].values():
-            known_bot_titles.extend(list(cat['bots'].keys()))
+def load_sources(jobs=1):
+    """يعيد {kind: (النتيجة، المشكلات)} ومعها خريطة الروابط.
+
+    مع jobs > 1 تُقرأ الملفات الثلاثة بالتوازي في مجمّع عمليات، ويبدأ تحليل
+    ملف الروابط فور انتهاء حدود.docx (لأنه يحتاج قائمة العناوين). الدمج لاحقاً
+    يتم بترتيب ثابت، فالناتج مطابق للمسار التسلسلي.
+    """
+    if jobs <= 1:
+        parsed = {kind: load_source(kind, path) for kind, path in source_paths()}
+        with PROFILE.stage("parse_links"):
+            links_map = parse_links(LINKS_PATH, known_titles_of(parsed["hudud"][0]))
+        return parsed, links_map
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {kind: pool.submit(load_source, kind, path) for kind, path in source_paths()}
+        packages, _ = futures["hudud"].result()
+        links_future = pool.submit(parse_links, LINKS_PATH, known_titles_of(packages))
+        parsed = {kind: futures[kind].result() for kind, _ in source_paths()}
+        links_map = links_future.result()
+    return parsed, links_map
 
-    links_map = parse_links(LINKS_PATH, known_bot_titles)
+
+# ======== بناء JSON النهائي ========
+def build_json_from_docs(jobs=1):
+    parsed, links_map = load_sources(jobs)
+    packages = parsed["hudud"][0]
+    nobtha_map, nobtha_problems = parsed["nobtha"]
+    mithal_map, mithal_problems = parsed["mithal"]
+    for name, problems in (("نبذة.docx", nobtha_problems), ("مثال.docx", mithal_problems)):
+        for line_no, message in problems:
+            print(f"⚠️ {name}:{line_no}: {message}", file=sys.stderr)
 
     # تحويل التركيب إلى الشكل النهائي
-    out = {"packages": []}
-    package_id_counter = 1
-
-    for package_name, pkg_obj in packages.items():
-        package_entry = {
-            "package": package_name,
-            "packageId": package_id_counter,
-            "categories": []
+    def bot_entry(bot):
+        links = links_map.get(bot.title, {})
+        return {
+            "botTitle": bot.title,
+            "النموذج": {
+                "4O": links.get("4O", ""),
+                "5":  links.get("5", "")
+            },
+            "نبذة": nobtha_map.get(bot.title, ""),
+            "حدود": bot.limits,
+            "مثال": mithal_map.get(bot.title, "")
         }
-        package_id_counter += 1
-
-        for category_name, cat_obj in pkg_obj['categories'].items():
-            category_entry = {
-                "category": category_name,
-                "bots": []
-            }
-            for bot_title, bot_obj in cat_obj['bots'].items():
-                bot_entry = {
-                    "botTitle": bot_title,
-                    "النموذج": {
-                        "4O": links_map.get(bot_title, {}).get("4O", ""),
-                        "5":  links_map.get(bot_title, {}).get("5", "")
-                    },
-                    "نبذة": nobtha_map.get(bot_title, ""),
-                    "حدود": bot_obj.get("hudud", ""),
-                    "مثال": mithal_map.get(bot_title, "")
-                }
-                category_entry["bots"].append(bot_entry)
-
-            package_entry["categories"].append(category_entry)
-        out["packages"].append(package_entry)
+
+    out = {"packages": to_payload(packages, bot_entry)}
 
     # حفظ JSON
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    write_json(OUTPUT_JSON, out)
 
     return out
 
 
 if __name__ == "__main__":
-    data = build_json_from_docs()
+    parser = argparse.ArgumentParser(description="بناء output.json من ملفات حدود/نبذة/مثال/روابط")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="عدد العمليات لقراءة المصادر بالتوازي (0 = عدد الأنوية، 1 = تسلسلي)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    PROFILE.start("build_packages_json", args.profile, args.profile_out)
+    data = build_json_from_docs(jobs=args.jobs or os.cpu_count() or 1)
     print(f"✅ تم إنشاء الملف: {OUTPUT_JSON}")
     # ملخص سريع
     for p in data["packages"]:
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""In-memory catalog model shared by the DOCX parsers.
+
+كل المحللات (sync_combined_doc وgenerate_new_bots_json وparse_hudud في
+build_packages_json وparse_hudud_structure في update_from_docx) تبني نفس
+الشجرة: باقة ← تصنيف ← بوت، بدلاً من قواميس متداخلة مختلفة في كل سكربت.
+
+- الأصناف بـ ``__slots__`` (بلا قاموس لكل كائن)، والحقول النصية سلاسل تُضاف
+  إليها الأسطر دفعة واحدة عند انتهاء الحقل، فلا يحمل كل بوت مخازن أسطر.
+- أسماء الباقات والتصنيفات وعناوين البوتات ومفاتيح النماذج تُمرَّر عبر
+  ``sys.intern``، فالمتكرر منها نسخة واحدة في الذاكرة وتُقارن بالهوية أولاً.
+- ``to_payload`` هي خطوة التحويل الوحيدة إلى بنية new_bots.json
+  (packages → categories → bots)؛ شكل مدخل البوت نفسه يمرّره كل سكربت.
+"""
+
+from __future__ import annotations
+
+from sys import intern
+
+# اسم الحقل في JSON → اسم الخانة في Bot
+TEXT_FIELDS = {
+    'نبذة': 'about',
+    'حدود': 'limits',
+    'مثال': 'example',
+}
+
+
+class ModelLink:
+    """رابط بوت على نموذج معيّن (4o، 5، link-1...)."""
+
+    __slots__ = ('key', 'url')
+
+    def __init__(self, key: str, url: str):
+        self.key = intern(key)
+        self.url = url
+
+    def __repr__(self) -> str:
+        return f'ModelLink({self.key!r}, {self.url!r})'
+
+
+class Bot:
+    __slots__ = ('title', 'about', 'limits', 'example', 'links', 'extra_links')
+
+    def __init__(self, title: str, limits: str = ''):
+        self.title = intern(title)
+        self.about = ''
+        self.limits = limits
+        self.example = ''
+        self.links = None  # قائمة ModelLink بترتيب أول ظهور، تُنشأ عند أول رابط
+        self.extra_links = None  # روابط حقل @روابط في generate_new_bots_json
+
+    def __repr__(self) -> str:
+        return f'Bot({self.title!r})'
+
+    def add_text(self, field: str, text: str) -> None:
+        """يلحق text بحقل نصي ('نبذة'/'حدود'/'مثال') مفصولاً بسطر جديد."""
+        slot = TEXT_FIELDS[field]
+        current = getattr(self, slot)
+        setattr(self, slot, f'{current}\n{text}' if current else text)
+
+    def text(self, field: str) -> str:
+        return getattr(self, TEXT_FIELDS[field])
+
+    def set_link(self, key: str, url: str) -> None:
+        """يضبط رابط النموذج key؛ المفتاح المكرر يحتفظ بموضعه الأول كما في القاموس."""
+        if self.links is None:
+            self.links = [ModelLink(key, url)]
+            return
+        for link in self.links:
+            if link.key == key:
+                link.url = url
+                return
+        self.links.append(ModelLink(key, url))
+
+    def link_map(self) -> dict:
+        return {link.key: link.url for link in self.links} if self.links else {}
+
+    def add_extra_link(self, url: str) -> None:
+        if self.extra_links is None:
+            self.extra_links = []
+        self.extra_links.append(url)
+
+
+class Category:
+    __slots__ = ('name', 'bots')
+
+    def __init__(self, name: str):
+        self.name = intern(name)
+        self.bots = []
+
+    def __iter__(self):
+        return iter(self.bots)
+
+    def __len__(self) -> int:
+        return len(self.bots)
+
+    def __repr__(self) -> str:
+        return f'Category({self.name!r}, {len(self.bots)} bots)'
+
+
+class Package:
+    __slots__ = ('name', 'categories')
+
+    def __init__(self, name: str):
+        self.name = intern(name)
+        self.categories = {}  # الاسم → Category بترتيب أول ظهور
+
+    def category(self, name: str) -> Category:
+        """التصنيف بالاسم، ويُنشأ عند أول ظهور."""
+        cat = self.categories.get(name)
+        if cat is None:
+            cat = self.categories[name] = Category(name)
+        return cat
+
+    def __iter__(self):
+        return iter(self.categories.values())
+
+    def __repr__(self) -> str:
+        return f'Package({self.name!r}, {len(self.categories)} categories)'
+
+
+class Catalog:
+    __slots__ = ('packages',)
+
+    def __init__(self):
+        self.packages = {}  # الاسم → Package بترتيب أول ظهور
+
+    def package(self, name: str) -> Package:
+        """الباقة بالاسم، وتُنشأ عند أول ظهور."""
+        pkg = self.packages.get(name)
+        if pkg is None:
+            pkg = self.packages[name] = Package(name)
+        return pkg
+
+    def __iter__(self):
+        return iter(self.packages.values())
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def iter_bots(self):
+        for pkg in self.packages.values():
+            for cat in pkg.categories.values():
+                yield from cat.bots
+
+    def bot_count(self) -> int:
+        return sum(len(cat.bots) for pkg in self.packages.values() for cat in pkg.categories.values())
+
+    def merge(self, other: 'Catalog') -> None:
+        """يضيف باقات other بعد الموجود (الباقات ثم التصنيفات ثم البوتات)."""
+        for pkg in other:
+            target = self.package(pkg.name)
+            for cat in pkg:
+                target.category(cat.name).bots.extend(cat.bots)
+
+
+def to_payload(catalog: Catalog, bot_entry, package_id=None, id_last: bool = False) -> list:
+    """قائمة ``packages`` بصيغة new_bots.json.
+
+    ``bot_entry(bot)`` يبني مدخل البوت، و``package_id(index, pkg)`` رقم الباقة
+    (افتراضياً ترتيبها من 1). ``id_last`` يضع packageId بعد categories كما
+    يكتبه generate_new_bots_json.
+    """
+    packages = []
+    for index, pkg in enumerate(catalog, start=1):
+        pkg_id = package_id(index, pkg) if package_id else index
+        entry = {'package': pkg.name} if id_last else {'package': pkg.name, 'packageId': pkg_id}
+        entry['categories'] = [
+            {'category': cat.name, 'bots': [bot_entry(bot) for bot in cat.bots]}
+            for cat in pkg
+        ]
+        if id_last:
+            entry['packageId'] = pkg_id
+        packages.append(entry)
+    return packages
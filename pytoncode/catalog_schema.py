@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Alias fields of the bots catalog (new_bots.json).
+
+كل بوت يحمل الحقول الأساسية (النموذج، نبذة، حدود، مثال)، وكانت المولّدات
+تنسخ كل قيمة إلى أسماء بديلة (model/models/links، about/description، ...).
+في الوضع المضغوط تُكتب القيمة مرة واحدة ويُضاف جدول الأسماء البديلة في
+أعلى الملف تحت المفتاح ``aliases``؛ و``expand_aliases`` يعيد الشكل القديم.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+ALIASES_KEY = 'aliases'
+
+# الحقل الأساسي → أسماؤه البديلة بالترتيب الذي تكتبه المولّدات
+FIELD_ALIASES = OrderedDict([
+    ('النموذج', ('model', 'models', 'links')),
+    ('نبذة', ('about', 'description')),
+    ('حدود', ('limits', 'constraints')),
+    ('مثال', ('example', 'examples')),
+])
+# مفاتيح يكتبها generate_new_bots_json بعد الأسماء البديلة، بترتيبها
+TRAILING_FIELDS = ('linksList', 'hasLink')
+
+
+def _copy(value):
+    return value.copy() if isinstance(value, dict) else value
+
+
+def add_aliases(entry, skip_empty: bool) -> None:
+    """ينسخ كل حقل أساسي إلى أسمائه البديلة داخل مدخل البوت نفسه."""
+    for field, aliases in FIELD_ALIASES.items():
+        if field not in entry:
+            continue
+        value = entry[field]
+        if skip_empty and not value:
+            continue
+        for alias in aliases:
+            entry[alias] = _copy(value)
+
+
+def alias_table(skip_empty: bool):
+    """الجدول الذي يُكتب في أعلى الملف المضغوط."""
+    return OrderedDict([
+        ('fields', OrderedDict((field, list(aliases)) for field, aliases in FIELD_ALIASES.items())),
+        ('skipEmpty', skip_empty),
+    ])
+
+
+def iter_bots(payload):
+    for pkg in payload.get('packages', []):
+        for cat in pkg.get('categories', []):
+            for bot in cat.get('bots', []):
+                yield bot
+
+
+def expand_aliases(payload):
+    """يحوّل ملفاً مضغوطاً (في مكانه) إلى الشكل الكامل بالأسماء البديلة ويعيده.
+
+    الملفات التي لا تحمل جدول ``aliases`` تُعاد كما هي. الأسماء البديلة تُدرج
+    قبل ``TRAILING_FIELDS`` كما تكتبها المولّدات، فيطابق الناتج بايتاً ببايت
+    ناتج المولّد بدون ``--compact``.
+    """
+    table = payload.pop(ALIASES_KEY, None) if isinstance(payload, dict) else None
+    if not table:
+        return payload
+    fields = table.get('fields', {})
+    skip_empty = bool(table.get('skipEmpty', False))
+    for bot in iter_bots(payload):
+        trailing = [(key, bot.pop(key)) for key in TRAILING_FIELDS if key in bot]
+        for field, aliases in fields.items():
+            if field not in bot or (skip_empty and not bot[field]):
+                continue
+            for alias in aliases:
+                bot.setdefault(alias, _copy(bot[field]))
+        bot.update(trailing)
+    return payload
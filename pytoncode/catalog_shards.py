@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-package shards of the bots catalog with a lightweight index.
+
+يكتب لكل باقة ملفاً مستقلاً بنفس مخطط new_bots.json (``{"packages": [pkg]}``)
+وملف ``index.json`` صغيراً يسرد الباقات ومعرفاتها وأسماء تصنيفاتها وعدد
+البوتات واسم ملف كل باقة، ليعرض الموقع الصفحة الأولى من الفهرس ثم يجلب
+ملف الباقة عند فتحها فقط.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+
+from catalog_schema import ALIASES_KEY
+from json_output import write_json
+from profiling import PROFILE
+
+INDEX_NAME = 'index.json'
+SHARD_PREFIX = 'pkg-'
+
+
+def shard_name(pkg, position: int) -> str:
+    pkg_id = pkg.get('packageId')
+    return f"{SHARD_PREFIX}{pkg_id if pkg_id is not None else position}.json"
+
+
+def _dump(path: Path, data) -> None:
+    write_json(path, data)
+
+
+def build_index(payload, names):
+    packages = []
+    for pkg, name in zip(payload.get('packages', []), names):
+        categories = [
+            OrderedDict([('category', cat.get('category', '')), ('bots', len(cat.get('bots', [])))])
+            for cat in pkg.get('categories', [])
+        ]
+        packages.append(OrderedDict([
+            ('package', pkg.get('package', '')),
+            ('packageId', pkg.get('packageId')),
+            ('bots', sum(cat['bots'] for cat in categories)),
+            ('categories', categories),
+            ('shard', name),
+        ]))
+    index = OrderedDict()
+    if ALIASES_KEY in payload:
+        index[ALIASES_KEY] = payload[ALIASES_KEY]
+    index['packages'] = packages
+    return index
+
+
+def write_shards(payload, out_dir: Path):
+    """يكتب ملف كل باقة وملف الفهرس داخل out_dir ويحذف ملفات الباقات القديمة؛ يعيد الفهرس."""
+    with PROFILE.stage('shards'):
+        return _write_shards(payload, out_dir)
+
+
+def _write_shards(payload, out_dir: Path):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for position, pkg in enumerate(payload.get('packages', []), start=1):
+        name = shard_name(pkg, position)
+        if name in names:
+            # packageId مكرر: نميّز الملف بموضع الباقة حتى لا يُكتب فوق غيره
+            name = f"{name[:-len('.json')]}-{position}.json"
+        shard = OrderedDict()
+        if ALIASES_KEY in payload:
+            shard[ALIASES_KEY] = payload[ALIASES_KEY]
+        shard['packages'] = [pkg]
+        _dump(out_dir / name, shard)
+        names.append(name)
+
+    for stale in out_dir.glob(f'{SHARD_PREFIX}*.json'):
+        if stale.name not in names:
+            stale.unlink()
+
+    index = build_index(payload, names)
+    _dump(out_dir / INDEX_NAME, index)
+    return index
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Streaming paragraph reader for DOCX files.
+
+يقرأ نص الفقرات (وروابطها) مباشرة من ``word/document.xml`` داخل ملف الـ zip
+عبر محلل XML تدريجي، دون بناء كائن ``Document`` الخاص بـ python-docx ودون
+قراءة أجزاء الوسائط (الصور وغيرها).
+
+The text of each paragraph follows python-docx's ``Paragraph.text``: only runs
+that are direct children of the paragraph (or of a ``w:hyperlink`` inside it)
+contribute, tabs become ``\\t`` and line breaks become ``\\n``.
+
+``iter_link_cells`` walks the same stream once more for the links document:
+table cells (as python-docx's ``row.cells`` sees them) and body paragraphs,
+each with the hyperlink targets it contains.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from profiling import PROFILE
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+_W = "{%s}" % W_NS
+W_BODY = _W + "body"
+W_P = _W + "p"
+W_R = _W + "r"
+W_T = _W + "t"
+W_TAB = _W + "tab"
+W_PTAB = _W + "ptab"
+W_BR = _W + "br"
+W_CR = _W + "cr"
+W_NO_BREAK_HYPHEN = _W + "noBreakHyphen"
+W_HYPERLINK = _W + "hyperlink"
+W_TBL = _W + "tbl"
+W_TR = _W + "tr"
+W_TC = _W + "tc"
+W_TR_PR = _W + "trPr"
+W_TC_PR = _W + "tcPr"
+W_GRID_BEFORE = _W + "gridBefore"
+W_GRID_SPAN = _W + "gridSpan"
+W_V_MERGE = _W + "vMerge"
+W_TYPE = _W + "type"
+W_VAL = _W + "val"
+R_ID = "{%s}id" % R_NS
+
+# محارف الـ run كما يعيدها python-docx
+_RUN_CHARS = {W_TAB: "\t", W_PTAB: "\t", W_CR: "\n", W_NO_BREAK_HYPHEN: "-"}
+
+
+class Paragraph(NamedTuple):
+    """فقرة واحدة من جسم المستند."""
+
+    text: str
+    links: Tuple[str, ...]
+    in_table: bool
+
+
+class LinkCell(NamedTuple):
+    """سجل واحد من ``iter_link_cells``: خلية جدول أو فقرة من جسم المستند."""
+
+    row: Optional[int]  # رقم الصف بين كل جداول المستند، None للفقرة خارج الجداول
+    text: str
+    links: Tuple[str, ...]
+    in_table: bool
+
+
+def _rels_path(part_name: str) -> str:
+    folder, name = posixpath.split(part_name)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _read_rels(zf: zipfile.ZipFile, rels_name: str) -> Dict[str, Tuple[str, str]]:
+    """rId → (type, target) من جزء علاقات واحد."""
+    try:
+        raw = zf.open(rels_name)
+    except KeyError:
+        return {}
+    rels = {}
+    with raw:
+        for _, elem in iterparse(raw, events=("end",)):
+            if elem.tag == "{%s}Relationship" % PKG_REL_NS:
+                rels[elem.get("Id")] = (elem.get("Type", ""), elem.get("Target", ""))
+    return rels
+
+
+def _main_document_part(zf: zipfile.ZipFile) -> str:
+    for rel_type, target in _read_rels(zf, "_rels/.rels").values():
+        if rel_type == OFFICE_DOCUMENT_REL:
+            return target.lstrip("/")
+    return DEFAULT_DOCUMENT_PART
+
+
+def read_hyperlink_targets(zf: zipfile.ZipFile, part_name: str = DEFAULT_DOCUMENT_PART) -> Dict[str, str]:
+    """يقرأ جزء العلاقات مرة واحدة ويعيد قاموس rId → الهدف."""
+    return {rid: target for rid, (_, target) in _read_rels(zf, _rels_path(part_name)).items()}
+
+
+def _break_text(elem) -> str:
+    # python-docx لا يعيد سطراً جديداً إلا لفاصل الالتفاف النصي
+    return "\n" if elem.get(W_TYPE, "textWrapping") == "textWrapping" else ""
+
+
+def iter_paragraphs(path, include_tables: bool = False) -> Iterator[Paragraph]:
+    """يولّد فقرات المستند بترتيبها دون تحميل نموذج الكائنات كاملاً.
+
+    افتراضياً تُعاد فقرات الجسم فقط (مثل ``Document.paragraphs``)، ومع
+    ``include_tables=True`` تُعاد أيضاً فقرات خلايا الجداول بعلامة ``in_table``.
+    """
+    with zipfile.ZipFile(Path(path)) as zf:
+        part_name = _main_document_part(zf)
+        targets = read_hyperlink_targets(zf, part_name)
+        with zf.open(part_name) as fh:
+            yield from _stream_paragraphs(fh, targets, include_tables)
+
+
+def _stream_paragraphs(fh, targets: Dict[str, str], include_tables: bool) -> Iterator[Paragraph]:
+    stack: List[str] = []
+    table_depth = 0
+    parts: List[str] = []
+    links: List[str] = []
+    # عمق فقرة الجسم/الخلية الحالية داخل المكدس (None خارج أي فقرة)
+    para_depth = None
+
+    for event, elem in iterparse(fh, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == W_P and para_depth is None and stack:
+                parent = stack[-1]
+                if parent == W_BODY or (parent == W_TC and include_tables):
+                    para_depth = len(stack)
+                    parts = []
+                    links = []
+            elif tag == W_TBL:
+                table_depth += 1
+            elif tag == W_HYPERLINK and para_depth is not None and len(stack) == para_depth + 1:
+                rid = elem.get(R_ID)
+                if rid and rid in targets:
+                    links.append(targets[rid])
+            stack.append(tag)
+            continue
+
+        stack.pop()
+        if para_depth is not None:
+            depth = len(stack)
+            if tag == W_P and depth == para_depth:
+                yield Paragraph("".join(parts), tuple(links), table_depth > 0)
+                para_depth = None
+                elem.clear()
+                continue
+            # run مباشر: p/r/x أو p/hyperlink/r/x
+            run_depth = depth - 1
+            if run_depth >= para_depth + 1 and stack[run_depth] == W_R and (
+                run_depth == para_depth + 1
+                or (run_depth == para_depth + 2 and stack[para_depth + 1] == W_HYPERLINK)
+            ):
+                if tag == W_T:
+                    parts.append(elem.text or "")
+                elif tag == W_BR:
+                    parts.append(_break_text(elem))
+                elif tag in _RUN_CHARS:
+                    parts.append(_RUN_CHARS[tag])
+        if tag == W_TBL:
+            table_depth -= 1
+            elem.clear()
+        elif tag == W_P:
+            elem.clear()
+
+
+def iter_link_cells(path) -> Iterator[LinkCell]:
+    """يولّد خلايا الجداول وفقرات الجسم مع روابطها في مرور واحد على المستند.
+
+    يطابق ما يراه python-docx في ``doc.tables`` → ``row.cells`` و``doc.paragraphs``:
+
+    - الجداول العليا فقط (المتداخلة داخل الخلايا لا تُحسب)؛ نص الخلية فقراتها
+      المباشرة مفصولة بـ ``\\n`` مثل ``cell.text``.
+    - الروابط كل ``w:hyperlink`` داخل تلك الفقرات (مثل ``.//w:hyperlink``)،
+      محلولة عبر جزء العلاقات المقروء مرة واحدة؛ المعرّف غير الموجود يُهمل.
+    - الخلية الممتدة أفقياً (``gridSpan``) تتكرر بعدد أعمدتها، وخلية
+      ``vMerge="continue"`` تعيد خلية أصل الدمج من الصف السابق، كما يفعل
+      ``row.cells``. (إن لم يوجد أصل في نفس العمود يرفع python-docx خطأ؛ هنا
+      تُعامل الخلية كخلية عادية.)
+
+    خلايا الصف الواحد متتالية ولها نفس ``row``؛ الفقرات بترتيبها في المستند.
+    """
+    with zipfile.ZipFile(Path(path)) as zf:
+        part_name = _main_document_part(zf)
+        targets = read_hyperlink_targets(zf, part_name)
+        with zf.open(part_name) as fh:
+            yield from _stream_link_cells(fh, targets)
+
+
+def _stream_link_cells(fh, targets: Dict[str, str]) -> Iterator[LinkCell]:
+    stack: List[str] = []
+    row_index = -1
+    # أعماق الجدول العلوي والصف والخلية الحالية في المكدس (None خارجها)
+    tbl_depth = tr_depth = tc_depth = para_depth = None
+    grid_before = 0
+    above: Dict[int, Tuple[LinkCell, int]] = {}  # إزاحة العمود → (الخلية، امتدادها) في الصف السابق
+    row_cells: List[Tuple[LinkCell, int, Optional[str]]] = []
+    cell_texts: List[str] = []
+    cell_links: List[str] = []
+    span = 1
+    v_merge = None
+    parts: List[str] = []
+    links: List[str] = []
+
+    for event, elem in iterparse(fh, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            depth = len(stack)
+            if tag == W_P and para_depth is None and stack and (
+                stack[-1] == W_BODY or (tc_depth is not None and depth == tc_depth + 1)
+            ):
+                para_depth = depth
+                parts = []
+                links = []
+            elif tag == W_HYPERLINK and para_depth is not None:
+                rid = elem.get(R_ID)
+                if rid and rid in targets:
+                    links.append(targets[rid])
+            elif tag == W_TBL and tbl_depth is None and stack and stack[-1] == W_BODY:
+                tbl_depth = depth
+                above = {}
+            elif tag == W_TR and tbl_depth is not None and depth == tbl_depth + 1:
+                tr_depth = depth
+                row_index += 1
+                grid_before = 0
+                row_cells = []
+            elif tag == W_TC and tr_depth is not None and depth == tr_depth + 1:
+                tc_depth = depth
+                cell_texts = []
+                cell_links = []
+                span = 1
+                v_merge = None
+            stack.append(tag)
+            continue
+
+        stack.pop()
+        depth = len(stack)
+        if para_depth is not None:
+            if tag == W_P and depth == para_depth:
+                text = "".join(parts)
+                para_depth = None
+                elem.clear()
+                if tc_depth is None:
+                    yield LinkCell(None, text, tuple(links), False)
+                else:
+                    cell_texts.append(text)
+                    cell_links.extend(links)
+                continue
+            run_depth = depth - 1
+            if run_depth >= para_depth + 1 and stack[run_depth] == W_R and (
+                run_depth == para_depth + 1
+                or (run_depth == para_depth + 2 and stack[para_depth + 1] == W_HYPERLINK)
+            ):
+                if tag == W_T:
+                    parts.append(elem.text or "")
+                elif tag == W_BR:
+                    parts.append(_break_text(elem))
+                elif tag in _RUN_CHARS:
+                    parts.append(_RUN_CHARS[tag])
+            continue
+
+        if tc_depth is not None:
+            if depth == tc_depth:
+                row_cells.append((LinkCell(row_index, "\n".join(cell_texts), tuple(cell_links), True), span, v_merge))
+                tc_depth = None
+                elem.clear()
+            elif depth == tc_depth + 2 and stack[-1] == W_TC_PR:
+                if tag == W_GRID_SPAN:
+                    span = int(elem.get(W_VAL, "1"))
+                elif tag == W_V_MERGE:
+                    v_merge = elem.get(W_VAL, "continue")
+        elif tr_depth is not None:
+            if depth == tr_depth:
+                # إزاحة كل خلية = gridBefore + امتداد ما قبلها، كـ tc.grid_offset
+                offset = grid_before
+                current = {}
+                for cell, cell_span, merge in row_cells:
+                    origin = above.get(offset) if merge == "continue" else None
+                    if origin is not None:
+                        # محتوى أصل الدمج بامتداده، برقم هذا الصف
+                        cell, repeat = origin[0]._replace(row=row_index), origin[1]
+                    else:
+                        repeat = cell_span
+                    current[offset] = (cell, repeat)
+                    for _ in range(repeat):
+                        yield cell
+                    offset += cell_span
+                above = current
+                tr_depth = None
+                elem.clear()
+            elif tag == W_GRID_BEFORE and depth == tr_depth + 2 and stack[-1] == W_TR_PR:
+                grid_before = int(elem.get(W_VAL, "0"))
+        elif tag == W_TBL and depth == tbl_depth:
+            tbl_depth = None
+            elem.clear()
+        elif tag == W_P:
+            elem.clear()
+
+
+def iter_texts(path, include_tables: bool = False) -> Iterator[str]:
+    """نص كل فقرة كما هو (بما فيها الفارغة)."""
+    paragraphs = iter_paragraphs(path, include_tables=include_tables)
+    return PROFILE.iter_stage('docx.read', (para.text for para in paragraphs))
+
+
+def read_lines(path) -> List[str]:
+    """جميع الفقرات غير الفارغة بعد التشذيب."""
+    with PROFILE.stage('docx.read_lines'):
+        return [t for t in (text.strip() for text in iter_texts(path)) if t]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""JSON serialization and atomic file writes shared by the pipeline scripts.
+
+- يستخدم ``orjson`` إن كانت مثبتة (أسرع بكثير)، وإلا مكتبة ``json`` القياسية؛
+  والناتج بايتاً ببايت واحد في الحالتين لنفس الإعدادات (``indent=2`` أو مضغوط
+  بدون فراغات، مع ``ensure_ascii=False``). عند ظهور أعداد عشرية بصيغة أُسّية،
+  وهي الحالة الوحيدة التي يختلف فيها تنسيق orjson، يُعاد التسلسل بالمكتبة القياسية.
+- NaN وInfinity ليست JSON صالحاً: المكتبة القياسية تُستدعى بـ ``allow_nan=False``،
+  وorjson (الذي يكتبها null بصمت) يُفحص ناتجه، فيرفع المساران نفس ``ValueError``.
+- الكتابة ذرّية: ملف مؤقت في نفس المجلد، ثم fsync، ثم ``os.replace`` فوق الهدف،
+  فلا يرى الموقع أو أي تشغيل متزامن ملفاً مقطوعاً.
+
+لإجبار المكتبة القياسية: ``BOTS_JSON_BACKEND=json``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from profiling import PROFILE
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if os.environ.get('BOTS_JSON_BACKEND', '').lower() == 'json':
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# orjson يكتب 1e16 حيث تكتب json القياسية 1e+16
+_EXPONENT = re.compile(rb'\de-?\d')
+_NON_FINITE = 'Out of range float values are not JSON compliant'
+
+
+def _has_non_finite(data) -> bool:
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def _stdlib_dumps(data, indent) -> bytes:
+    if indent is None:
+        text = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, allow_nan=False, indent=indent)
+    return text.encode('utf-8')
+
+
+def dumps_bytes(data, indent=2) -> bytes:
+    """يعيد JSON كبايتات UTF-8؛ indent=None للصيغة المضغوطة.
+
+    يرفع ``ValueError`` إن احتوت data على NaN أو Infinity، أياً كانت المكتبة.
+    """
+    if orjson is not None and indent in (None, 2):
+        try:
+            raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent == 2 else 0)
+        except (TypeError, orjson.JSONEncodeError):
+            raw = None
+        # orjson يكتب NaN/Infinity كـ null؛ لا حاجة للفحص إن لم يظهر null أصلاً
+        if raw is not None and b'null' in raw and _has_non_finite(data):
+            raise ValueError(_NON_FINITE)
+        if raw is not None and not _EXPONENT.search(raw):
+            return raw
+    return _stdlib_dumps(data, indent)
+
+
+def dumps(data, indent=2) -> str:
+    return dumps_bytes(data, indent).decode('utf-8')
+
+
+def write_bytes_atomic(path, raw: bytes) -> None:
+    """يكتب البايتات في ملف مؤقت بجانب الهدف ثم يستبدله به دفعة واحدة."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(raw)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if path.exists():
+            # mkstemp ينشئ الملف بصلاحيات 0600؛ احتفظ بصلاحيات الملف الأصلي
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_atomic(path, text: str) -> None:
+    write_bytes_atomic(path, text.encode('utf-8'))
+
+
+def write_json(path, data, indent=2) -> None:
+    """تسلسل data وكتابته ذرّياً إلى path."""
+    with PROFILE.stage('json.write'):
+        write_bytes_atomic(path, dumps_bytes(data, indent))
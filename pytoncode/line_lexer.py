@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Shared line lexer for the catalog DOCX parsers.
+
+كل سطر يُصنَّف مرة واحدة إلى رمز ``(kind, value)``؛ ``value`` هو بقية السطر
+بعد العلامة (``#`` أو ``@`` أو عنوان الباقة/التصنيف)، والمحلل يكمل تنظيفه
+بطريقته. أنواع الرموز:
+
+    PACKAGE, CATEGORY, BOT, FIELD_TAG, MODEL_TAG, TEXT, SEPARATOR
+
+صيغتان للملفات:
+
+- الملف المجمّع (``العنوان الرئيسي:``/``العنوان الفرعي:``/``#بوت``/``@حقل``):
+  ``lex_combined`` يختار القاعدة من جدول بحسب أول حرف في السطر، فالأسطر
+  النصية (أغلب الملف) لا تمر بأي تعبير نمطي.
+- ملفات حدود.docx: ``LineLexer`` يجمع القواعد في نمط واحد بمجموعات مسماة
+  ويطابقه مرة واحدة لكل سطر؛ ترتيب القواعد هو ترتيب الأولوية، تماماً كسلسلة
+  ``re.match`` المتتالية التي يحل محلها. ``HUDUD_LEXER`` لـ build_packages_json
+  و``OUTLINE_LEXER`` (الأكثر تساهلاً) لـ update_from_docx.
+"""
+
+from __future__ import annotations
+
+import re
+
+PACKAGE = 'PACKAGE'
+CATEGORY = 'CATEGORY'
+BOT = 'BOT'
+FIELD_TAG = 'FIELD_TAG'
+MODEL_TAG = 'MODEL_TAG'
+TEXT = 'TEXT'
+SEPARATOR = 'SEPARATOR'
+TAG_KINDS = (FIELD_TAG, MODEL_TAG)
+TEXT_KINDS = (TEXT, SEPARATOR)
+
+MAIN_TITLE = 'العنوان الرئيسي'
+SUB_TITLE = 'العنوان الفرعي'
+TAG_MODEL = 'نموذج'
+PAGE_MARK = '--- PAGE'
+RULE_LINE = '_' * 40
+
+
+class LineLexer:
+    """يصنّف السطر بنمط واحد مجمّع من قواعد ``(kind, pattern)`` مرتبة.
+
+    كل نمط يُطابَق من بداية السطر ويستهلك العلامة فقط؛ ما بعده هو ``value``.
+    السطر الذي لا يطابق أي قاعدة رمز TEXT بالسطر كاملاً.
+    """
+
+    def __init__(self, rules):
+        rules = list(rules)
+        self.kinds = {f'r{i}': kind for i, (kind, _) in enumerate(rules)}
+        self.pattern = re.compile('|'.join(f'(?P<r{i}>{pattern})' for i, (_, pattern) in enumerate(rules)))
+
+    def __call__(self, line: str):
+        m = self.pattern.match(line)
+        if m is None:
+            return TEXT, line
+        return self.kinds[m.lastgroup], line[m.end():]
+
+
+# build_packages_json.parse_hudud: "باقة ..."، "تصنيف ..."/"نماذج ..."، "#عنوان"
+HUDUD_LEXER = LineLexer([
+    (PACKAGE, r'\s*باقة\s'),
+    (CATEGORY, r'\s*(?:تصنيف|نماذج)\s'),
+    (BOT, r'\s*#'),
+])
+
+# update_from_docx.parse_hudud_structure: صيغ "العنوان الرئيسي/الفرعي:" أولاً، ثم
+# الكلمات المفتاحية بعد أي بادئة من # * @ - والمسافات، ثم "#عنوان"
+_DECORATION = r'[#*@\-\s]*'
+OUTLINE_LEXER = LineLexer([
+    (PACKAGE, r'\s*العنوان\s*الرئيسي\s*[:：]\s*(?=.+$)'),
+    (CATEGORY, r'\s*العنوان\s*الفرعي\s*[:：]\s*(?=.+$)'),
+    (PACKAGE, _DECORATION + r'(?=(?:باقة|حزمة)\b)'),
+    (CATEGORY, _DECORATION + r'(?=(?:تصنيف|فئة|مجموعة|قسم|باب)\b)'),
+    (BOT, r'\s*#+\s*'),
+])
+
+
+# ======== الملف المجمّع: جدول بحسب أول حرف ========
+def _title(line: str):
+    if line.startswith(MAIN_TITLE):
+        return PACKAGE, line[len(MAIN_TITLE):]
+    if line.startswith(SUB_TITLE):
+        return CATEGORY, line[len(SUB_TITLE):]
+    return TEXT, line
+
+
+def _bot(line: str):
+    return BOT, line[1:]
+
+
+def _tag(line: str):
+    label = line[1:].strip()
+    return (MODEL_TAG if label.startswith(TAG_MODEL) else FIELD_TAG), label
+
+
+def _separator(line: str):
+    if line.startswith(PAGE_MARK) or line == RULE_LINE:
+        return SEPARATOR, line
+    return TEXT, line
+
+
+_COMBINED_RULES = {
+    MAIN_TITLE[0]: _title,
+    '#': _bot,
+    '@': _tag,
+    '-': _separator,
+    '_': _separator,
+}
+
+
+def lex_combined(line: str):
+    """رمز سطر من الملف المجمّع.
+
+    PACKAGE/CATEGORY: ``value`` ما بعد "العنوان الرئيسي"/"العنوان الفرعي" (مع ":")؛
+    BOT: ما بعد أول ``#``؛ FIELD_TAG/MODEL_TAG: ما بعد ``@`` بلا مسافات
+    (MODEL_TAG إن بدأ بـ "نموذج")؛ SEPARATOR: فاصل صفحة أو خط أفقي.
+    """
+    rule = _COMBINED_RULES.get(line[:1])
+    if rule is None:
+        return TEXT, line
+    return rule(line)
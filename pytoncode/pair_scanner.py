@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Line-oriented scanner for ``"العنوان":"النص"`` pairs.
+
+بديل خطي للتعبير النمطي الذي كان يُطبَّق على نص المستند كاملاً في
+``parse_nobtha`` و``parse_mithal``::
+
+    ["“](.+?)["”]\\s*[:：]\\s*(?:\\r?\\n\\s*)?(?:الوصف\\s*\\(?\\s*LABEL\\s*\\)?\\s*[:：]\\s*)?["“](.+?)["”]
+
+يعطي الماسح نفس الأزواج وبنفس الترتيب، لكنه يمر على الأسطر مرة واحدة:
+لكل علامة إغلاق في السطر تُحسب نتيجة "ما بعد العنوان" مرة واحدة فقط بدلاً من
+إعادة المحاولة مع كل بداية ممكنة. الأسطر التي تبدأ بعلامة اقتباس ولا يبدأ فيها
+أو يمر بها أي زوج تُسجَّل في ``problems`` كأزواج غير مكتملة.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+OPEN_QUOTES = '"“'
+CLOSE_QUOTES = '"”'
+COLONS = ':：'
+DESC_PREFIX = 'الوصف'
+
+_NON_SPACE = re.compile(r'\S')
+_OPEN = re.compile('[%s]' % OPEN_QUOTES)
+_CLOSE = re.compile('[%s]' % CLOSE_QUOTES)
+
+Pos = Tuple[int, int]
+
+
+class Pair(NamedTuple):
+    title: str
+    text: str
+    line_no: int
+
+
+class _Scanner:
+    def __init__(self, lines: List[str], label: str):
+        self.lines = lines
+        self.label = label
+
+    def skip_ws(self, pos: Optional[Pos]) -> Optional[Pos]:
+        """أول محرف غير فراغ بدءاً من pos (السطر الجديد يُعد فراغاً)."""
+        if pos is None:
+            return None
+        li, col = pos
+        lines = self.lines
+        while li < len(lines):
+            m = _NON_SPACE.search(lines[li], col)
+            if m:
+                return li, m.start()
+            li, col = li + 1, 0
+        return None
+
+    def at(self, pos: Optional[Pos], chars: str) -> bool:
+        if pos is None:
+            return False
+        li, col = pos
+        return self.lines[li][col] in chars
+
+    def literal(self, pos: Optional[Pos], word: str) -> Optional[Pos]:
+        if pos is None:
+            return None
+        li, col = pos
+        if self.lines[li].startswith(word, col):
+            return li, col + len(word)
+        return None
+
+    def after_label(self, pos: Optional[Pos]) -> Optional[Pos]:
+        """يطابق 'الوصف (LABEL):' الاختياري ويعيد الموضع بعده، أو None."""
+        p = self.skip_ws(self.literal(pos, DESC_PREFIX))
+        if self.at(p, '('):
+            p = self.skip_ws((p[0], p[1] + 1))
+        p = self.skip_ws(self.literal(p, self.label))
+        if self.at(p, ')'):
+            p = self.skip_ws((p[0], p[1] + 1))
+        if not self.at(p, COLONS):
+            return None
+        return self.skip_ws((p[0], p[1] + 1))
+
+    def value_after_title(self, pos: Pos) -> Optional[Tuple[str, Pos]]:
+        """ما بعد علامة إغلاق العنوان: نقطتان ثم النص المقتبس (مع الوصف الاختياري)."""
+        colon = self.skip_ws(pos)
+        if not self.at(colon, COLONS):
+            return None
+        start = self.skip_ws((colon[0], colon[1] + 1))
+        opening = self.after_label(start)
+        if not self.at(opening, OPEN_QUOTES):
+            opening = start
+        if not self.at(opening, OPEN_QUOTES):
+            return None
+        li, col = opening
+        # النص: محرف واحد على الأقل ثم أول علامة إغلاق في السطر نفسه
+        m = _CLOSE.search(self.lines[li], col + 2)
+        if not m:
+            return None
+        return self.lines[li][col + 1:m.start()], (li, m.end())
+
+    def line_table(self, li: int):
+        """مواضع علامات الإغلاق في السطر، ونتيجة ما بعد كل منها، وأقرب إغلاق صالح."""
+        closes = [m.start() for m in _CLOSE.finditer(self.lines[li])]
+        values = {}
+        next_ok: List[Optional[int]] = [None] * (len(closes) + 1)
+        for k in range(len(closes) - 1, -1, -1):
+            j = closes[k]
+            values[j] = self.value_after_title((li, j + 1))
+            next_ok[k] = j if values[j] is not None else next_ok[k + 1]
+        return closes, values, next_ok
+
+
+def iter_pairs(lines: List[str], label: str, problems: Optional[list] = None) -> Iterator[Pair]:
+    """يولّد الأزواج (العنوان، النص، رقم السطر) كما يطابقها النمط القديم."""
+    # النمط القديم كان يعمل على "\n".join(lines)، فالسطر الفعلي هو ما بين محارف \n
+    lines = [piece for line in lines for piece in line.split('\n')]
+    scanner = _Scanner(lines, label)
+    covered = set()
+    table_li, table = -1, None
+    li, col = 0, 0
+    while li < len(lines):
+        line = lines[li]
+        if table_li != li:
+            table_li, table = li, scanner.line_table(li)
+        closes, values, next_ok = table
+
+        matched = None
+        k = 0
+        for opening in _OPEN.finditer(line, col):
+            o = opening.start()
+            while k < len(closes) and closes[k] < o + 2:
+                k += 1
+            j = next_ok[k]
+            if j is None:
+                continue
+            text, end = values[j]
+            matched = Pair(line[o + 1:j], text, li + 1)
+            covered.update(range(li, end[0] + 1))
+            yield matched
+            li, col = end
+            break
+        if matched is None:
+            li, col = li + 1, 0
+
+    if problems is not None:
+        for idx, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped and stripped[0] in OPEN_QUOTES and idx not in covered:
+                problems.append((idx + 1, 'unterminated pair: %s' % stripped[:60]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""On-disk cache for parsed DOCX results keyed by content hash.
+
+كل مدخل يُخزَّن في ملف JSON مستقل (``entry-<key>.json``) داخل مجلد الذاكرة
+المؤقتة، ومفتاحه SHA-256 لمحتوى الملف المصدر مع اسم المرحلة ونسخة المحلِّل؛
+أي تعديل على الملف أو رفع ``PARSER_VERSION`` يُبطل المدخل تلقائياً. يُحتفظ
+بعدد محدود من المدخلات ويُحذف الأقدم استخداماً عند تجاوزه؛ الإخلاء لا يلمس
+إلا ملفات المدخلات، فالمجلد مشترك مع تقارير القياس (bench_*.json وprofile/).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from json_output import write_bytes_atomic
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.cache'
+DEFAULT_MAX_ENTRIES = 64
+ENTRY_PREFIX = 'entry-'
+_CHUNK = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """بصمة SHA-256 لمحتوى الملف، أو سلسلة فارغة إن لم يوجد."""
+    path = Path(path)
+    if not path.exists():
+        return ''
+    h = hashlib.sha256()
+    with path.open('rb') as fh:
+        for block in iter(lambda: fh.read(_CHUNK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def digest_inputs(paths: Iterable[Path]) -> Dict[str, str]:
+    """اسم الملف → بصمته، لمجموعة مدخلات."""
+    return {Path(p).name: file_sha256(p) for p in paths}
+
+
+class ParseCache:
+    """ذاكرة مؤقتة بسيطة على القرص مع حد أعلى لعدد المدخلات."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, version: str = '1',
+                 max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = True):
+        self.root = Path(root)
+        self.version = str(version)
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+    def _entry_path(self, namespace: str, digest: str) -> Path:
+        key = hashlib.sha256(f'{self.version}\0{namespace}\0{digest}'.encode('utf-8')).hexdigest()
+        return self.root / f'{ENTRY_PREFIX}{key}.json'
+
+    def get(self, namespace: str, digest: str):
+        if not self.enabled or not digest:
+            return None
+        entry = self._entry_path(namespace, digest)
+        try:
+            with entry.open('r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # تحديث وقت الاستخدام لسياسة الإخلاء
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return value
+
+    def put(self, namespace: str, digest: str, value) -> None:
+        if not self.enabled or not digest:
+            return
+        # اسم مؤقت فريد وfsync ثم استبدال، فلا تتصادم عمليتان ولا يبقى مدخل مبتور
+        raw = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        write_bytes_atomic(self._entry_path(namespace, digest), raw)
+        self.evict()
+
+    def get_or_compute(self, namespace: str, path: Path, compute: Callable[[], object],
+                       digest: Optional[str] = None):
+        """يعيد النتيجة المخزنة لملف ما أو يحسبها ويخزنها."""
+        digest = digest if digest is not None else file_sha256(path)
+        cached = self.get(namespace, digest)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(namespace, digest, value)
+        return value
+
+    def evict(self) -> int:
+        """يحذف أقدم المدخلات استخداماً حتى لا يتجاوز العدد ``max_entries``."""
+        if not self.root.exists():
+            return 0
+        entries = sorted(self.root.glob(f'{ENTRY_PREFIX}*.json'), key=_mtime, reverse=True)
+        # مدخلات الصيغة القديمة (<sha256>.json بلا بادئة) لم تعد تُقرأ
+        legacy = [p for p in self.root.glob('*.json') if _is_legacy_entry(p.name)]
+        removed = 0
+        for stale in entries[self.max_entries:] + legacy:
+            try:
+                stale.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:  # حذفته عملية أخرى بين glob وstat
+        return 0.0
+
+
+def _is_legacy_entry(name: str) -> bool:
+    stem = name[:-len('.json')]
+    return len(stem) == 64 and all(c in '0123456789abcdef' for c in stem)
+
+
+def fingerprint(digests: Dict[str, str]) -> str:
+    """بصمة واحدة لمجموعة بصمات (مدخلات + مخرجات) لتحديد إن كان التشغيل لازماً."""
+    payload = json.dumps(digests, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
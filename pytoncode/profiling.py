@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lightweight per-stage instrumentation for the pipeline scripts.
+
+تفعّله السكربتات بالخيار ``--profile`` (ومسار التقرير بـ ``--profile-out PATH``)
+أو بمتغير البيئة ``BOTS_PROFILE=1`` (أو ``BOTS_PROFILE=path.json``). عند التفعيل يسجَّل لكل مرحلة
+الزمن الفعلي وعدد الاستدعاءات وذروة الذاكرة (tracemalloc)، إضافة إلى عدادات
+مثل نتائج ``best_match_title`` (احتواء/تقريبي/لا شيء)، ثم يُكتب تقرير JSON
+وسطر ملخّص على stderr عند انتهاء السكربت.
+
+عند عدم التفعيل: ``stage`` تعيد سياقاً فارغاً مشتركاً، و``count`` تعود فوراً،
+و``iter_stage`` تعيد المُكرِّر نفسه؛ فالكلفة شبه معدومة.
+
+المراحل قد تتداخل (parse_links داخل build_json...)، والزمن المسجّل لكل مرحلة
+شامل لما بداخلها. المراحل التي تعمل في عمليات فرعية (``--jobs`` > 1) لا تظهر
+في التقرير.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+PROFILE_ENV = 'BOTS_PROFILE'
+PROFILE_DIR = Path(__file__).resolve().parent / '.cache' / 'profile'
+SUMMARY_STAGES = 5
+
+_NULL = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ('calls', 'seconds', 'peak', 'items')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak = None  # لا تُقاس الذاكرة لمراحل iter_stage
+        self.items = 0
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.script = None
+        self.report_path = None
+        self.stages: 'OrderedDict[str, _Stage]' = OrderedDict()
+        self.counters: Counter = Counter()
+        self._stack = [[0, 0]]  # الإطار الجذر يجمع ذروة التشغيل كله
+        self._started = 0.0
+
+    # ---------- التفعيل ----------
+    def start(self, script: str, profile: bool = False, out=None) -> bool:
+        """يفعّل القياس إن طُلب بالخيار أو بمتغير البيئة؛ يُستدعى مرة واحدة في main.
+
+        ``out`` مسار التقرير (``--profile-out``) ويفعّل القياس وحده أيضاً.
+        """
+        profile = out or profile
+        env = os.environ.get(PROFILE_ENV, '').strip()
+        if not profile and env.lower() not in ('', '0', 'false', 'no'):
+            profile = env if env.lower().endswith('.json') else True
+        if not profile or self.enabled:
+            return self.enabled
+        self.enabled = True
+        self.script = script
+        self.report_path = Path(profile) if isinstance(profile, (str, Path)) else PROFILE_DIR / f'{script}.json'
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._started = time.perf_counter()
+        atexit.register(self.finish)
+        return True
+
+    # ---------- التسجيل ----------
+    def _get(self, name: str) -> _Stage:
+        rec = self.stages.get(name)
+        if rec is None:
+            rec = self.stages[name] = _Stage()
+        return rec
+
+    def stage(self, name: str):
+        """سياق يقيس مرحلة باسمها: ``with PROFILE.stage('parse_links'): ...``."""
+        if not self.enabled:
+            return _NULL
+        return self._measure(name)
+
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        rec = self._get(name)
+        rec.calls += 1
+        # ذروة المرحلة الأم حتى الآن، ثم نصفّر الذروة لقياس هذه المرحلة وحدها
+        frame = [tracemalloc.get_traced_memory()[1], 0]
+        self._stack.append(frame)
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            rec.seconds += time.perf_counter() - start
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            rec.peak = peak if rec.peak is None else max(rec.peak, peak)
+            self._stack.pop()
+            parent = self._stack[-1]
+            parent[1] = max(parent[1], peak, frame[0])
+
+    def iter_stage(self, name: str, iterable):
+        """يحسب الزمن المستهلك داخل مُكرِّر كسول (مثل قراءة فقرات DOCX)."""
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iterable)
+
+    def _timed_iter(self, name: str, iterable):
+        rec = self._get(name)
+        rec.calls += 1
+        it = iter(iterable)
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                item = next(it)
+            except StopIteration:
+                rec.seconds += clock() - start
+                return
+            rec.seconds += clock() - start
+            rec.items += 1
+            yield item
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        self.counters[name] += n
+
+    # ---------- التقرير ----------
+    def report(self):
+        total = time.perf_counter() - self._started
+        stages = []
+        for name, rec in self.stages.items():
+            entry = OrderedDict([
+                ('name', name),
+                ('calls', rec.calls),
+                ('seconds', round(rec.seconds, 6)),
+                ('share', round(rec.seconds / total, 4) if total else 0.0),
+                ('peakBytes', rec.peak),
+            ])
+            if rec.items:
+                entry['items'] = rec.items
+            stages.append(entry)
+        return OrderedDict([
+            ('script', self.script),
+            ('argv', sys.argv[1:]),
+            ('totalSeconds', round(total, 6)),
+            ('peakBytes', max(self._stack[0][1], tracemalloc.get_traced_memory()[1])
+             if tracemalloc.is_tracing() else None),
+            ('stages', stages),
+            ('counters', OrderedDict(sorted(self.counters.items()))),
+        ])
+
+    def summary(self, report) -> str:
+        top = sorted(report['stages'], key=lambda s: s['seconds'], reverse=True)[:SUMMARY_STAGES]
+        parts = [f"profile {report['script']}: {report['totalSeconds']:.3f}s"]
+        parts += [f"{s['name']} {s['seconds']:.3f}s×{s['calls']}" for s in top]
+        if report['peakBytes'] is not None:
+            parts.append(f"peak {report['peakBytes'] / 1048576:.1f} MiB")
+        if report['counters']:
+            parts.append(' '.join(f'{k}={v}' for k, v in report['counters'].items()))
+        return ' | '.join(parts) + f' → {self.report_path}'
+
+    def finish(self):
+        """يكتب التقرير ويطبع السطر الملخّص (يُستدعى تلقائياً عند الخروج)."""
+        if not self.enabled:
+            return None
+        from json_output import write_json
+
+        report = self.report()
+        self.enabled = False
+        write_json(self.report_path, report)
+        print(self.summary(report), file=sys.stderr)
+        return report
+
+
+PROFILE = Profiler()
+
+
+def add_profile_argument(parser) -> None:
+    # --profile لا يأخذ قيمة: مع nargs='?' كان يبتلع أول مسار موضعي بعده ويكتب التقرير فوقه
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Record per-stage timings and memory (JSON report; also ${PROFILE_ENV}=1)")
+    parser.add_argument('--profile-out', type=Path, default=None, metavar='PATH',
+                        help=f"Where to write the profile report (implies --profile; default {PROFILE_DIR.name}/<script>.json)")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Build-time inverted search index for the bots catalog.
+
+يولّد ``public/search_index.json`` بجانب new_bots.json: كل كلمة مطبّعة
+(وكل مقاطعها الجزئية بطول ``minPrefix`` فأكثر لحقلي العنوان والتصنيف) → أرقام
+البوتات التي تحتويها، ليصبح البحث في الواجهة بحثاً في قاموس بدلاً من المرور على
+كل البوتات مع كل ضغطة مفتاح.
+
+التطبيع مطابق حرفياً لدوال الواجهة في src/App.jsx:
+    stripTashkeel = s.replace(/[\\u0617-\\u061A\\u064B-\\u0652\\u0670]/g, "")
+    normalizeAr   = stripTashkeel(s).toLowerCase()
+    tokenize      = normalizeAr(s).trim().split(/\\s+/).filter(Boolean)
+و``\\s`` هنا هو صنف الفراغات في JavaScript وليس تعريف بايثون.
+
+رقم البوت في الفهرس هو موضعه في ``docs``، وكل عنصر في ``docs`` هو
+[رقم الباقة، رقم التصنيف، رقم البوت] بحسب ترتيب ظهورها في الملف.
+
+الواجهة تجلبه عبر ``data/manifest.json`` (مفتاح ``search_index``) وتستعمله
+لتضييق المرشحين فقط: فلترها يطابق أي جزء من العنوان أو التصنيف (``includes``)،
+ولأن كل مقطع من كلماتهما مفهرس فناتج القاموس يحوي كل ما يطابقه الفلتر، ثم
+يُعاد الفحص الأصلي على المرشحين وحدهم فلا تتغير النتائج. لذلك يُبنى العنوان
+والتصنيف هنا كما تعرضهما الواجهة (sanitizeText والقيم الاحتياطية).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from json_output import write_json
+from profiling import PROFILE, add_profile_argument
+from text_normalize import KEY_CACHE_SIZE, normalize_ar
+
+INDEX_VERSION = 2
+MIN_PREFIX = 2
+DEFAULT_FIELDS = ('title', 'category', 'نبذة')
+DETAIL_FIELDS = ('حدود', 'مثال')
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CATALOG_PATH = REPO_ROOT / 'public' / 'new_bots.json'
+INDEX_PATH = REPO_ROOT / 'public' / 'search_index.json'
+
+# صنف \s في JavaScript (WhiteSpace + LineTerminator)
+_JS_SPACE = re.compile('[\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]+')
+# الحقول التي تُفهرس كل مقاطعها (ما يطابقه فلتر الواجهة بـ includes)
+_SUBSTRING_FIELDS = ('title', 'category')
+# sanitizeText في App.jsx: يحذف U+0000–U+001F وU+007F ثم يقص الطول
+_CONTROL = dict.fromkeys([*range(0x20), 0x7f])
+TITLE_MAX = 200
+CATEGORY_MAX = 160
+
+
+def tokenize(s) -> list:
+    return [tok for tok in _JS_SPACE.split(normalize_ar(s)) if tok]
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _substrings(tok: str) -> tuple:
+    """كل مقاطع tok بطول MIN_PREFIX فأكثر (الكلمات تتكرر بين البوتات فتُحسب مرة)."""
+    return tuple({tok[start:end] for start in range(len(tok) - MIN_PREFIX + 1)
+                  for end in range(start + MIN_PREFIX, len(tok) + 1)})
+
+
+def _display_text(value, limit: int) -> str:
+    return ('' if value is None else str(value)).translate(_CONTROL)[:limit]
+
+
+def _first_text(*values) -> str:
+    """firstNonEmptyString في App.jsx: أول نص غير فارغ بعد القص."""
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ''
+
+
+def _bot_fields(entry, index: int = 0):
+    """حقول البوت القابلة للبحث من شكلي الملف (botTitle/الحقول المباشرة أو title/details).
+
+    العنوان كما تعرضه الواجهة، و``بوت N`` إن كان فارغاً (index موضع البوت في تصنيفه).
+    """
+    details = entry.get('details') if isinstance(entry.get('details'), dict) else entry
+    title = _first_text(entry.get('botTitle'), entry.get('title'), entry.get('name'))
+    return {
+        'title': _display_text(title, TITLE_MAX) or f'بوت {index + 1}',
+        'نبذة': details.get('نبذة') or '',
+        'حدود': details.get('حدود') or '',
+        'مثال': details.get('مثال') or '',
+    }
+
+
+def iter_catalog(payload):
+    """يولّد (رقم الباقة، رقم التصنيف، رقم البوت، اسم التصنيف، مدخل البوت)."""
+    if isinstance(payload, dict) and isinstance(payload.get('packages'), list):
+        for p, pkg in enumerate(payload['packages']):
+            for c, cat in enumerate(pkg.get('categories', [])):
+                for b, bot in enumerate(cat.get('bots', [])):
+                    yield p, c, b, cat.get('category', ''), bot
+        return
+    # الشكل الذي تقرؤه الواجهة: {باقة: {تصنيف: [بوتات]}}
+    for p, categories in enumerate((payload or {}).values()):
+        if not isinstance(categories, dict):
+            continue
+        for c, (cat_name, bots) in enumerate(categories.items()):
+            if not isinstance(bots, list):
+                continue
+            for b, bot in enumerate(bots):
+                # الواجهة تعرض المدخل غير الصالح كـ "بوت N" (botsArr[i] || {})
+                yield p, c, b, cat_name, bot if isinstance(bot, dict) else {}
+
+
+def build_search_index(payload, include_details: bool = False, catalog_hash: str = ''):
+    fields = DEFAULT_FIELDS + (DETAIL_FIELDS if include_details else ())
+    docs = []
+    # أرقام البوتات تتزايد وكل مصطلح يُضاف مرة واحدة لكل بوت، فالقوائم مرتبة أصلاً
+    postings = defaultdict(list)
+    for p, c, b, cat_name, bot in iter_catalog(payload):
+        doc_id = len(docs)
+        docs.append([p, c, b])
+        values = _bot_fields(bot, b)
+        values['category'] = _display_text(cat_name, CATEGORY_MAX) or 'غير مصنّف'
+        terms, expand = set(), set()
+        for field in fields:
+            tokens = tokenize(values.get(field, ''))
+            terms.update(tokens)
+            if field in _SUBSTRING_FIELDS:
+                expand.update(tokens)
+        for tok in expand:
+            terms.update(_substrings(tok))
+        for term in terms:
+            postings[term].append(doc_id)
+    return OrderedDict([
+        ('version', INDEX_VERSION),
+        ('catalogHash', catalog_hash),
+        ('fields', list(fields)),
+        ('minPrefix', MIN_PREFIX),
+        ('docs', docs),
+        ('terms', OrderedDict((term, postings[term]) for term in sorted(postings))),
+    ])
+
+
+def catalog_digest(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def is_current(catalog_path: Path, index_path: Path, include_details: bool = False, digest: str = None) -> bool:
+    """هل الفهرس مبني من نفس محتوى الكتالوج وبنفس الحقول؟"""
+    catalog_path, index_path = Path(catalog_path), Path(index_path)
+    if not index_path.exists():
+        return False
+    try:
+        current = json.loads(index_path.read_text(encoding='utf-8'))
+    except ValueError:
+        return False
+    wanted = list(DEFAULT_FIELDS + (DETAIL_FIELDS if include_details else ()))
+    digest = digest or catalog_digest(catalog_path)
+    return (current.get('version') == INDEX_VERSION and current.get('catalogHash') == digest
+            and current.get('fields') == wanted)
+
+
+def stale_reasons(catalog_path: Path = CATALOG_PATH, index_path: Path = INDEX_PATH,
+                  include_details: bool = False) -> list:
+    """أسباب كون الفهرس قديماً؛ قائمة فارغة إن كان مطابقاً للكتالوج."""
+    if not Path(catalog_path).exists():
+        return []
+    if not is_current(catalog_path, index_path, include_details):
+        return [f'{Path(index_path).name} does not match {Path(catalog_path).name}']
+    return []
+
+
+def write_search_index(catalog_path: Path = CATALOG_PATH, index_path: Path = INDEX_PATH,
+                       include_details: bool = False, force: bool = True):
+    """يبني الفهرس من ملف الكتالوج؛ مع force=False يتخطى البناء إذا كانت البصمة مطابقة."""
+    catalog_path, index_path = Path(catalog_path), Path(index_path)
+    digest = catalog_digest(catalog_path)
+    if not force and is_current(catalog_path, index_path, include_details, digest):
+        return False
+    payload = json.loads(catalog_path.read_text(encoding='utf-8'))
+    with PROFILE.stage('search_index.build'):
+        index = build_search_index(payload, include_details=include_details, catalog_hash=digest)
+    write_json(index_path, index, indent=None)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build public/search_index.json from the bots catalog")
+    parser.add_argument('--json', type=Path, default=CATALOG_PATH, help="Catalog JSON path")
+    parser.add_argument('--out', type=Path, default=INDEX_PATH, help="Search index output path")
+    parser.add_argument('--details', action='store_true', help="Also index حدود and مثال")
+    parser.add_argument('--if-stale', action='store_true', help="Skip when the index already matches the catalog")
+    parser.add_argument('--check', action='store_true', help="Only report whether the index is stale (exit 1 if so)")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start('search_index', args.profile, args.profile_out)
+
+    if not args.json.exists():
+        raise SystemExit(f"Catalog not found: {args.json}")
+    if args.check:
+        current = is_current(args.json, args.out, include_details=args.details)
+        print(f"{'Up to date' if current else 'Stale'}: {args.out}")
+        return 0 if current else 1
+    if write_search_index(args.json, args.out, include_details=args.details, force=not args.if_stale):
+        print(f"Wrote {args.out}")
+    else:
+        print(f"Up to date: {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
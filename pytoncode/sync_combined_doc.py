@@ -4,29 +4,34 @@
 from __future__ import annotations
 
 import argparse
+import glob
 import json
+import os
 import sys
-from collections import OrderedDict
+import time
 from pathlib import Path
 
-try:
-    from docx import Document
-except ImportError as exc:  # pragma: no cover
-    raise SystemExit("python-docx is required. Install it via 'pip install python-docx'.") from exc
+from catalog_model import TEXT_FIELDS, Bot, Catalog, to_payload
+from catalog_schema import ALIASES_KEY, add_aliases, alias_table
+from catalog_shards import write_shards
+from docx_stream import iter_texts
+from json_output import write_json
+from line_lexer import BOT, CATEGORY, PACKAGE, TEXT_KINDS, lex_combined
+from profiling import PROFILE, add_profile_argument
+from search_index import INDEX_PATH, write_search_index
+from text_normalize import clean_line as normalize_line
 
-MAIN_TITLE = "\u0627\u0644\u0639\u0646\u0648\u0627\u0646 \u0627\u0644\u0631\u0626\u064a\u0633\u064a"
-SUB_TITLE = "\u0627\u0644\u0639\u0646\u0648\u0627\u0646 \u0627\u0644\u0641\u0631\u0639\u064a"
 TAG_ABOUT = "\u0646\u0628\u0630\u0629"
 TAG_LIMITS = "\u062d\u062f\u0648\u062f"
 TAG_EXAMPLE = "\u0645\u062b\u0627\u0644"
 TAG_LINKS = "\u0631\u0648\u0627\u0628\u0637"
 TAG_MODEL = "\u0646\u0645\u0648\u0630\u062c"
+UNCATEGORIZED = "\u063a\u064a\u0631 \u0645\u0635\u0646\u0641"
 
 
 def iter_doc_lines(doc_path: Path):
-    doc = Document(str(doc_path))
-    for para in doc.paragraphs:
-        text = (para.text or "").strip()
+    for para_text in iter_texts(doc_path):
+        text = (para_text or "").strip()
         if not text:
             continue
         for part in text.splitlines():
@@ -35,101 +40,133 @@ def iter_doc_lines(doc_path: Path):
                 yield line
 
 
-def normalize_line(line: str) -> str:
-    return line.replace("\u200f", "").replace("\u200e", "").strip()
-
-
-def parse_combined_doc(doc_path: Path):
-    packages: "OrderedDict[str, OrderedDict[str, list]]" = OrderedDict()
-    current_pkg_name = None
-    current_cat_name = None
+def parse_combined_doc(doc_path: Path) -> Catalog:
+    catalog = Catalog()
+    current_pkg = None
+    current_cat = None
     current_bot = None
     current_field = None
     current_model = None
+    # أسطر الحقل النصي الجاري فقط؛ تُلحق بالبوت دفعة واحدة عند انتهاء الحقل
+    buffer = []
+
+    def flush_text():
+        current_bot.add_text(current_field, "\n".join(buffer))
+        buffer.clear()
 
     for raw_line in iter_doc_lines(doc_path):
         line = normalize_line(raw_line)
         if not line:
             continue
 
-        if line.startswith(MAIN_TITLE):
-            value = line.split(":", 1)[1].strip() if ":" in line else ""
-            current_pkg_name = value
-            packages.setdefault(current_pkg_name, OrderedDict())
-            current_cat_name = None
+        kind, value = lex_combined(line)
+
+        if kind in TEXT_KINDS:
+            if current_bot is None:
+                continue
+            if current_field in TEXT_FIELDS:
+                buffer.append(line)
+            elif current_field == "link" and current_model:
+                lower = line.lower()
+                if lower.startswith("http://") or lower.startswith("https://"):
+                    current_bot.set_link(current_model, line.strip())
+            continue
+
+        if kind == PACKAGE:
+            if buffer:
+                flush_text()
+            current_pkg = catalog.package(value.partition(":")[2].strip())
+            current_cat = None
             current_bot = None
             current_field = None
             current_model = None
             continue
 
-        if line.startswith(SUB_TITLE):
-            if current_pkg_name is None:
+        if kind == CATEGORY:
+            if current_pkg is None:
                 raise ValueError("Encountered sub-title before a main title")
-            value = line.split(":", 1)[1].strip() if ":" in line else ""
-            current_cat_name = value or "\u063a\u064a\u0631 \u0645\u0635\u0646\u0641"
-            packages[current_pkg_name].setdefault(current_cat_name, [])
+            if buffer:
+                flush_text()
+            current_cat = current_pkg.category(value.partition(":")[2].strip() or UNCATEGORIZED)
             current_bot = None
             current_field = None
             current_model = None
             continue
 
-        if line.startswith("#"):
-            if current_pkg_name is None:
+        if kind == BOT:
+            if current_pkg is None:
                 raise ValueError("Encountered bot title before a main title")
-            if current_cat_name is None:
-                packages[current_pkg_name].setdefault("\u063a\u064a\u0631 \u0645\u0635\u0646\u0641", [])
-                current_cat_name = "\u063a\u064a\u0631 \u0645\u0635\u0646\u0641"
-            title = line.lstrip("#").strip()
-            current_bot = {
-                "botTitle": title,
-                "\u0627\u0644\u0646\u0645\u0648\u0630\u062c": OrderedDict(),
-                "\u0646\u0628\u0630\u0629": "",
-                "\u062d\u062f\u0648\u062f": "",
-                "\u0645\u062b\u0627\u0644": "",
-            }
-            packages[current_pkg_name][current_cat_name].append(current_bot)
+            if buffer:
+                flush_text()
+            if current_cat is None:
+                current_cat = current_pkg.category(UNCATEGORIZED)
+            current_bot = Bot(value.lstrip("#").strip())
+            current_cat.bots.append(current_bot)
             current_field = None
             current_model = None
             continue
 
-        if line.startswith("@"):
-            if current_bot is None:
-                continue
-            tag_body = line[1:].strip()
-            tag, _, suffix = tag_body.partition(" ")
-            if tag == TAG_ABOUT:
-                current_field = "\u0646\u0628\u0630\u0629"
-                current_model = None
-            elif tag == TAG_LIMITS:
-                current_field = "\u062d\u062f\u0648\u062f"
-                current_model = None
-            elif tag == TAG_EXAMPLE:
-                current_field = "\u0645\u062b\u0627\u0644"
-                current_model = None
-            elif tag == TAG_LINKS:
-                current_field = None
-                current_model = None
-            elif tag == TAG_MODEL:
-                current_field = "link"
-                current_model = suffix.strip() or "link"
-            else:
-                current_field = None
-                current_model = None
-            continue
-
+        # FIELD_TAG / MODEL_TAG
         if current_bot is None:
             continue
-
-        if current_field in ("\u0646\u0628\u0630\u0629", "\u062d\u062f\u0648\u062f", "\u0645\u062b\u0627\u0644"):
-            key = current_field
-            text = current_bot[key]
-            current_bot[key] = f"{text}\n{line}".strip() if text else line
-        elif current_field == "link" and current_model:
-            lower = line.lower()
-            if lower.startswith("http://") or lower.startswith("https://"):
-                current_bot["\u0627\u0644\u0646\u0645\u0648\u0630\u062c"][current_model] = line.strip()
-
-    return packages
+        if buffer:
+            flush_text()
+        tag, _, suffix = value.partition(" ")
+        current_field = None
+        current_model = None
+        if tag in (TAG_ABOUT, TAG_LIMITS, TAG_EXAMPLE):
+            current_field = tag
+        elif tag == TAG_MODEL:
+            current_field = "link"
+            current_model = suffix.strip() or "link"
+
+    if buffer:
+        flush_text()
+    return catalog
+
+
+def resolve_batch_docs(spec: str):
+    """Expand a directory or glob pattern into a sorted list of DOCX paths."""
+    path = Path(spec)
+    if path.is_dir():
+        candidates = path.glob("*.docx")
+    else:
+        candidates = (Path(p) for p in glob.glob(spec))
+    # Skip Word lock files such as "~$name.docx"
+    return sorted(p for p in candidates if p.is_file() and not p.name.startswith("~$"))
+
+
+def parse_doc_timed(doc_path: Path):
+    started = time.perf_counter()
+    with PROFILE.stage("parse"):
+        packages = parse_combined_doc(doc_path)
+    return packages, time.perf_counter() - started
+
+
+def merge_packages(parsed_docs) -> Catalog:
+    """Merge per-document catalogs in the given order (packages, then categories, then bots)."""
+    merged = Catalog()
+    for catalog in parsed_docs:
+        merged.merge(catalog)
+    return merged
+
+
+def parse_docs_parallel(doc_paths, jobs: int):
+    """Parse several combined documents in worker processes; results keep the input order."""
+    if jobs <= 1 or len(doc_paths) <= 1:
+        return [parse_doc_timed(path) for path in doc_paths]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(doc_paths))) as pool:
+        return list(pool.map(parse_doc_timed, doc_paths))
+
+
+def print_timing_summary(doc_paths, results):
+    print("Per-file parse timings:")
+    for doc_path, (catalog, seconds) in zip(doc_paths, results):
+        print(f"  {seconds * 1000:8.1f} ms  {len(catalog):3d} packages  {catalog.bot_count():5d} bots  {doc_path.name}")
+    total = sum(seconds for _, seconds in results)
+    print(f"  {total * 1000:8.1f} ms  total parse time across {len(results)} files")
 
 
 def load_existing_package_ids(json_path: Path):
@@ -147,71 +184,65 @@ def load_existing_package_ids(json_path: Path):
     return mapping
 
 
-def enrich_bot_entry(bot):
-    links = OrderedDict((key, value) for key, value in bot["\u0627\u0644\u0646\u0645\u0648\u0630\u062c"].items() if value)
-    about = bot["\u0646\u0628\u0630\u0629"].strip()
-    limits = bot["\u062d\u062f\u0648\u062f"].strip()
-    example = bot["\u0645\u062b\u0627\u0644"].strip()
-
+def enrich_bot_entry(bot, compact=False):
     entry = {
-        "botTitle": bot["botTitle"],
-        "\u0627\u0644\u0646\u0645\u0648\u0630\u062c": links,
-        "\u0646\u0628\u0630\u0629": about,
-        "\u062d\u062f\u0648\u062f": limits,
-        "\u0645\u062b\u0627\u0644": example,
+        "botTitle": bot.title,
+        "\u0627\u0644\u0646\u0645\u0648\u0630\u062c": {key: url for key, url in bot.link_map().items() if url},
+        "\u0646\u0628\u0630\u0629": bot.about.strip(),
+        "\u062d\u062f\u0648\u062f": bot.limits.strip(),
+        "\u0645\u062b\u0627\u0644": bot.example.strip(),
     }
 
-    if links:
-        entry["model"] = links
-        entry["models"] = links
-        entry["links"] = links
-    if about:
-        entry["about"] = about
-        entry["description"] = about
-    if limits:
-        entry["limits"] = limits
-        entry["constraints"] = limits
-    if example:
-        entry["example"] = example
-        entry["examples"] = example
+    if not compact:
+        add_aliases(entry, skip_empty=True)
 
     return entry
 
 
-def build_payload(packages, existing_ids):
-    payload = {"packages": []}
-    for index, (pkg_name, categories) in enumerate(packages.items(), start=1):
-        pkg_id = existing_ids.get(pkg_name, index)
-        pkg_entry = {
-            "package": pkg_name,
-            "packageId": pkg_id,
-            "categories": [],
-        }
-        for cat_name, bots in categories.items():
-            cat_entry = {"category": cat_name, "bots": []}
-            for bot in bots:
-                cat_entry["bots"].append(enrich_bot_entry(bot))
-            pkg_entry["categories"].append(cat_entry)
-        payload["packages"].append(pkg_entry)
-    return payload
+def build_payload(catalog, existing_ids, compact=False):
+    packages = to_payload(
+        catalog,
+        lambda bot: enrich_bot_entry(bot, compact=compact),
+        package_id=lambda index, pkg: existing_ids.get(pkg.name, index),
+    )
+    if compact:
+        return {ALIASES_KEY: alias_table(skip_empty=True), "packages": packages}
+    return {"packages": packages}
 
 
 def main(argv=None):
     parser = argparse.ArgumentParser(description="Sync combined DOCX content into public/new_bots.json")
     parser.add_argument("--doc", type=Path, default=Path(__file__).with_name("\u0646\u0628\u0630\u0629 - \u062d\u062f\u0648\u062f - \u0645\u062b\u0627\u0644 - \u0631\u0648\u0627\u0628\u0637.docx"), help="Path to the combined DOCX file")
     parser.add_argument("--json", type=Path, default=Path(__file__).resolve().parents[1] / "public" / "new_bots.json", help="Output JSON path")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB", help="Parse every DOCX in a directory (or matching a glob) instead of --doc")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes for --batch (default: CPU count, 1 = serial)")
+    parser.add_argument("--compact", action="store_true", help="Write each field once plus a top-level alias table")
+    parser.add_argument("--shards", action="store_true", help="Also write one JSON file per package plus index.json")
+    parser.add_argument("--shard-dir", type=Path, default=Path(__file__).resolve().parents[1] / "public" / "catalog", help="Output directory for --shards")
     parser.add_argument("--dry-run", action="store_true", help="Print a short summary without writing JSON")
+    add_profile_argument(parser)
     args = parser.parse_args(argv)
+    PROFILE.start("sync_combined_doc", args.profile, args.profile_out)
+
+    if args.batch:
+        doc_paths = resolve_batch_docs(args.batch)
+        if not doc_paths:
+            raise SystemExit(f"No DOCX files matched: {args.batch}")
+        results = parse_docs_parallel(doc_paths, args.jobs or os.cpu_count() or 1)
+        print_timing_summary(doc_paths, results)
+        packages = merge_packages(packages for packages, _ in results)
+    else:
+        if not args.doc.exists():
+            raise SystemExit(f"Docx file not found: {args.doc}")
+        with PROFILE.stage("parse"):
+            packages = parse_combined_doc(args.doc)
 
-    if not args.doc.exists():
-        raise SystemExit(f"Docx file not found: {args.doc}")
-
-    packages = parse_combined_doc(args.doc)
     if not packages:
-        raise SystemExit("No packages found in the DOCX file")
+        raise SystemExit("No packages found in the DOCX file(s)")
 
     existing_ids = load_existing_package_ids(args.json)
-    payload = build_payload(packages, existing_ids)
+    with PROFILE.stage("build_payload"):
+        payload = build_payload(packages, existing_ids, compact=args.compact)
 
     if args.dry_run:
         print(f"Packages: {len(payload['packages'])}")
@@ -219,9 +250,14 @@ def main(argv=None):
         print(f"Bots: {total_bots}")
         return 0
 
-    args.json.parent.mkdir(parents=True, exist_ok=True)
-    args.json.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(args.json, payload)
     print(f"Wrote {args.json}")
+    index_path = args.json.with_name(INDEX_PATH.name)
+    write_search_index(args.json, index_path)
+    print(f"Wrote {index_path}")
+    if args.shards:
+        index = write_shards(payload, args.shard_dir)
+        print(f"Wrote {len(index['packages'])} package shards to {args.shard_dir}")
     return 0
 
 
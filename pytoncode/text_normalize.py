@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Shared Arabic text normalization for the catalog scripts.
+
+كل دوال التطبيع في مكان واحد، مبنية على جداول ``str.translate`` محسوبة مسبقاً
+بدلاً من سلاسل ``re.sub``/``replace``:
+
+- ``clean_line``: أسطر الملف المجمّع (sync_combined_doc.normalize_line).
+- ``title_key``: عناوين حدود.docx (build_packages_json.normalize_title).
+- ``match_key``: المطابقة التقريبية للعناوين (build_packages_json.norm_for_match).
+- ``outline_key``: مفاتيح update_from_docx (normalize_text).
+- ``model_key``: مفاتيح النماذج (generate_new_bots_json.normalize_model_key).
+- ``strip_tashkeel``/``normalize_ar``: تطبيع البحث المطابق للواجهة (search_index).
+
+كل دالة تعيد حرفياً ما كانت تعيده نسختها القديمة؛ لا تساهل إضافياً. دوال
+المفاتيح التي تُستدعى مراراً على نفس العناوين مخزّنة بـ ``lru_cache``، فالتكرار
+(مثل حلقات add_missing_tools) لا يكلف إلا بحثاً في قاموس.
+
+طيّ المسافات بـ ``' '.join(s.split())`` يطابق ``re.sub(r'\\s+', ' ', s).strip()``:
+``str.split`` و``\\s`` في re يستعملان نفس تعريف المسافة في يونيكود.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+# حجم ذاكرة المفاتيح لكل دالة؛ يكفي لكل عناوين الكتالوج ويبقى محدوداً في وضع المراقبة
+KEY_CACHE_SIZE = 1 << 16
+
+# ======== جداول translate ========
+# علامتا الاتجاه LRM/RLM
+_BIDI = dict.fromkeys(map(ord, '\u200e\u200f'))
+# + محارف التضمين/التجاوز U+202A–U+202E وBOM
+_BIDI_EMBED = dict.fromkeys(map(ord, '\u200e\u200f\u202a\u202b\u202c\u202d\u202e\ufeff'))
+# التطويل (كشيدة)
+_TATWEEL = dict.fromkeys(map(ord, '\u0640'))
+_MATCH_TABLE = {**_BIDI, **_TATWEEL}
+# توحيد علامات الاقتباس العربية/المزخرفة إلى "
+_QUOTES = dict.fromkeys(map(ord, '«»“”'), '"')
+_OUTLINE_TABLE = {**_BIDI_EMBED, **_QUOTES}
+# الأرقام الهندية-العربية التي تعرفها مفاتيح النماذج اليوم (٠ و٥ فقط: 4o و5)
+_MODEL_DIGITS = str.maketrans('٠٥', '05')
+_MODEL_DROP = dict.fromkeys(map(ord, '- '))
+
+# stripTashkeel: U+0617–U+061A و U+064B–U+0652 و U+0670
+_TASHKEEL = dict.fromkeys(
+    list(range(0x0617, 0x061A + 1)) + list(range(0x064B, 0x0652 + 1)) + [0x0670]
+)
+
+# ما يُقص من طرفي العنوان: اقتباسات عربية وإنجليزية وفواصل/نقطتان
+AR_QUOTE_CHARS = '«»“”„‟‚‛'
+EN_QUOTE_CHARS = '"\''
+PUNCT_TO_STRIP = '：:؛،,'
+_TITLE_EDGES = AR_QUOTE_CHARS + EN_QUOTE_CHARS + PUNCT_TO_STRIP
+
+
+def _collapse(s: str) -> str:
+    return ' '.join(s.split())
+
+
+def clean_line(line: str) -> str:
+    """يحذف LRM/RLM ويقص المسافات (سطر واحد، بلا ذاكرة: الأسطر لا تتكرر)."""
+    return line.translate(_BIDI).strip()
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def title_key(s: str) -> str:
+    """تطبيع اسم البوت/التصنيف بإزالة محارف البداية والنهاية والاقتباسات."""
+    if not s:
+        return ""
+    s = s.strip()
+    if s[:1] == '#':  # أزل بادئة # واحدة
+        s = s[1:].lstrip()
+    return _collapse(s.strip(_TITLE_EDGES))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def match_key(s: str) -> str:
+    """تطبيع أخف لاستخدامه في المطابقة التقريبية."""
+    if not s:
+        return ""
+    return _collapse(s.translate(_MATCH_TABLE))
+
+
+def strip_marks(s: str) -> str:
+    """يحذف بادئة ### أو @@@ والمسافات حولها، كـ ``re.sub(r'^\\s*[#@]+\\s*', '', s)``."""
+    t = s.lstrip()
+    if t[:1] in ('#', '@'):
+        return t.lstrip('#@').lstrip()
+    return s
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def outline_key(s: str) -> str:
+    """بلا محارف اتجاه، باقتباسات موحدة، بلا بادئة #/@، ومسافات مطوية."""
+    if not s:
+        return ''
+    return _collapse(strip_marks(s.translate(_OUTLINE_TABLE).strip()))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def model_key(raw: str) -> str:
+    """'GPT-4o' و'نموذج ٥' و'4o mini'... → '4o' / '5' / '4o-mini'؛ غير المعروف كما هو."""
+    token = (raw or '').strip().lower().translate(_MODEL_DIGITS)
+    token = token.replace('gpt-', '').replace('gpt', '')
+    token = token.replace('نموذج', '').replace('نمو', '').translate(_MODEL_DROP)
+    if token in {'4o', '4'}:
+        return '4o'
+    if token in {'4omini', '4omin', '4mini'}:
+        return '4o-mini'
+    if token in {'5'}:
+        return '5'
+    return token or '4o'
+
+
+def strip_tashkeel(s: str) -> str:
+    return s.translate(_TASHKEEL)
+
+
+def normalize_ar(s) -> str:
+    return strip_tashkeel('' if s is None else str(s)).lower()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Prebuilt index for resolving free text to a known bot title.
+
+يُستخدم بدلاً من المسح الخطي في ``best_match_title``:
+- تُطبَّع العناوين مرة واحدة عند البناء.
+- الاحتواء المباشر عبر آلة Aho-Corasick على كل العناوين المطبّعة.
+- المطابقة التقريبية تبدأ بقائمة مرشحين مختصرة من فهرس ثنائيات الحروف
+  (bigrams) ونافذة الأطوال، ثم تُحسب درجة difflib للمرشحين فقط.
+
+النتائج مطابقة تماماً للتنفيذ السابق (``difflib.get_close_matches``):
+المرشح الذي يحقق ``ratio >= cutoff`` لا يمكن أن يُستبعد من القائمة المختصرة،
+لأن كل كتلة تطابق في difflib تشترك بثنائياتها بين النصين، وعدد الكتل محدود
+بعدد المحارف غير المتطابقة (انظر ``_min_shared_bigrams``).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict, deque
+from difflib import SequenceMatcher
+from heapq import nlargest
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def _bigrams(s: str) -> Counter:
+    return Counter(s[i:i + 2] for i in range(len(s) - 1))
+
+
+def _min_shared_bigrams(la: int, lb: int, cutoff: float) -> int:
+    """أدنى عدد ثنائيات مشتركة يلزم لبلوغ ``ratio >= cutoff``.
+
+    إذا كان عدد المحارف المتطابقة M وعدد الكتل k فإن الثنائيات المشتركة
+    لا تقل عن M - k، و k <= (la - M) + (lb - M) + 1، و M >= cutoff*(la+lb)/2،
+    ومنه الحد (1.5*cutoff - 1)*(la+lb) - 1.
+    """
+    bound = (1.5 * cutoff - 1.0) * (la + lb) - 1.0
+    # هامش صغير لأخطاء الفاصلة العائمة
+    return max(0, math.ceil(bound - 1e-9))
+
+
+class _Automaton:
+    """آلة Aho-Corasick بسيطة لإيجاد كل الأنماط الموجودة داخل نص."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[str, ...]] = [()]
+        for pattern in patterns:
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        self.out[node] = self.out[node] + (pattern,)
+
+    def _link(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str) -> set:
+        found = set()
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class TitleIndex:
+    """فهرس العناوين المعروفة مع دالة التطبيع المستخدمة في المطابقة."""
+
+    def __init__(self, titles: Iterable[str], normalize: Callable[[str], str]):
+        self.titles = list(titles)
+        self.normalize = normalize
+        # العنوان الأصلي الأفضل لكل شكل مطبّع في حالة الاحتواء: الأطول ثم الأسبق
+        self._contain_best: Dict[str, Tuple[int, int, str]] = {}
+        # أول عنوان أصلي لكل شكل مطبّع (لإرجاع نتيجة المطابقة التقريبية)
+        self._first_by_norm: Dict[str, str] = {}
+        self._always: Optional[Tuple[int, int, str]] = None
+        for idx, t in enumerate(self.titles):
+            n = normalize(t)
+            self._first_by_norm.setdefault(n, t)
+            if not t:
+                continue
+            rank = (len(t), -idx, t)
+            if not n:
+                # عنوان مطبّع فارغ يحتويه أي نص
+                if self._always is None or rank[:2] > self._always[:2]:
+                    self._always = rank
+                continue
+            best = self._contain_best.get(n)
+            if best is None or rank[:2] > best[:2]:
+                self._contain_best[n] = rank
+        self._automaton = _Automaton(self._contain_best)
+
+        self._norms: List[str] = list(self._first_by_norm)
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for i, n in enumerate(self._norms):
+            self._by_length[len(n)].append(i)
+            for gram, count in _bigrams(n).items():
+                self._postings[gram].append((i, count))
+
+    def contained(self, text_n: str) -> Optional[str]:
+        """أطول عنوان معروف يظهر داخل النص المطبّع."""
+        best = self._always
+        for n in self._automaton.find(text_n):
+            rank = self._contain_best[n]
+            if best is None or rank[:2] > best[:2]:
+                best = rank
+        return best[2] if best else None
+
+    def _shortlist(self, text_n: str, cutoff: float) -> List[int]:
+        lb = len(text_n)
+        # نافذة الأطوال المكافئة لشرط real_quick_ratio
+        lengths = [la for la in self._by_length
+                   if la + lb and 2.0 * min(la, lb) / (la + lb) >= cutoff]
+        if not lengths:
+            return []
+        if 1.5 * cutoff - 1.0 <= 0:
+            return [i for la in lengths for i in self._by_length[la]]
+        shared: Dict[int, int] = defaultdict(int)
+        for gram, count in _bigrams(text_n).items():
+            for i, c in self._postings.get(gram, ()):
+                shared[i] += c if c < count else count
+        out = []
+        for la in lengths:
+            need = _min_shared_bigrams(la, lb, cutoff)
+            for i in self._by_length[la]:
+                if shared.get(i, 0) >= need:
+                    out.append(i)
+        return out
+
+    def close_match(self, text_n: str, cutoff: float = 0.88) -> Optional[str]:
+        """مكافئ ``difflib.get_close_matches(text_n, norms, n=1, cutoff)``."""
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        s = SequenceMatcher()
+        s.set_seq2(text_n)
+        scored = []
+        for i in self._shortlist(text_n, cutoff):
+            x = self._norms[i]
+            s.set_seq1(x)
+            if s.real_quick_ratio() >= cutoff and s.quick_ratio() >= cutoff and s.ratio() >= cutoff:
+                scored.append((s.ratio(), x))
+        if not scored:
+            return None
+        return self._first_by_norm[nlargest(1, scored)[0][1]]
+
+    def match(self, text: str, cutoff: float = 0.88) -> Optional[str]:
+        text_n = self.normalize(text)
+        return self.contained(text_n) or self.close_match(text_n, cutoff)
+
+    def match_kind(self, text: str, cutoff: float = 0.88) -> Tuple[Optional[str], str]:
+        """مثل ``match`` مع نوع النتيجة: 'contained' أو 'fuzzy' أو 'miss'."""
+        text_n = self.normalize(text)
+        title = self.contained(text_n)
+        if title:
+            return title, 'contained'
+        title = self.close_match(text_n, cutoff)
+        return title, ('fuzzy' if title else 'miss')
@@ -1,64 +1,55 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import argparse
 import json
 import os
 import re
 import sys
 from pathlib import Path
-from collections import OrderedDict
 
-try:
-    from docx import Document
-except Exception as e:
-    print("python-docx not installed:", e)
-    sys.exit(1)
+from catalog_model import Bot, Catalog
+from docx_stream import read_lines
+from json_output import write_json
+from line_lexer import BOT, CATEGORY, OUTLINE_LEXER, PACKAGE
+from parse_cache import ParseCache, digest_inputs, file_sha256, fingerprint
+from profiling import PROFILE, add_profile_argument
+from search_index import is_current as search_index_current, write_search_index
+from text_normalize import outline_key as normalize_text, strip_marks
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 PUBLIC_JSON = REPO_ROOT / 'public' / 'new_bots.json'
+SEARCH_INDEX_JSON = REPO_ROOT / 'public' / 'search_index.json'
 
 BASE = Path(__file__).resolve().parent
 HUDUD_PATH = BASE / 'حدود.docx'
 NOBTHA_PATH = BASE / 'نبذة.docx'
 MITHAL_PATH = BASE / 'مثال.docx'
 
+# ارفع الرقم عند تغيير طريقة القراءة حتى تُبطَل نتائج الذاكرة المؤقتة القديمة
+PARSER_VERSION = '1'
+CACHE = ParseCache(version=PARSER_VERSION)
+# أسطر كل ملف في الذاكرة بحسب (mtime, size)؛ تفيد العمليات الطويلة مثل وضع المراقبة
+_LINES = {}
+
 def read_json(path: Path):
     if not path.exists():
         return None
     with path.open('r', encoding='utf-8') as f:
         return json.load(f)
 
-def write_json(path: Path, data):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open('w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
 def read_docx_lines(path: Path):
     if not path.exists():
         return []
-    doc = Document(str(path))
-    lines = []
-    for p in doc.paragraphs:
-        t = (p.text or '').strip()
-        if t:
-            lines.append(t)
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _LINES.get(path)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    lines = CACHE.get_or_compute('lines', path, lambda: read_lines(path))
+    _LINES[path] = (key, lines)
     return lines
 
-AR_QUOTE_CHARS = '"\'\'«»“”‟❝❞＂'
-
-def normalize_text(s: str) -> str:
-    if not s:
-        return ''
-    # Remove directional marks and zero-width
-    s = re.sub(r'[\u200f\u200e\u202a-\u202e\ufeff]', '', s)
-    # Unify quotes
-    s = s.replace('«', '"').replace('»', '"').replace('“', '"').replace('”', '"')
-    # Strip punctuation-like decorations around
-    s = s.strip()
-    s = re.sub(r'^\s*[#@]+\s*', '', s)  # remove leading ### or @@@ markers
-    s = re.sub(r'\s+', ' ', s)
-    return s.strip()
-
 def build_known_map(titles):
     m = {}
     for t in titles:
@@ -80,7 +71,7 @@ def parse_blocks(lines, known_map):
 
     for raw in lines:
         line = raw.strip()
-        line_no_mark = re.sub(r'^\s*[#@]+\s*', '', line)
+        line_no_mark = strip_marks(line)
         norm_line = normalize_text(line)
         norm_no_mark = normalize_text(line_no_mark)
 
@@ -184,70 +175,48 @@ def update_public_json(data, hudud_map, nobtha_map, mithal_map):
 
 # ------------- إضافة الأدوات الجديدة وتصنيفها -------------
 
-def is_package_line(line: str) -> bool:
-    s = re.sub(r'^[#*@\-\s]+', '', line or '')
-    return bool(re.match(r'^(باقة|حزمة)\b', s))
-
-def is_category_line(line: str) -> bool:
-    s = re.sub(r'^[#*@\-\s]+', '', line or '')
-    return bool(re.match(r'^(تصنيف|فئة|مجموعة|قسم|باب)\b', s))
-
-def is_bot_header_line(line: str) -> bool:
-    # Bots غالباً تسبقها # كعنوان
-    return bool(re.match(r'^\s*#+\s*', line or ''))
-
 def parse_hudud_structure(lines):
-    """إرجاع هيكل: OrderedDict{ package -> OrderedDict{ category -> OrderedDict{ botTitle -> hudud_text } } }"""
-    pkgs = OrderedDict()
+    """إرجاع Catalog: باقة ← تصنيف ← بوت، ونص الحدود في bot.limits"""
+    catalog = Catalog()
+    bots = {}  # (باقة، تصنيف، عنوان) → Bot؛ العنوان المكرر يأخذ آخر نص في موضعه الأول
     current_package = None
     current_category = None
     current_bot = None
     buffer = []
 
     def flush_bot():
-        nonlocal buffer, current_package, current_category, current_bot
+        nonlocal buffer
         if current_package and current_category and current_bot:
             text = '\n'.join(buffer).strip()
-            pkgs.setdefault(current_package, OrderedDict())
-            cats = pkgs[current_package]
-            cats.setdefault(current_category, OrderedDict())
-            bots = cats[current_category]
-            bots[current_bot] = text
+            key = (current_package, current_category, current_bot)
+            bot = bots.get(key)
+            if bot is None:
+                bot = bots[key] = Bot(current_bot)
+                catalog.package(current_package).category(current_category).bots.append(bot)
+            bot.limits = text
         buffer = []
 
     for raw in lines:
         line = raw.strip()
         if not line:
             continue
-        # دعم صيغ: "العنوان الرئيسي: ..." و"العنوان الفرعي: ..."
-        m = re.match(r'^\s*(العنوان\s*الرئيسي|العنوان\s*الفرعي)\s*[:：]\s*(.+)$', line)
-        if m:
-            label = m.group(1)
-            value = normalize_text(m.group(2))
-            if 'الرئيسي' in label:
-                flush_bot()
-                current_package = value
-                current_category = None
-                current_bot = None
-            else:
-                flush_bot()
-                current_category = value or 'غير مصنف'
-                current_bot = None
-            continue
-        if is_package_line(line):
+        # "العنوان الرئيسي/الفرعي: ..."، ثم "باقة/حزمة ..." و"تصنيف/فئة/... " بعد
+        # أي بادئة من # * @ -، ثم "#عنوان" (انظر OUTLINE_LEXER)
+        kind, value = OUTLINE_LEXER(line)
+        if kind == PACKAGE:
             flush_bot()
-            current_package = normalize_text(re.sub(r'^[#*@\-\s]+', '', line))
+            current_package = normalize_text(value)
             current_category = None
             current_bot = None
             continue
-        if is_category_line(line):
+        if kind == CATEGORY:
             flush_bot()
-            current_category = normalize_text(re.sub(r'^[#*@\-\s]+', '', line))
+            current_category = normalize_text(value) or 'غير مصنف'
             current_bot = None
             continue
-        if is_bot_header_line(line):
+        if kind == BOT:
             flush_bot()
-            current_bot = normalize_text(re.sub(r'^\s*#+\s*', '', line))
+            current_bot = normalize_text(value)
             # Default category if missing
             if not current_category:
                 current_category = 'غير مصنف'
@@ -257,13 +226,12 @@ def parse_hudud_structure(lines):
             buffer.append(line)
 
     flush_bot()
-    return pkgs
+    return catalog
 
 def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
     """يضيف البوتات غير الموجودة في JSON مع تصنيفها حسب هيكل حدود.docx"""
-    # خرائط بحث سريعة للاسماء المعيارية
-    def norm(s):
-        return normalize_text(s or '')
+    # خرائط بحث سريعة للاسماء المعيارية (normalize_text مخزّنة، فالتكرار لا يكلف)
+    norm = normalize_text
 
     pkg_norm_to_obj = {}
     cat_norm_to_obj = {}
@@ -272,15 +240,17 @@ def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
     max_pkg_id = 0
     for p in data.get('packages', []):
         max_pkg_id = max(max_pkg_id, int(p.get('packageId', 0) or 0))
-        pkg_norm_to_obj[norm(p.get('package',''))] = p
+        p_key = norm(p.get('package',''))
+        pkg_norm_to_obj[p_key] = p
         for c in p.get('categories', []):
-            key = (norm(p.get('package','')), norm(c.get('category','')))
+            key = (p_key, norm(c.get('category','')))
             cat_norm_to_obj[key] = c
             for b in c.get('bots', []):
                 bot_norms.add(norm(b.get('botTitle','')))
 
     created = 0
-    for pkg_name, cats in hudud_pkgs.items():
+    for pkg in hudud_pkgs:
+        pkg_name = pkg.name
         pkg_key = norm(pkg_name)
         pkg_obj = pkg_norm_to_obj.get(pkg_key)
         if not pkg_obj:
@@ -293,7 +263,8 @@ def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
             data.setdefault('packages', []).append(pkg_obj)
             pkg_norm_to_obj[pkg_key] = pkg_obj
 
-        for cat_name, bots_map in cats.items():
+        for cat in pkg:
+            cat_name = cat.name
             cat_key = (pkg_key, norm(cat_name))
             cat_obj = cat_norm_to_obj.get(cat_key)
             if not cat_obj:
@@ -304,7 +275,8 @@ def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
                 pkg_obj['categories'].append(cat_obj)
                 cat_norm_to_obj[cat_key] = cat_obj
 
-            for bot_title, hudud_text in bots_map.items():
+            for bot in cat:
+                bot_title = bot.title
                 bkey = norm(bot_title)
                 if bkey in bot_norms:
                     # سيُحدّث لاحقاً عبر update_public_json
@@ -313,7 +285,7 @@ def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
                 new_bot = {
                     'botTitle': bot_title,
                     'نبذة': nobtha_map.get(bot_title, ''),
-                    'حدود': hudud_text or '',
+                    'حدود': bot.limits,
                     'مثال': mithal_map.get(bot_title, '')
                 }
                 cat_obj['bots'].append(new_bot)
@@ -322,7 +294,44 @@ def add_missing_tools(data, hudud_pkgs, nobtha_map, mithal_map):
 
     return created
 
-def main():
+def run_fingerprint():
+    """بصمة ملفات DOCX مع ملف JSON الحالي؛ تطابقها يعني أن التشغيل لن يغيّر شيئاً."""
+    digests = digest_inputs([HUDUD_PATH, NOBTHA_PATH, MITHAL_PATH])
+    digests['output'] = file_sha256(PUBLIC_JSON)
+    return fingerprint(digests)
+
+def stale_reasons():
+    """أسباب كون new_bots.json أو فهرس البحث قديماً؛ قائمة فارغة إن كان كل شيء محدّثاً."""
+    reasons = []
+    if any(p.exists() for p in (HUDUD_PATH, NOBTHA_PATH, MITHAL_PATH)):
+        if CACHE.get('run', run_fingerprint()) is None:
+            reasons.append('DOCX inputs or public/new_bots.json changed since the last merge')
+    if PUBLIC_JSON.exists() and not search_index_current(PUBLIC_JSON, SEARCH_INDEX_JSON):
+        reasons.append('public/search_index.json does not match public/new_bots.json')
+    return reasons
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge حدود/نبذة/مثال DOCX content into public/new_bots.json')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the parse cache')
+    parser.add_argument('--check', action='store_true', help='Only report whether any output is stale (exit 1 if so)')
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start('update_from_docx', args.profile, args.profile_out)
+    CACHE.enabled = not args.no_cache
+
+    if args.check:
+        reasons = stale_reasons()
+        for reason in reasons:
+            print(f'Stale: {reason}')
+        print('catalog: stale' if reasons else 'catalog: up to date')
+        return 1 if reasons else 0
+
+    if CACHE.get('run', run_fingerprint()) is not None:
+        print('Up to date: DOCX inputs and JSON unchanged since last run.')
+        if PUBLIC_JSON.exists():
+            write_search_index(PUBLIC_JSON, SEARCH_INDEX_JSON, force=False)
+        return 0
+
     data = read_json(PUBLIC_JSON)
     if not data or 'packages' not in data:
         print('No public/new_bots.json found or invalid.')
@@ -338,18 +347,24 @@ def main():
                     titles.append(t)
 
     # ابني الخرائط والنصوص
-    hudud_map, nobtha_map, mithal_map, nobtha_all, mithal_all = build_maps(titles)
+    with PROFILE.stage('build_maps'):
+        hudud_map, nobtha_map, mithal_map, nobtha_all, mithal_all = build_maps(titles)
 
     # هيكل الحدود لتحديد الحِزم/الفئات/العناوين الجديدة
     hudud_lines = read_docx_lines(HUDUD_PATH)
-    hudud_pkgs = parse_hudud_structure(hudud_lines)
+    with PROFILE.stage('parse_hudud_structure'):
+        hudud_pkgs = parse_hudud_structure(hudud_lines)
 
     # أضف البوتات غير الموجودة
-    created = add_missing_tools(data, hudud_pkgs, nobtha_all, mithal_all)
+    with PROFILE.stage('add_missing_tools'):
+        created = add_missing_tools(data, hudud_pkgs, nobtha_all, mithal_all)
 
     # حدّث الموجود
-    updated = update_public_json(data, hudud_map, nobtha_map, mithal_map)
+    with PROFILE.stage('update_public_json'):
+        updated = update_public_json(data, hudud_map, nobtha_map, mithal_map)
     write_json(PUBLIC_JSON, data)
+    CACHE.put('run', run_fingerprint(), {'created': created, 'updated': updated})
+    write_search_index(PUBLIC_JSON, SEARCH_INDEX_JSON)
     print(f'Created: {created}, Updated: {updated}')
     return 0
 
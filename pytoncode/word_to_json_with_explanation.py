@@ -1,9 +1,12 @@
 
-import docx
 import json
 import re
 from pathlib import Path
 
+from docx_stream import iter_texts
+from line_lexer import BOT, CATEGORY, PACKAGE, SEPARATOR, TAG_KINDS, TEXT, lex_combined
+from profiling import PROFILE
+
 """
 هذا السكريبت يقوم باستخراج المحتوى من ملف Word (docx) وتحويله إلى هيكل JSON منظم.
 تعتمد آلية العمل على تحليل الأنماط النصية داخل ملف Word لتحديد العناوين الرئيسية، العناوين الفرعية، عناصر القائمة، وتفاصيل كل عنصر.
@@ -15,10 +18,10 @@ from pathlib import Path
     *   تم تحديد التفاصيل لكل عنصر تبدأ بالرمز (`@`) متبوعًا بالمفتاح والقيمة، بالإضافة إلى الروابط.
 
 2.  **تثبيت المكتبات اللازمة:**
-    *   تم استخدام مكتبة `python-docx` لاستخراج النصوص من ملفات `.docx`. يمكن تثبيتها باستخدام `pip3 install python-docx`.
+    *   لا حاجة لمكتبات خارجية؛ تُقرأ النصوص عبر الوحدة المشتركة `docx_stream` (zipfile + محلل XML تدريجي) من المكتبة القياسية.
 
 3.  **آلية عمل السكريبت (`extract_content_from_docx`):**
-    *   **قراءة المستند:** يستخدم `docx.Document(docx_file_path)` لفتح وقراءة ملف Word.
+    *   **قراءة المستند:** يستخدم `docx_stream.iter_texts(docx_file_path)` لقراءة نص الفقرات مباشرة من `word/document.xml` دون تحميل نموذج python-docx الكامل.
     *   **التكرار على الفقرات:** يقوم السكريبت بالمرور على كل فقرة في المستند.
     *   **تحديد الهيكل:**
         *   **العنوان الرئيسي:** إذا بدأت الفقرة بـ `العنوان الرئيسي:`، يتم اعتبارها عنوانًا رئيسيًا جديدًا ويتم إنشاء مفتاح جديد في قاموس JSON الرئيسي.
@@ -39,7 +42,6 @@ def clean_value(val):
     return val.strip().strip("\'").strip("\"")
 
 def extract_content_from_docx(docx_file_path):
-    document = docx.Document(docx_file_path)
     data = {}
     current_main_title = None
     current_sub_title = None
@@ -68,27 +70,31 @@ def extract_content_from_docx(docx_file_path):
         current_detail_key = None
         current_detail_value_buffer = []
 
-    for paragraph in document.paragraphs:
-        line = paragraph.text.strip()
+    for paragraph_text in iter_texts(docx_file_path):
+        line = paragraph_text.strip()
         if not line:
             continue
 
+        kind, value = lex_combined(line)
+        if kind in (PACKAGE, CATEGORY) and not value.startswith(":"):
+            kind = TEXT
+
         # Check for page breaks or separators that might be in the docx
-        if line.startswith("--- PAGE") or line == "________________________________________":
+        if kind == SEPARATOR:
             save_current_detail()
             continue
 
-        if line.startswith("العنوان الرئيسي:"):
+        if kind == PACKAGE:
             save_current_detail()
-            current_main_title = clean_value(line.replace("العنوان الرئيسي:", ""))
+            current_main_title = clean_value(value[1:])
             data[current_main_title] = {}
             current_sub_title = None
             current_item = None
-        elif line.startswith("العنوان الفرعي:"):
+        elif kind == CATEGORY:
             save_current_detail()
             if current_main_title is not None:
                 # Check if the sub-title line also contains an item title (e.g., "نماذج الابتكار#اقتراح عنوان وفكرة بحث")
-                sub_title_text = line.replace("العنوان الفرعي:", "").strip()
+                sub_title_text = value[1:].strip()
                 if '#' in sub_title_text:
                     parts = sub_title_text.split('#', 1)
                     current_sub_title = clean_value(parts[0])
@@ -106,10 +112,10 @@ def extract_content_from_docx(docx_file_path):
                     current_sub_title = clean_value(sub_title_text)
                     data[current_main_title][current_sub_title] = []
                     current_item = None
-        elif line.startswith("#"):
+        elif kind == BOT:
             save_current_detail()
             if current_main_title is not None and current_sub_title is not None:
-                item_title = clean_value(line[1:])
+                item_title = clean_value(value)
                 current_item = {"title": item_title, "details": {}}
                 data[current_main_title][current_sub_title].append(current_item)
                 # Initialize common detail keys
@@ -117,10 +123,10 @@ def extract_content_from_docx(docx_file_path):
                 current_item["details"]["حدود"] = ""
                 current_item["details"]["مثال"] = ""
                 current_item["details"]["روابط"] = []
-        elif line.startswith("@"):
+        elif kind in TAG_KINDS:
             save_current_detail()
             if current_item is not None:
-                parts = line[1:].split(": ", 1)
+                parts = value.split(": ", 1)
                 key = clean_value(parts[0])
                 value = clean_value(parts[1]) if len(parts) > 1 else ""
                 
@@ -135,9 +141,11 @@ def extract_content_from_docx(docx_file_path):
     return json.dumps(data, ensure_ascii=False, indent=4)
 
 if __name__ == "__main__":
+    PROFILE.start("word_to_json_with_explanation")  # يُفعَّل عبر BOTS_PROFILE=1
     script_dir = Path(__file__).resolve().parent
     docx_file = script_dir / "01.docx"
-    json_output = extract_content_from_docx(str(docx_file))
+    with PROFILE.stage("parse"):
+        json_output = extract_content_from_docx(str(docx_file))
 
     output_path = script_dir / "output_from_docx.json"
     with output_path.open("w", encoding="utf-8") as f:
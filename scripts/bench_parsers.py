@@ -0,0 +1,490 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark every DOCX parser on synthetic Arabic corpora.
+
+يولّد لكل حجم (عدد البوتات) ملفات DOCX اصطناعية بالصيغتين المستخدمتين:
+
+- الملف المجمّع (العنوان الرئيسي/العنوان الفرعي/#عنوان/@نبذة...) مع حالة
+  ``العنوان الفرعي: X#Y`` التي يجمع فيها السطر التصنيف وأول بوت؛
+- الملفات الأربعة حدود/نبذة/مثال/روابط النسخة الكاملة، مع جداول وروابط تشعبية.
+
+ثم يقيس parse_combined_doc وbuild_payload وextract_content_from_docx
+وbuild_json_from_docs وupdate_from_docx.main، ويكتب النتائج بصيغة JSON
+(بوت/ثانية وذروة الذاكرة) ويقارنها بخط أساس محفوظ.
+
+الزمن هو أفضل قيمة من ``--repeat`` تشغيلات بدون tracemalloc، وذروة الذاكرة
+من تشغيل إضافي منفصل تحت tracemalloc (لأنه يبطئ التنفيذ كثيراً).
+
+    python scripts/bench_parsers.py --sizes 100 1000 10000
+    python scripts/bench_parsers.py --sizes 100 1000 --save-baseline
+    python scripts/bench_parsers.py --sizes 100 1000 --fail-on-regression
+
+خط الأساس المحفوظ (scripts/bench_parsers_baseline.json) بالحجمين 100 و1000
+فقط حتى يبقى فحص CI سريعاً؛ الأحجام غير الموجودة فيه لا تُقارن. ذروة الذاكرة
+حتمية تقريباً فتُقارن بـ ``--threshold``، أما الزمن فيختلف من جهاز لآخر، لذا
+يُمرَّر له في CI حد أوسع بـ ``--speed-threshold``. بعد تحسين مقصود أعد توليد
+خط الأساس بـ ``--save-baseline`` (بنفس ``--sizes`` و``--repeat`` الافتراضي، فذروة
+الذاكرة تتأثر بترتيب التشغيلات) وأضفه للـ commit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / 'pytoncode'))
+
+import build_packages_json  # noqa: E402
+import generate_new_bots_json  # noqa: E402
+import sync_combined_doc  # noqa: E402
+import update_from_docx  # noqa: E402
+import word_to_json_with_explanation  # noqa: E402
+from json_output import write_json  # noqa: E402
+
+BENCH_VERSION = 1
+DEFAULT_SIZES = (100, 1000, 10000)
+MAX_SIZE = 50000
+BASELINE_PATH = REPO_ROOT / 'scripts' / 'bench_parsers_baseline.json'
+RESULTS_PATH = REPO_ROOT / 'pytoncode' / '.cache' / 'bench_parsers.json'
+REGRESSION_THRESHOLD = 0.15
+
+BOTS_PER_CATEGORY = 25
+CATEGORIES_PER_PACKAGE = 10
+# كل تصنيف رابع يُكتب بصيغة "العنوان الفرعي: X#Y"
+INLINE_SUBTITLE_EVERY = 4
+
+WORDS = (
+    'مساعد', 'الكتابة', 'البحث', 'العلمي', 'تحليل', 'البيانات', 'المعلم', 'الذكي', 'ترجمة',
+    'النصوص', 'تلخيص', 'المقالات', 'تصميم', 'الدروس', 'مراجعة', 'الأبحاث', 'صياغة', 'الأسئلة',
+    'تدقيق', 'لغوي', 'خطة', 'تسويق', 'محتوى', 'رقمي', 'إدارة', 'المشاريع', 'تعليم', 'البرمجة',
+)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+HYPERLINK_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink'
+OFFICE_DOC_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Type="{OFFICE_DOC_REL}" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+# ======== كاتب DOCX مصغّر ========
+class DocxWriter:
+    """يكتب ملف DOCX صالحاً (فقرات RTL، جداول، روابط تشعبية) بالمكتبة القياسية فقط."""
+
+    def __init__(self):
+        self.body = []
+        self.links = []
+
+    def _run(self, text: str) -> str:
+        return f'<w:r><w:rPr><w:rtl/></w:rPr><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+    def _segments(self, segments) -> str:
+        out = []
+        for seg in segments:
+            if isinstance(seg, tuple):
+                label, url = seg
+                self.links.append(url)
+                out.append(f'<w:hyperlink r:id="rIdL{len(self.links)}">{self._run(label)}</w:hyperlink>')
+            else:
+                out.append(self._run(seg))
+        return f'<w:p><w:pPr><w:bidi/></w:pPr>{"".join(out)}</w:p>'
+
+    def paragraph(self, *segments) -> None:
+        """كل مقطع نص عادي أو (نص، رابط)."""
+        self.body.append(self._segments(segments))
+
+    def table(self, rows) -> None:
+        """rows: قائمة صفوف، وكل خلية قائمة مقاطع كما في paragraph."""
+        width = max(len(row) for row in rows)
+        parts = ['<w:tbl><w:tblPr><w:bidiVisual/></w:tblPr><w:tblGrid>', '<w:gridCol/>' * width, '</w:tblGrid>']
+        for row in rows:
+            parts.append('<w:tr>')
+            for cell in row:
+                parts.append(f'<w:tc><w:tcPr/>{self._segments(cell)}</w:tc>')
+            parts.append('</w:tr>')
+        parts.append('</w:tbl>')
+        self.body.append(''.join(parts))
+
+    def save(self, path: Path) -> Path:
+        document = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+            + ''.join(self.body)
+            + '<w:sectPr/></w:body></w:document>'
+        )
+        rels = ''.join(
+            f'<Relationship Id="rIdL{i}" Type="{HYPERLINK_REL}" Target={quoteattr(url)} TargetMode="External"/>'
+            for i, url in enumerate(self.links, start=1)
+        )
+        document_rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>'
+        )
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('[Content_Types].xml', CONTENT_TYPES)
+            zf.writestr('_rels/.rels', PACKAGE_RELS)
+            zf.writestr('word/document.xml', document)
+            zf.writestr('word/_rels/document.xml.rels', document_rels)
+        return path
+
+
+# ======== المدونة الاصطناعية ========
+def sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_catalog(bots: int, seed: int = 0):
+    """يعيد [(باقة، [(تصنيف، [(عنوان، نبذة، حدود، مثال، رابط 4o، رابط 5)])])] لعدد البوتات المطلوب."""
+    rng = random.Random(seed)
+    packages = []
+    n = 0
+    while n < bots:
+        categories = []
+        p = len(packages) + 1
+        while n < bots and len(categories) < CATEGORIES_PER_PACKAGE:
+            c = len(categories) + 1
+            items = []
+            while n < bots and len(items) < BOTS_PER_CATEGORY:
+                n += 1
+                title = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {n}'
+                slug = f'g-{n:06d}'
+                items.append((
+                    title,
+                    sentence(rng, 18),
+                    '\n'.join(sentence(rng, 10) for _ in range(3)),
+                    sentence(rng, 14),
+                    f'https://chatgpt.com/g/{slug}-mod-4o',
+                    f'https://chatgpt.com/g/{slug}-mod-5',
+                ))
+            categories.append((f'تصنيف {sentence(rng, 2)} {p}-{c}', items))
+        packages.append((f'باقة {sentence(rng, 2)} {p}', categories))
+    return packages
+
+
+def write_combined_doc(catalog, path: Path) -> Path:
+    doc = DocxWriter()
+    for pkg_name, categories in catalog:
+        doc.paragraph(f'العنوان الرئيسي: {pkg_name}')
+        for c, (cat_name, items) in enumerate(categories):
+            for b, (title, about, limits, example, url_4o, url_5) in enumerate(items):
+                if b == 0 and c % INLINE_SUBTITLE_EVERY == INLINE_SUBTITLE_EVERY - 1:
+                    doc.paragraph(f'العنوان الفرعي: {cat_name}#{title}')
+                else:
+                    if b == 0:
+                        doc.paragraph(f'العنوان الفرعي: {cat_name}')
+                    doc.paragraph(f'#{title}')
+                doc.paragraph('@نبذة')
+                doc.paragraph(about)
+                doc.paragraph('@حدود')
+                for line in limits.split('\n'):
+                    doc.paragraph(line)
+                doc.paragraph('@مثال')
+                doc.paragraph(example)
+                doc.paragraph('@روابط')
+                doc.paragraph('@نموذج 4o')
+                doc.paragraph(url_4o)
+                doc.paragraph('@نموذج 5')
+                doc.paragraph(url_5)
+    return doc.save(path)
+
+
+def write_split_docs(catalog, out_dir: Path):
+    """يكتب حدود/نبذة/مثال/روابط النسخة الكاملة ويعيد مساراتها."""
+    hudud, nobtha, mithal, links = DocxWriter(), DocxWriter(), DocxWriter(), DocxWriter()
+    rows = []
+    n = 0
+    for pkg_name, categories in catalog:
+        hudud.paragraph(pkg_name)
+        for cat_name, items in categories:
+            hudud.paragraph(cat_name)
+            for title, about, limits, example, url_4o, url_5 in items:
+                n += 1
+                hudud.paragraph(f'#{title}')
+                for line in limits.split('\n'):
+                    hudud.paragraph(line)
+                # نبذة: أغلبها بصيغة @@@ وبعضها أزواج "العنوان":"النص"
+                if n % 3:
+                    nobtha.paragraph(f'@@@{title}')
+                    nobtha.paragraph(about)
+                else:
+                    nobtha.paragraph(f'"{title}":"{about}"')
+                # مثال: سطر واحد، أو سطران مع "الوصف (مثال):"
+                if n % 2:
+                    mithal.paragraph(f'"{title}": "{example}"')
+                else:
+                    mithal.paragraph(f'"{title}":')
+                    mithal.paragraph(f'الوصف (مثال): "{example}"')
+                # روابط: صفوف جدول، وكل عاشر بوت فقرة حرة خارج الجدول
+                if n % 10:
+                    rows.append([[f'🔗 {title}'], [('نموذج 4o', url_4o)], [('نموذج 5', url_5)]])
+                else:
+                    links.paragraph(f'{title} – ', ('نموذج 4o', url_4o))
+    if rows:
+        links.table(rows)
+    paths = OrderedDict([
+        ('hudud', out_dir / 'حدود.docx'),
+        ('nobtha', out_dir / 'نبذة.docx'),
+        ('mithal', out_dir / 'مثال.docx'),
+        ('links', out_dir / 'روابط النسخة الكاملة.docx'),
+    ])
+    for writer, path in zip((hudud, nobtha, mithal, links), paths.values()):
+        writer.save(path)
+    return paths
+
+
+class Corpus:
+    """ملفات حجم واحد داخل مجلد مؤقت."""
+
+    def __init__(self, bots: int, root: Path, seed: int = 0):
+        self.bots = bots
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        catalog = synthetic_catalog(bots, seed)
+        self.combined = write_combined_doc(catalog, self.root / 'combined.docx')
+        self.split = write_split_docs(catalog, self.root)
+        self.output_json = self.root / 'output.json'
+        self.public_json = self.root / 'new_bots.json'
+        self.search_index = self.root / 'search_index.json'
+        self.seed_json = self.root / 'seed.json'
+
+    def seed_public_json(self) -> None:
+        """new_bots.json ابتدائي بنصف البوتات حتى يمر update_from_docx بمساري الإضافة والتحديث."""
+        if not self.seed_json.exists():
+            with patched(build_packages_json, **self._build_paths()):
+                data = build_packages_json.build_json_from_docs()
+            for pkg in data['packages']:
+                for cat in pkg['categories']:
+                    cat['bots'] = cat['bots'][::2]
+            write_json(self.seed_json, data)
+        self.public_json.write_bytes(self.seed_json.read_bytes())
+
+    def _build_paths(self):
+        return {
+            'HUDUD_PATH': str(self.split['hudud']),
+            'NOBTHA_PATH': str(self.split['nobtha']),
+            'MITHAL_PATH': str(self.split['mithal']),
+            'LINKS_PATH': str(self.split['links']),
+            'OUTPUT_JSON': str(self.output_json),
+        }
+
+
+@contextlib.contextmanager
+def patched(module, **attrs):
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+# ======== الحالات المقاسة ========
+def bench_parse_combined_doc(corpus: Corpus):
+    return lambda: sync_combined_doc.parse_combined_doc(corpus.combined)
+
+
+def bench_build_payload(corpus: Corpus):
+    def run():
+        with patched(generate_new_bots_json, DOC_PATH=corpus.combined):
+            return generate_new_bots_json.build_payload()
+    return run
+
+
+def bench_extract_content_from_docx(corpus: Corpus):
+    return lambda: word_to_json_with_explanation.extract_content_from_docx(str(corpus.combined))
+
+
+def bench_build_json_from_docs(corpus: Corpus):
+    def run():
+        with patched(build_packages_json, **corpus._build_paths()):
+            return build_packages_json.build_json_from_docs()
+    return run
+
+
+def bench_update_from_docx(corpus: Corpus):
+    corpus.seed_public_json()
+    paths = {
+        'HUDUD_PATH': corpus.split['hudud'],
+        'NOBTHA_PATH': corpus.split['nobtha'],
+        'MITHAL_PATH': corpus.split['mithal'],
+        'PUBLIC_JSON': corpus.public_json,
+        'SEARCH_INDEX_JSON': corpus.search_index,
+    }
+
+    def run():
+        with patched(update_from_docx, **paths):
+            status = update_from_docx.main(['--no-cache'])
+        if status:
+            raise RuntimeError(f'update_from_docx.main returned {status}')
+    return run, corpus.seed_public_json
+
+
+# (الاسم، الصيغة، دالة التهيئة) — التهيئة تعيد الدالة المقاسة، أو (الدالة، إعادة الضبط قبل كل تشغيل)
+BENCHMARKS = (
+    ('parse_combined_doc', 'combined', bench_parse_combined_doc),
+    ('build_payload', 'combined', bench_build_payload),
+    ('extract_content_from_docx', 'combined', bench_extract_content_from_docx),
+    ('build_json_from_docs', 'split', bench_build_json_from_docs),
+    ('update_from_docx.main', 'split', bench_update_from_docx),
+)
+
+
+def measure(run, reset, repeat: int):
+    """يعيد (أفضل زمن بالثواني، ذروة الذاكرة بالبايت)."""
+    best = None
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        for _ in range(repeat):
+            if reset:
+                reset()
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if reset:
+            reset()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(sizes, repeat: int = 3, only=None, corpus_dir: Path | None = None, seed: int = 0):
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-parsers-') as tmp:
+        root = Path(corpus_dir) if corpus_dir else Path(tmp)
+        for bots in sizes:
+            start = time.perf_counter()
+            corpus = Corpus(bots, root / f'n{bots}', seed)
+            print(f'Corpus {bots} bots: {time.perf_counter() - start:.2f}s', file=sys.stderr)
+            for name, fmt, setup in BENCHMARKS:
+                if only and name not in only:
+                    continue
+                prepared = setup(corpus)
+                run, reset = prepared if isinstance(prepared, tuple) else (prepared, None)
+                seconds, peak = measure(run, reset, repeat)
+                row = OrderedDict([
+                    ('parser', name),
+                    ('format', fmt),
+                    ('bots', bots),
+                    ('seconds', round(seconds, 6)),
+                    ('botsPerSec', round(bots / seconds, 1) if seconds else None),
+                    ('peakMemBytes', peak),
+                ])
+                results.append(row)
+                print(f"  {name:<28} {row['seconds']:>10.4f}s {row['botsPerSec']:>12,.0f} bots/s "
+                      f"{peak / 1048576:>9.1f} MiB", file=sys.stderr)
+    return OrderedDict([
+        ('version', BENCH_VERSION),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('repeat', repeat),
+        ('seed', seed),
+        ('results', results),
+    ])
+
+
+# ======== المقارنة بخط الأساس ========
+def compare(report, baseline, threshold: float = REGRESSION_THRESHOLD, speed_threshold: float | None = None):
+    """يعيد صفوف المقارنة لكل (محلل، حجم) موجود في الاثنين وعدد التراجعات.
+
+    ``speed_threshold`` حد التباطؤ المسموح (افتراضياً ``threshold``)؛ الذاكرة تُقارن دائماً بـ ``threshold``.
+    """
+    if speed_threshold is None:
+        speed_threshold = threshold
+    base = {(r['parser'], r['bots']): r for r in baseline.get('results', [])}
+    rows, regressions = [], 0
+    for r in report['results']:
+        b = base.get((r['parser'], r['bots']))
+        if not b or not b.get('botsPerSec') or not r.get('botsPerSec'):
+            continue
+        speed = r['botsPerSec'] / b['botsPerSec'] - 1
+        mem = r['peakMemBytes'] / b['peakMemBytes'] - 1 if b.get('peakMemBytes') else 0.0
+        regressed = speed < -speed_threshold or mem > threshold
+        regressions += regressed
+        rows.append((r['parser'], r['bots'], speed, mem, regressed))
+    return rows, regressions
+
+
+def print_comparison(rows) -> None:
+    print(f"{'parser':<28} {'bots':>7} {'speed':>9} {'peak mem':>9}")
+    for parser, bots, speed, mem, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f'{parser:<28} {bots:>7} {speed:>+8.1%} {mem:>+8.1%}{flag}')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DOCX parsers on synthetic Arabic corpora")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f"Corpus sizes in bots (up to {MAX_SIZE:,})")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case; the best one is kept")
+    parser.add_argument('--only', nargs='+', choices=[name for name, _, _ in BENCHMARKS], help="Run only these parsers")
+    parser.add_argument('--out', type=Path, default=RESULTS_PATH, help="Where to write the JSON results")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown / memory growth that counts as a regression")
+    parser.add_argument('--speed-threshold', type=float,
+                        help="Relative slowdown that counts as a regression (defaults to --threshold)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on any regression")
+    parser.add_argument('--corpus-dir', type=Path, help="Keep the generated DOCX files here instead of a temp dir")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic corpus")
+    args = parser.parse_args(argv)
+
+    if any(n < 1 or n > MAX_SIZE for n in args.sizes):
+        parser.error(f"--sizes must be between 1 and {MAX_SIZE}")
+
+    report = run_benchmarks(args.sizes, max(1, args.repeat), args.only, args.corpus_dir, args.seed)
+    write_json(args.out, report)
+    print(f"Wrote {args.out}")
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"Saved baseline {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    rows, regressions = compare(report, json.loads(args.baseline.read_text(encoding='utf-8')),
+                                args.threshold, args.speed_threshold)
+    print_comparison(rows)
+    if regressions:
+        speed_threshold = args.threshold if args.speed_threshold is None else args.speed_threshold
+        print(f"{regressions} regression(s) beyond {speed_threshold:.0%} slowdown / {args.threshold:.0%} memory")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Startup-time budget for the data pipeline scripts.
+
+يشغّل كل سكربت في عملية جديدة بمسارات لا تحتاج إلى المكتبات الثقيلة
+(``--help`` و``--check``) ويقيس زمن التشغيل الكامل (أفضل قيمة من ``--repeat``)،
+ثم يشغّله مرة إضافية تحت ``python -X importtime`` ليتأكد أن python-docx
+وPyMuPDF وPillow لم تُستورد. يفشل (رمز خروج 1) إذا تجاوزت حالةٌ ميزانيتها
+أو استوردت مكتبة ثقيلة، ويكتب النتائج بصيغة JSON.
+
+رمز خروج ``--check`` نفسه (0 أو 1 حسب حداثة المخرجات) لا يُعدّ فشلاً هنا؛
+أي رمز آخر (مثل 2 من argparse) يُعدّ فشلاً.
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --scale 2    # أجهزة CI البطيئة
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / 'pytoncode'))
+
+from json_output import write_json  # noqa: E402
+
+BENCH_VERSION = 1
+RESULTS_PATH = REPO_ROOT / 'pytoncode' / '.cache' / 'bench_startup.json'
+# Wall time per case, interpreter startup included
+DEFAULT_BUDGET = 0.25
+# data_worker --check runs every stage's check (hashes all PDFs and DOCX inputs)
+PIPELINE_BUDGET = 0.5
+# Top-level modules that must not load on these paths
+HEAVY_MODULES = ('docx', 'fitz', 'pymupdf', 'PIL', 'lxml')
+
+# (script, args, budget in seconds)
+CASES = (
+    ('pytoncode/update_from_docx.py', ('--help',), DEFAULT_BUDGET),
+    ('pytoncode/update_from_docx.py', ('--check',), DEFAULT_BUDGET),
+    ('pytoncode/build_packages_json.py', ('--help',), DEFAULT_BUDGET),
+    ('pytoncode/sync_combined_doc.py', ('--help',), DEFAULT_BUDGET),
+    ('pytoncode/search_index.py', ('--check',), DEFAULT_BUDGET),
+    ('pytoncode/artifacts.py', ('--check',), DEFAULT_BUDGET),
+    ('scripts/generate_new_bots_json.py', ('--help',), DEFAULT_BUDGET),
+    ('scripts/build_pdf_search_index.py', ('--help',), DEFAULT_BUDGET),
+    ('scripts/build_pdf_search_index.py', ('--check',), DEFAULT_BUDGET),
+    ('scripts/generate_pdf_thumbs.py', ('--check',), DEFAULT_BUDGET),
+    ('scripts/generate_books.py', ('--help',), DEFAULT_BUDGET),
+    ('scripts/generate_books.py', ('--check',), DEFAULT_BUDGET),
+    ('scripts/data_worker.py', ('--check',), PIPELINE_BUDGET),
+)
+# --check answers "stale" with 1; anything else is a crash or a usage error
+OK_CODES = (0, 1)
+
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+def time_case(argv, repeat: int):
+    """(best wall time in seconds, exit code of the last run)."""
+    best = None
+    code = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(argv, cwd=REPO_ROOT, env=_env(), capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        code = proc.returncode
+    return best, code
+
+
+def imported_modules(argv) -> list:
+    """Top-level package names imported by one run, from ``-X importtime`` on stderr."""
+    proc = subprocess.run([argv[0], '-X', 'importtime', *argv[1:]], cwd=REPO_ROOT, env=_env(),
+                          capture_output=True, text=True, encoding='utf-8', errors='replace')
+    names = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name and name != 'imported package':
+                names.add(name.split('.')[0])
+    return sorted(names)
+
+
+def run_cases(repeat: int, scale: float):
+    results = []
+    for script, args, budget in CASES:
+        argv = [sys.executable, str(REPO_ROOT / script), *args]
+        seconds, code = time_case(argv, repeat)
+        heavy = [name for name in imported_modules(argv) if name in HEAVY_MODULES]
+        limit = budget * scale
+        problems = []
+        if code not in OK_CODES:
+            problems.append(f"exit code {code}")
+        if seconds > limit:
+            problems.append(f"{seconds:.3f}s > {limit:.3f}s budget")
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)}")
+        results.append(OrderedDict([
+            ('case', ' '.join([script, *args])),
+            ('seconds', round(seconds, 4)),
+            ('budget', round(limit, 4)),
+            ('exitCode', code),
+            ('heavyImports', heavy),
+            ('ok', not problems),
+            ('problems', problems),
+        ]))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check that the pipeline scripts start within their time budget")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case; the best one is kept")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument('--out', type=Path, default=RESULTS_PATH, help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    results = run_cases(max(1, args.repeat), args.scale)
+    write_json(args.out, OrderedDict([
+        ('version', BENCH_VERSION),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('repeat', max(1, args.repeat)),
+        ('cases', results),
+    ]))
+
+    width = max(len(r['case']) for r in results)
+    for r in results:
+        status = 'ok' if r['ok'] else 'FAIL: ' + '; '.join(r['problems'])
+        print(f"{r['case']:<{width}}  {r['seconds'] * 1000:7.1f} ms / {r['budget'] * 1000:.0f} ms  {status}")
+    print(f"Wrote {args.out}")
+    failures = sum(not r['ok'] for r in results)
+    if failures:
+        print(f"{failures} case(s) over budget or importing heavy modules")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,60 +1,171 @@
-import { spawnSync } from 'node:child_process';
-import { readFileSync, writeFileSync, existsSync, mkdirSync } from 'node:fs';
+import { spawn, spawnSync } from 'node:child_process';
+import { createInterface } from 'node:readline';
 import { join } from 'node:path';
 
 const repoRoot = process.cwd();
-const pyMerge = join(repoRoot, 'pytoncode', 'update_from_docx.py');
-const pyOutput = join(repoRoot, 'public', 'new_bots.json');
-const publicJson = join(repoRoot, 'public', 'new_bots.json');
+const pyWorker = join(repoRoot, 'scripts', 'data_worker.py');
+const watchMode = process.argv.includes('--watch');
 
-function runPython() {
+// What to say when a stage fails; the site keeps working with the previous outputs
+const STAGE_WARNINGS = {
+  catalog: 'Python merge script failed; keeping the current public/new_bots.json.',
+  search_index: 'Failed to rebuild public/search_index.json.',
+  pdf_index: 'Failed to build public/pdf_search_index.json (pip install pymupdf).',
+  artifacts: 'Failed to write hashed data artifacts; the site falls back to new_bots.json.',
+  thumbs: 'Failed to render the package PDF thumbnails.',
+  books: 'Failed to regenerate src/data/books.js.'
+};
+
+// One long-lived Python process (scripts/data_worker.py) speaking line-delimited
+// JSON-RPC; parsed DOCX/PDF state stays warm across build and watch requests.
+function startWorker(exe) {
+  return new Promise((resolve) => {
+    const child = spawn(exe, [pyWorker], {
+      cwd: repoRoot,
+      stdio: ['pipe', 'pipe', 'inherit'],
+      env: { ...process.env, PYTHONIOENCODING: 'utf-8', PYTHONUNBUFFERED: '1' }
+    });
+    const pending = new Map();
+    let nextId = 1;
+    let exitCode;
+    const worker = {
+      onNotification: () => {},
+      request(method, params = {}) {
+        const id = nextId++;
+        return new Promise((res, rej) => {
+          if (exitCode !== undefined) {
+            rej(new Error(`data worker exited (${exitCode})`));
+            return;
+          }
+          pending.set(id, { res, rej });
+          child.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+        });
+      },
+      close() {
+        child.stdin.end();
+      }
+    };
+    createInterface({ input: child.stdout }).on('line', (line) => {
+      let msg;
+      try {
+        msg = JSON.parse(line);
+      } catch {
+        console.warn(`[data:build] Ignoring worker output: ${line}`);
+        return;
+      }
+      if (msg.id === undefined) {
+        worker.onNotification(msg.method, msg.params);
+        return;
+      }
+      const call = pending.get(msg.id);
+      if (!call) return;
+      pending.delete(msg.id);
+      if (msg.error) call.rej(new Error(msg.error.message));
+      else call.res(msg.result);
+    });
+    // A dead worker surfaces as rejected requests (below), not as an EPIPE crash
+    child.stdin.on('error', () => {});
+    child.on('error', () => resolve(null));
+    child.on('spawn', () => resolve(worker));
+    child.on('exit', (code) => {
+      exitCode = code;
+      for (const call of pending.values()) call.rej(new Error(`data worker exited (${code})`));
+      pending.clear();
+    });
+  });
+}
+
+async function connect() {
   // Try python3 first, then python (Windows typically uses 'python')
   const candidates = process.platform === 'win32' ? ['python', 'python3'] : ['python3', 'python'];
-  let lastRes = null;
   for (const exe of candidates) {
-    const res = spawnSync(exe, [pyMerge], {
-      cwd: repoRoot,
-      stdio: 'pipe',
-      encoding: 'utf8',
-      env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
-    });
-    lastRes = res;
-    if (res.status === 0) return res;
+    const worker = await startWorker(exe);
+    if (!worker) continue;
+    try {
+      await worker.request('status');
+      return worker;
+    } catch {
+      worker.close();
+    }
   }
-  return lastRes;
+  return null;
 }
 
-function safeReadJSON(path) {
-  if (!existsSync(path)) return null;
-  try {
-    const txt = readFileSync(path, 'utf8');
-    return JSON.parse(txt);
-  } catch (e) {
-    return null;
+function report(result, tag = 'data:build') {
+  for (const [stage, res] of Object.entries(result.stages)) {
+    for (const line of res.log) console.log(`[${tag}] ${line}`);
+    if (!res.ok) console.warn(`[${tag}] ${STAGE_WARNINGS[stage] ?? `${stage} failed.`}`);
   }
 }
 
-function ensureDir(path) {
-  try { mkdirSync(path, { recursive: true }); } catch {}
+// Cheap staleness check for CI: exit 1 when any output is out of date
+if (process.argv.includes('--check')) {
+  const exe = process.platform === 'win32' ? 'python' : 'python3';
+  const checkRes = spawnSync(exe, [pyWorker, '--check'], {
+    cwd: repoRoot,
+    stdio: 'inherit',
+    env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+  });
+  process.exit(checkRes.status ?? 1);
 }
 
-const res = runPython();
-if (res && res.status !== 0) {
-  console.warn('[data:build] Python merge script exited with non-zero. Continuing if file updated.');
+const worker = await connect();
+if (!worker) {
+  console.warn('[data:build] Could not start the Python data worker; keeping the committed data files.');
+  process.exit(0);
 }
 
-const dataText = existsSync(pyOutput) ? readFileSync(pyOutput, 'utf8') : null;
-if (!dataText) {
-  console.log('[data:build] No changes to public/new_bots.json');
+// Same outcome as having no worker: warn and build with the committed data files
+function workerFailed(err) {
+  console.warn(`[data:build] Python data worker failed (${err.message}); keeping the committed data files.`);
+  worker.close();
   process.exit(0);
 }
-let data;
+
+// Skip the merge when the DOCX inputs and public/new_bots.json match the last run; the
+// worker writes the JSON itself, so there is nothing to re-serialize here either way
+let result;
 try {
-  data = JSON.parse(dataText);
-} catch (e) {
-  console.error('[data:build] Invalid JSON at public/new_bots.json');
-  process.exit(1);
+  const fresh = await worker.request('unchanged', { stages: ['catalog'] });
+  // The search index is its own stage so it is built from new_bots.json even if the merge fails
+  const stages = fresh.unchanged
+    ? ['search_index', 'pdf_index', 'artifacts']
+    : ['catalog', 'search_index', 'pdf_index', 'artifacts'];
+  result = await worker.request('rebuild', { stages });
+} catch (err) {
+  workerFailed(err);
+}
+report(result);
+if (!result.stages.catalog?.changed) {
+  console.log('[data:build] No changes to public/new_bots.json');
+} else {
+  console.log('[data:build] Merged DOCX updates into public/new_bots.json.');
 }
 
-writeFileSync(publicJson, JSON.stringify(data, null, 2), 'utf8');
-console.log(`[data:build] Merged DOCX updates into ${publicJson}.`);
+if (!watchMode) {
+  worker.close();
+} else {
+  // Same worker: the data it just parsed stays in memory for every rebuild
+  worker.onNotification = (method, params) => {
+    if (method !== 'rebuilt') return;
+    console.log(`[data:watch] changed: ${params.paths.join(', ')}`);
+    report(params, 'data:watch');
+    const seconds = Object.values(params.stages).reduce((sum, s) => sum + s.seconds, 0);
+    console.log(`[data:watch] rebuilt ${Object.keys(params.stages).join(', ')} in ${seconds.toFixed(2)}s`);
+  };
+  const poll = process.argv.includes('--poll');
+  let watching;
+  try {
+    watching = await worker.request('watch', { poll });
+  } catch (err) {
+    workerFailed(err);
+  }
+  console.log(`[data:watch] watching ${watching.roots.join(', ')} (${watching.backend}); Ctrl+C to stop`);
+  if (watching.missing?.length) {
+    console.log(`[data:watch] waiting for ${watching.missing.join(', ')} to be created`);
+  }
+  process.on('SIGINT', () => {
+    worker.close();
+    process.exit(0);
+  });
+}
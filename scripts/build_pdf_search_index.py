@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Build a full-text search index over the package guide PDFs.
+
+Requirements:
+  pip install pymupdf
+
+What it does:
+  - Extracts the text of every page of public/categorysPdf/with-info/*.pdf,
+    in a process pool, keeping page numbers
+  - Normalizes it exactly like the catalog (search_index.normalize_ar: tashkeel
+    stripped, lower-cased) and splits it into word tokens (punctuation dropped,
+    tokens shorter than MIN_TOKEN skipped)
+  - Writes a compact inverted index, public/pdf_search_index.json:
+        {"version", "minToken", "pdfs": [{"file", "pages", "hash"}],
+         "terms": {token: [pdf, page, pdf, page, ...]}}
+    where pdf is a position in "pdfs" and page is 1-based, so the site can
+    open "<file>#page=<page>" without downloading every PDF first
+  - Caches each PDF's per-page tokens by content hash (pytoncode/.cache/pdf_text), so
+    only PDFs whose hash changed are reopened; the index file is rewritten
+    only when its content changes
+
+Usage:
+  python scripts/build_pdf_search_index.py [--jobs N] [--force] [--check] [--profile [PATH]]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import sys
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "pytoncode"))
+
+from json_output import dumps_bytes, write_bytes_atomic  # noqa: E402
+from parse_cache import DEFAULT_CACHE_DIR, ParseCache, file_sha256  # noqa: E402
+from profiling import PROFILE, add_profile_argument  # noqa: E402
+from search_index import normalize_ar  # noqa: E402
+
+PUBLIC_DIR = ROOT / "public"
+PDF_DIR = PUBLIC_DIR / "categorysPdf" / "with-info"
+INDEX_PATH = PUBLIC_DIR / "pdf_search_index.json"
+INDEX_VERSION = 1
+MIN_TOKEN = 2
+HASH_LENGTH = 12
+# Bump when extraction or tokenization changes; invalidates the cached page tokens
+EXTRACT_VERSION = "1"
+CACHE_DIR = DEFAULT_CACHE_DIR / "pdf_text"
+CACHE_NAMESPACE = "pdf_page_tokens"
+# Tokens per page by PDF digest, kept for the life of the process (watch mode)
+_PAGES = {}
+
+_WORD = re.compile(r"\w+")
+
+def page_tokens(text: str) -> list:
+    """Sorted distinct tokens of one page."""
+    return sorted({tok for tok in _WORD.findall(normalize_ar(text)) if len(tok) >= MIN_TOKEN})
+
+def extract_pdf(pdf_path: str):
+    """Worker entry point: pdf path -> (pdf path, tokens per page, error or None)."""
+    import fitz  # PyMuPDF; only needed for PDFs missing from the cache
+
+    try:
+        doc = fitz.open(pdf_path)
+        try:
+            pages = [page_tokens(page.get_text("text")) for page in doc]
+        finally:
+            doc.close()
+    except Exception as exc:  # reported per PDF; the rest of the batch continues
+        return pdf_path, None, f"{type(exc).__name__}: {exc}"
+    return pdf_path, pages, None
+
+def extract_all(pdfs, jobs: int, cache: ParseCache, force: bool = False):
+    """Tokens per page for every PDF, reopening only those missing from the cache."""
+    digests = {pdf: file_sha256(pdf) for pdf in pdfs}
+    pages_by_pdf = {}
+    todo = []
+    for pdf in pdfs:
+        cached = None if force else _PAGES.get(digests[pdf]) or cache.get(CACHE_NAMESPACE, digests[pdf])
+        if cached is not None:
+            pages_by_pdf[pdf] = _PAGES[digests[pdf]] = cached
+        else:
+            todo.append(str(pdf))
+
+    print(f"PDF text: {len(todo)} to extract, {len(pdfs) - len(todo)} cached")
+    if todo:
+        try:
+            import fitz  # noqa: F401
+        except ImportError:
+            print("Missing dependency: PyMuPDF. Install with: pip install pymupdf", file=sys.stderr)
+            sys.exit(1)
+    with PROFILE.stage("pdf_index.extract"):
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                results = list(pool.map(extract_pdf, todo))
+        else:
+            results = [extract_pdf(path) for path in todo]
+
+    failures = 0
+    for path, pages, error in results:
+        pdf = Path(path)
+        if error:
+            failures += 1
+            print(f"Failed to extract: {pdf.name}: {error}", file=sys.stderr)
+            continue
+        cache.put(CACHE_NAMESPACE, digests[pdf], pages)
+        pages_by_pdf[pdf] = _PAGES[digests[pdf]] = pages
+        print(f"Extracted: {pdf.name} ({len(pages)} pages)")
+    for stale in set(_PAGES) - set(digests.values()):
+        del _PAGES[stale]
+    return pages_by_pdf, digests, failures
+
+def build_pdf_index(pdfs, pages_by_pdf, digests):
+    docs = []
+    postings = defaultdict(list)
+    for pdf in pdfs:
+        pages = pages_by_pdf.get(pdf)
+        if pages is None:
+            continue
+        doc_id = len(docs)
+        docs.append(OrderedDict([
+            ("file", pdf.relative_to(PUBLIC_DIR).as_posix()),
+            ("pages", len(pages)),
+            ("hash", digests[pdf][:HASH_LENGTH]),
+        ]))
+        for page_no, tokens in enumerate(pages, 1):
+            for tok in tokens:
+                postings[tok].extend((doc_id, page_no))
+    return OrderedDict([
+        ("version", INDEX_VERSION),
+        ("minToken", MIN_TOKEN),
+        ("pdfs", docs),
+        ("terms", OrderedDict((term, postings[term]) for term in sorted(postings))),
+    ])
+
+def stale_reasons(pdf_dir: Path = PDF_DIR, out: Path = INDEX_PATH) -> list:
+    """Why a run would change the index (PDFs added, removed or edited); empty when up to date."""
+    try:
+        index = json.loads(out.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return [f"missing: {out.name}"]
+    if index.get("version") != INDEX_VERSION or index.get("minToken") != MIN_TOKEN:
+        return [f"index format changed: {out.name}"]
+    indexed = {doc["file"]: doc["hash"] for doc in index.get("pdfs", [])}
+    current = {pdf.relative_to(PUBLIC_DIR).as_posix(): file_sha256(pdf)[:HASH_LENGTH]
+               for pdf in sorted(pdf_dir.resolve().glob("*.pdf"))}
+    reasons = [f"not indexed: {name}" for name in current if name not in indexed]
+    reasons += [f"changed: {name}" for name in current if name in indexed and indexed[name] != current[name]]
+    reasons += [f"removed: {name}" for name in indexed if name not in current]
+    return reasons
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build public/pdf_search_index.json from the package guide PDFs")
+    parser.add_argument("--pdf-dir", type=Path, default=PDF_DIR, help="Directory of PDFs to index (inside public/)")
+    parser.add_argument("--out", type=Path, default=INDEX_PATH, help="Index output path")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes for extraction (default: CPU count, 1 = serial)")
+    parser.add_argument("--force", action="store_true", help="Re-extract every PDF even if its text is cached")
+    parser.add_argument("--check", action="store_true", help="Only report whether the index is stale (exit 1 if so)")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start("pdf_search_index", args.profile, args.profile_out)
+
+    if args.check:
+        reasons = stale_reasons(args.pdf_dir, args.out)
+        for reason in reasons:
+            print(f"Stale: {reason}")
+        print("pdf_index: stale" if reasons else "pdf_index: up to date")
+        sys.exit(1 if reasons else 0)
+
+    pdfs = sorted(args.pdf_dir.resolve().glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {args.pdf_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    cache = ParseCache(CACHE_DIR, version=EXTRACT_VERSION)
+    pages_by_pdf, digests, failures = extract_all(pdfs, args.jobs or os.cpu_count() or 1, cache, force=args.force)
+    with PROFILE.stage("pdf_index.build"):
+        index = build_pdf_index(pdfs, pages_by_pdf, digests)
+    raw = dumps_bytes(index, indent=None)
+    if args.out.exists() and args.out.read_bytes() == raw:
+        print(f"Unchanged {args.out}")
+    else:
+        write_bytes_atomic(args.out, raw)
+        print(f"Wrote {args.out} ({len(index['terms'])} terms, {len(raw)} bytes)")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Round-trip check for the compact catalog schema.
+
+يبني ملف DOCX اصطناعياً (مجموعة bench_parsers مع حالات حدّية: روابط إضافية
+تنتج ``linksList``، وبوتات بلا روابط أو بحقول فارغة)، ثم يشغّل المولّدين
+generate_new_bots_json وsync_combined_doc مرتين: بالشكل الكامل وبـ
+``--compact``، ويتأكد أن ``catalog_schema.expand_aliases`` على الناتج المضغوط
+يعيد الشكل الكامل بايتاً ببايت. يفشل (رمز خروج 1) عند أي اختلاف.
+
+    python scripts/check_catalog_schema.py
+    python scripts/check_catalog_schema.py --bots 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / 'pytoncode'))
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+import generate_new_bots_json  # noqa: E402
+import sync_combined_doc  # noqa: E402
+from bench_parsers import DocxWriter, patched, synthetic_catalog, write_combined_doc  # noqa: E402
+from catalog_schema import expand_aliases  # noqa: E402
+from json_output import dumps_bytes  # noqa: E402
+
+DEFAULT_BOTS = 200
+
+# بوتات بروابط إضافية (linksList)، وبلا أي رابط، وبحقول فارغة
+EDGE_PARAGRAPHS = (
+    'العنوان الرئيسي: باقة الحالات الحدية',
+    'العنوان الفرعي: روابط',
+    '#بوت بروابط إضافية',
+    '@نبذة', 'نبذة قصيرة',
+    '@نموذج 4o', 'https://edge.example/4o',
+    '@روابط', 'https://edge.example/extra-1 https://edge.example/extra-2 نص',
+    '#بوت بلا روابط',
+    '@نبذة', 'بلا أي رابط',
+    '@حدود', 'حد',
+    'العنوان الفرعي: حقول فارغة',
+    '#بوت فارغ',
+    '@روابط', 'https://edge.example/only-extra',
+    '#بوت بلا حقول',
+)
+
+
+def write_edge_doc(path: Path) -> Path:
+    doc = DocxWriter()
+    for text in EDGE_PARAGRAPHS:
+        doc.paragraph(text)
+    return doc.save(path)
+
+
+def round_trip(build) -> bool:
+    """هل expand_aliases(build(compact=True)) يطابق build() بايتاً ببايت؟"""
+    return dumps_bytes(expand_aliases(build(compact=True))) == dumps_bytes(build())
+
+
+def check(doc: Path) -> list:
+    """أسماء المولّدات التي لا يعيد ناتجها المضغوط الشكل الكامل."""
+    failures = []
+    with patched(generate_new_bots_json, DOC_PATH=doc):
+        if not round_trip(generate_new_bots_json.build_payload):
+            failures.append('generate_new_bots_json')
+    catalog = sync_combined_doc.parse_combined_doc(doc)
+    if not round_trip(lambda compact=False: sync_combined_doc.build_payload(catalog, {}, compact=compact)):
+        failures.append('sync_combined_doc')
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check that expanding --compact output reproduces the full catalog")
+    parser.add_argument('--bots', type=int, default=DEFAULT_BOTS, help="Bots in the synthetic corpus")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic corpus")
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix='check-catalog-schema-') as tmp:
+        docs = (
+            ('edge', write_edge_doc(Path(tmp) / 'edge.docx')),
+            (f'corpus {args.bots}', write_combined_doc(synthetic_catalog(args.bots, args.seed), Path(tmp) / 'combined.docx')),
+        )
+        for name, doc in docs:
+            failures = check(doc)
+            failed = failed or bool(failures)
+            print(f"{name}: {'round-trip mismatch in ' + ', '.join(failures) if failures else 'ok'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Long-lived data worker for scripts/build_data.mjs.
+
+Speaks line-delimited JSON-RPC 2.0 on stdin/stdout: one request per line in,
+one response (or notification) per line out. The pipeline stages from
+watch_data.py run in this process, so python-docx/PyMuPDF are imported once
+and parsed DOCX lines and PDF page tokens stay warm between requests.
+
+Methods:
+  rebuild    {"stages": [...]} or {"paths": [...]}   (default: BUILD_STAGES)
+             -> {"ok", "changed", "stages": {name: {"ok", "changed", "seconds", "log"}}}
+             "changed" compares the content hashes of the stage outputs
+  unchanged  {"stages": [...]}
+             -> {"unchanged", "stages": {name: bool}, "reasons": {name: [...]}};
+             true when the stage inputs and outputs still match its last
+             successful rebuild here (stat-based), otherwise when the stage's
+             own stale_reasons() check finds nothing
+  status     {} -> {"pid", "uptime", "requests", "python", "watching", "stages"}
+  watch      {"debounce", "poll"} -> {"backend", "roots", "missing"}; starts watch_data's watcher in a thread
+             (roots listed under "missing" are picked up once they are created);
+             every rebuild is sent as a "rebuilt" notification with the
+             rebuild result plus the changed "paths"
+
+Anything a stage prints goes into its "log"; stray output (native code,
+subprocesses) is redirected to stderr so stdout carries only JSON-RPC.
+
+Usage:
+  python scripts/data_worker.py     (started by node scripts/build_data.mjs)
+  python scripts/data_worker.py --check [--stages ...]
+      one-shot: print why each stage is stale and exit 1 if any is (CI)
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+
+from watch_data import (  # also puts pytoncode/ on sys.path
+    BOOK_PDF_DIR, CATALOG_DOCS, CATEGORY_PDF_DIR, DEBOUNCE, POLL_INTERVAL, PYTONCODE_DIR, ROOT,
+    STAGE_ORDER, STALE_CHECKS, THUMBS_DIR, WITH_INFO_DIR, make_watcher, plan_stages, root_names, run_stage,
+    watch,
+)
+from parse_cache import file_sha256  # noqa: E402
+
+PUBLIC_DIR = ROOT / "public"
+DATA_DIR = ROOT / "src" / "data"
+# What build_data.mjs runs on a plain build
+BUILD_STAGES = ("catalog", "search_index", "pdf_index", "artifacts")
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+def _pdfs(directory: Path, recursive: bool = False) -> list:
+    if not directory.is_dir():
+        return []
+    found = directory.rglob("*.pdf") if recursive else directory.glob("*.pdf")
+    return sorted(p for p in found if THUMBS_DIR not in p.parents)
+
+def stage_inputs(stage: str) -> list:
+    if stage == "catalog":
+        return [PYTONCODE_DIR / name for name in CATALOG_DOCS]
+    if stage == "search_index":
+        return [PUBLIC_DIR / "new_bots.json"]
+    if stage == "pdf_index":
+        return _pdfs(WITH_INFO_DIR)
+    if stage == "artifacts":
+        return [PUBLIC_DIR / "new_bots.json", PUBLIC_DIR / "search_index.json", PUBLIC_DIR / "pdf_search_index.json"]
+    if stage == "thumbs":
+        return _pdfs(CATEGORY_PDF_DIR, recursive=True)
+    if stage == "books":
+        return _pdfs(BOOK_PDF_DIR)
+    return []
+
+def stage_outputs(stage: str) -> list:
+    return {
+        "catalog": [PUBLIC_DIR / "new_bots.json", PUBLIC_DIR / "search_index.json"],
+        "search_index": [PUBLIC_DIR / "search_index.json"],
+        "pdf_index": [PUBLIC_DIR / "pdf_search_index.json"],
+        "artifacts": [PUBLIC_DIR / "data" / "manifest.json"],
+        "thumbs": [DATA_DIR / "packagePdfs.json", DATA_DIR / "packagePdfsManifest.json"],
+        "books": [DATA_DIR / "books.js", PUBLIC_DIR / "books_text.json"],
+    }.get(stage, [])
+
+def stat_fingerprint(paths) -> list:
+    """(path, mtime, size) for each path; cheap enough to answer "unchanged" on every build."""
+    out = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            out.append([str(path), None, None])
+            continue
+        out.append([str(path), st.st_mtime_ns, st.st_size])
+    return out
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+class DataWorker:
+    def __init__(self, channel):
+        self.channel = channel
+        self.started = time.time()
+        self.requests = 0
+        self.lock = threading.Lock()  # one rebuild at a time (requests and the watcher thread)
+        self.write_lock = threading.Lock()
+        self.fingerprints = {}  # stage -> stat fingerprint after its last successful run
+        self.last = OrderedDict()  # stage -> summary of its last run
+        self.watching = None
+
+    # ---------- transport ----------
+    def send(self, message) -> None:
+        line = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+        with self.write_lock:
+            self.channel.write(line + "\n")
+            self.channel.flush()
+
+    def notify(self, method: str, params) -> None:
+        self.send(OrderedDict([("jsonrpc", "2.0"), ("method", method), ("params", params)]))
+
+    def handle_line(self, line: str) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            self.send(OrderedDict([("jsonrpc", "2.0"), ("id", None),
+                                   ("error", {"code": PARSE_ERROR, "message": str(exc)})]))
+            return
+        req_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "Expected an object with a method")
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            handler = getattr(self, f"rpc_{request['method']}", None)
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Unknown method: {request['method']}")
+            # Only a params/signature mismatch is INVALID_PARAMS; a TypeError inside the handler is a bug
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as exc:
+                raise RpcError(INVALID_PARAMS, str(exc)) from None
+            self.requests += 1
+            result = handler(**params)
+        except RpcError as exc:
+            response = OrderedDict([("jsonrpc", "2.0"), ("id", req_id),
+                                    ("error", {"code": exc.code, "message": str(exc)})])
+        except Exception as exc:
+            # Keep serving: log the traceback and answer with an internal error
+            traceback.print_exc(file=sys.stderr)
+            response = OrderedDict([("jsonrpc", "2.0"), ("id", req_id),
+                                    ("error", {"code": INTERNAL_ERROR, "message": f"{type(exc).__name__}: {exc}"})])
+        else:
+            response = OrderedDict([("jsonrpc", "2.0"), ("id", req_id), ("result", result)])
+        # Requests without an id are notifications and get no response
+        if not isinstance(request, dict) or "id" in request:
+            self.send(response)
+
+    # ---------- stages ----------
+    def _check_stages(self, stages):
+        unknown = [s for s in stages if s not in STAGE_ORDER]
+        if unknown:
+            raise RpcError(INVALID_PARAMS, f"Unknown stages: {', '.join(unknown)}")
+        return [s for s in STAGE_ORDER if s in stages]
+
+    def run(self, stages, compress: bool = True):
+        """Run the stages in order; only the watcher passes compress=False."""
+        results = OrderedDict()
+        with self.lock:
+            for stage in stages:
+                outputs = stage_outputs(stage)
+                before = [file_sha256(p) for p in outputs]
+                log = io.StringIO()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(log):
+                    ok = run_stage(stage, compress)
+                seconds = round(time.perf_counter() - start, 4)
+                changed = [file_sha256(p) for p in outputs] != before
+                # An artifacts run without .gz/.br is not a full build; keep it stale for the next one
+                if ok and (compress or stage != "artifacts"):
+                    self.fingerprints[stage] = stat_fingerprint(stage_inputs(stage) + outputs)
+                else:
+                    self.fingerprints.pop(stage, None)
+                results[stage] = OrderedDict([
+                    ("ok", ok), ("changed", changed), ("seconds", seconds),
+                    ("log", log.getvalue().splitlines()),
+                ])
+                self.last[stage] = OrderedDict([("ok", ok), ("changed", changed), ("seconds", seconds),
+                                                ("at", round(time.time(), 3))])
+        return OrderedDict([
+            ("ok", all(r["ok"] for r in results.values())),
+            ("changed", any(r["changed"] for r in results.values())),
+            ("stages", results),
+        ])
+
+    def stale_reasons(self, stage: str) -> list:
+        recorded = self.fingerprints.get(stage)
+        if recorded is not None and recorded == stat_fingerprint(stage_inputs(stage) + stage_outputs(stage)):
+            return []
+        return check_stage(stage)
+
+    # ---------- methods ----------
+    def rpc_rebuild(self, stages=None, paths=None):
+        if paths is not None:
+            stages = plan_stages(Path(p).resolve() for p in paths)
+        stages = self._check_stages(BUILD_STAGES if stages is None else stages)
+        return self.run(stages)
+
+    def rpc_unchanged(self, stages=None):
+        stages = self._check_stages(BUILD_STAGES if stages is None else stages)
+        with self.lock:
+            reasons = OrderedDict((stage, self.stale_reasons(stage)) for stage in stages)
+        return OrderedDict([
+            ("unchanged", not any(reasons.values())),
+            ("stages", OrderedDict((stage, not r) for stage, r in reasons.items())),
+            ("reasons", reasons),
+        ])
+
+    def rpc_status(self):
+        return OrderedDict([
+            ("pid", os.getpid()),
+            ("uptime", round(time.time() - self.started, 3)),
+            ("requests", self.requests),
+            ("python", sys.version.split()[0]),
+            ("watching", self.watching),
+            ("stages", self.last),
+        ])
+
+    def rpc_watch(self, debounce=DEBOUNCE, poll=False, interval=POLL_INTERVAL):
+        try:
+            debounce, interval = float(debounce), float(interval)
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, "debounce and interval must be numbers") from None
+        if self.watching is None:
+            watcher = make_watcher(bool(poll), interval)
+
+            def rebuild(paths, stages):
+                result = self.run(stages, compress=False)
+                result["paths"] = [str(p.relative_to(ROOT)) for p in paths]
+                self.notify("rebuilt", result)
+
+            thread = threading.Thread(target=watch, args=(watcher, debounce, rebuild), daemon=True)
+            thread.start()
+            self.watching = OrderedDict([
+                ("backend", watcher.name),
+                ("roots", root_names()),
+                ("missing", root_names(present=False)),
+            ])
+        return self.watching
+
+def check_stage(stage: str) -> list:
+    """The stage's own staleness check; a check that fails counts as stale."""
+    try:
+        return list(STALE_CHECKS[stage]())
+    except SystemExit as exc:
+        return [f"check exited with {exc.code}"]
+    except Exception as exc:
+        return [f"check failed: {type(exc).__name__}: {exc}"]
+
+def check(stages) -> int:
+    stale = False
+    for stage in stages:
+        reasons = check_stage(stage)
+        stale = stale or bool(reasons)
+        for reason in reasons:
+            print(f"{stage}: {reason}")
+        print(f"{stage}: {'stale' if reasons else 'up to date'}")
+    return 1 if stale else 0
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="JSON-RPC data worker for build_data.mjs, or a one-shot staleness check")
+    parser.add_argument("--check", action="store_true", help="Report stale outputs and exit 1 if any (no worker)")
+    parser.add_argument("--stages", nargs="+", choices=STAGE_ORDER, default=list(STAGE_ORDER), help="Stages to check")
+    args = parser.parse_args(argv)
+    if args.check:
+        sys.exit(check([s for s in STAGE_ORDER if s in args.stages]))
+
+    # Keep the real stdout for JSON-RPC; everything else written to fd 1 lands on stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    worker = DataWorker(channel)
+    for line in sys.stdin:
+        if line.strip():
+            worker.handle_line(line)
+
+if __name__ == "__main__":
+    main()
@@ -4,33 +4,120 @@ Generate src/data/books.js and cover images from PDFs in src/assets/pdfs.
 
 Requirements:
   pip install pymupdf
+  pip install pillow   # optional: WebP (and AVIF, when the build supports it) variants
 
 What it does:
-  - Renders the first page of each PDF to a JPG in src/assets/covers
+  - Renders the first page of each PDF to a JPG in src/assets/covers, in a
+    process pool, skipping covers whose PDF hash and render settings match the
+    sidecar cache (src/assets/covers/.covers-cache.json)
+  - From the same rasterization, writes WebP/AVIF copies at several widths to
+    src/assets/covers/variants plus a tiny blur placeholder, and records their
+    size metadata and srcset strings on each BOOKS entry
   - Creates src/data/books.js with import statements for each PDF and cover
-  - Assigns titles from a provided Arabic list (if count matches/order of PDFs)
+    (rewritten only when its content changes)
+  - From the same fitz.open, reads the page count, embedded title/author and the
+    text of the first TEXT_PAGES pages (cached with the cover, so unchanged PDFs
+    are never reopened); file size comes from stat
+  - Assigns titles from a provided Arabic list (if count matches/order of PDFs),
+    otherwise from the PDF's embedded title, then the list, then the file slug
+  - Writes public/books_text.json with title, author, pages, size and the
+    extracted text (plus a normalized searchText) for client-side search; the
+    text stays out of books.js so the bundle does not grow. public/books.json is
+    the hand-curated book list (bk-NN entries) and is never touched here
 
 Usage:
-  python scripts/generate_books.py
+  python scripts/generate_books.py [--jobs N] [--force]
 
 Customize the ARABIC_TITLES list below to match your desired titles.
 """
 from __future__ import annotations
+import argparse
+import base64
+import io
+import json
 import os
 import re
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-try:
-    import fitz  # PyMuPDF
-except ImportError:
-    print("Missing dependency: PyMuPDF. Install with: pip install pymupdf", file=sys.stderr)
-    sys.exit(1)
+# PyMuPDF and Pillow are imported by load_backends() on the render paths only, so
+# --help, --check and runs where every cover is current never pay for them
+fitz = None
+Image = None
+pil_features = None
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "pytoncode"))
+
+from json_output import dumps, write_bytes_atomic, write_json, write_text_atomic  # noqa: E402
+from parse_cache import file_sha256  # noqa: E402
+from profiling import PROFILE, add_profile_argument  # noqa: E402
+from search_index import normalize_ar  # noqa: E402
+
 PDF_DIR = ROOT / "src" / "assets" / "pdfs"
 COVERS_DIR = ROOT / "src" / "assets" / "covers"
 OUT_JS = ROOT / "src" / "data" / "books.js"
+# Not public/books.json: that file is curated by hand with its own schema
+OUT_JSON = ROOT / "public" / "books_text.json"
+COVER_CACHE = COVERS_DIR / ".covers-cache.json"
+VARIANT_DIR_NAME = "variants"
+
+VARIANT_WIDTHS = (320, 480, 640, 960)
+VARIANT_OPTIONS = {
+    "avif": {"quality": 60, "speed": 6},
+    "webp": {"quality": 75, "method": 6},
+}
+PLACEHOLDER_WIDTH = 16
+# Pages whose text goes into public/books_text.json for search
+TEXT_PAGES = 3
+
+def _has_avif() -> bool:
+    if Image is None:
+        return False
+    try:
+        import pillow_avif  # noqa: F401  (plugin for Pillow builds without AVIF)
+    except ImportError:
+        pass
+    return "AVIF" in Image.SAVE or bool(pil_features.check("avif"))
+
+def _variant_formats():
+    if Image is None:
+        return []
+    return (["avif"] if _has_avif() else []) + ["webp"]
+
+# Anything that changes the rendered files; a mismatch re-renders the cover.
+# load_backends() adds the library versions and the variant formats Pillow supports.
+RENDER_SETTINGS = OrderedDict([
+    ("page", 0),
+    ("zoom", 2.0),
+    ("format", "jpg"),
+    ("widths", list(VARIANT_WIDTHS)),
+    ("placeholderWidth", PLACEHOLDER_WIDTH),
+    ("textPages", TEXT_PAGES),
+])
+
+def load_backends() -> None:
+    """Import PyMuPDF (required) and Pillow (optional) once and complete RENDER_SETTINGS."""
+    global fitz, Image, pil_features
+    if fitz is not None:
+        return
+    try:
+        import fitz as pymupdf  # PyMuPDF
+    except ImportError:
+        print("Missing dependency: PyMuPDF. Install with: pip install pymupdf", file=sys.stderr)
+        sys.exit(1)
+    try:
+        from PIL import Image as pil_image, features as pil_feature_checks
+    except ImportError:  # variants are optional; the JPG cover is always written
+        pil_image = pil_feature_checks = None
+    fitz, Image, pil_features = pymupdf, pil_image, pil_feature_checks
+    RENDER_SETTINGS.update([
+        ("pymupdf", fitz.VersionBind),
+        ("pillow", getattr(sys.modules.get("PIL"), "__version__", None)),
+        ("formats", _variant_formats()),
+    ])
 
 # Titles provided by the user; order will map to sorted PDFs if counts allow
 ARABIC_TITLES = [
@@ -50,39 +137,286 @@ def slugify(name: str) -> str:
     base = re.sub(r"[^\w\-\u0600-\u06FF]+", "-", base, flags=re.UNICODE).strip("-")
     return base or "book"
 
-def render_cover(pdf_path: Path, out_path: Path, zoom: float = 2.0) -> None:
+def _variant_path(cover_path: Path, width: int, fmt: str) -> Path:
+    return cover_path.parent / VARIANT_DIR_NAME / f"{cover_path.stem}-{width}.{fmt}"
+
+def _placeholder(pix, image) -> str:
+    """A few hundred bytes data URI, shown blurred while the real cover loads."""
+    height = max(1, round(pix.height * PLACEHOLDER_WIDTH / pix.width))
+    if image is not None:
+        buf = io.BytesIO()
+        image.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS).save(buf, "WEBP", quality=30, method=6)
+        mime, raw = "image/webp", buf.getvalue()
+    else:
+        mime, raw = "image/png", fitz.Pixmap(pix, PLACEHOLDER_WIDTH, height, None).tobytes("png")
+    return f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
+
+def encode_variants(pix, cover_path: Path):
+    """Downscale the already rendered pixmap to every width/format; returns (variants, placeholder)."""
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples) if Image is not None else None
+    variants = []
+    if image is not None:
+        widths = sorted({min(w, pix.width) for w in RENDER_SETTINGS["widths"]})
+        for width in widths:
+            height = round(pix.height * width / pix.width)
+            scaled = image if width == pix.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in RENDER_SETTINGS["formats"]:
+                buf = io.BytesIO()
+                scaled.save(buf, fmt.upper(), **VARIANT_OPTIONS[fmt])
+                raw = buf.getvalue()
+                path = _variant_path(cover_path, width, fmt)
+                write_bytes_atomic(path, raw)
+                variants.append(OrderedDict([
+                    ("format", fmt),
+                    ("file", path.relative_to(cover_path.parent).as_posix()),
+                    ("width", width),
+                    ("height", height),
+                    ("bytes", len(raw)),
+                ]))
+    return variants, _placeholder(pix, image)
+
+def inspect_pdf(pdf_path: Path, zoom: float | None = None, width: int | None = None, text_pages: int = 0):
+    """One fitz.open per PDF: render the first page at ``zoom`` (or scaled to ``width`` pixels)
+    and read the page count, embedded title/author and the text of the first ``text_pages`` pages.
+
+    Returns (pixmap, info).
+    """
+    load_backends()
     doc = fitz.open(pdf_path)
     try:
-        page = doc.load_page(0)
+        page = doc.load_page(RENDER_SETTINGS["page"])
+        if zoom is None:
+            zoom = width / page.rect.width
         mat = fitz.Matrix(zoom, zoom)
         pix = page.get_pixmap(matrix=mat, alpha=False)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        pix.save(out_path.as_posix(), output="jpg")
+        metadata = doc.metadata or {}
+        text = " ".join(
+            " ".join(doc.load_page(i).get_text("text").split())
+            for i in range(min(text_pages, doc.page_count))
+        ).strip()
+        info = OrderedDict([
+            ("pages", doc.page_count),
+            ("title", (metadata.get("title") or "").strip()),
+            ("author", (metadata.get("author") or "").strip()),
+            ("bytes", Path(pdf_path).stat().st_size),
+            ("text", text),
+        ])
+        return pix, info
     finally:
         doc.close()
 
-def main() -> None:
-    if not PDF_DIR.exists():
-        print(f"PDF directory not found: {PDF_DIR}", file=sys.stderr)
-        sys.exit(1)
+def rasterize_first_page(pdf_path: Path, zoom: float | None = None, width: int | None = None):
+    """Render the first page at ``zoom`` (or scaled to ``width`` pixels); returns (pixmap, page count)."""
+    pix, info = inspect_pdf(pdf_path, zoom=zoom, width=width)
+    return pix, info["pages"]
 
-    pdfs = sorted([p for p in PDF_DIR.glob("*.pdf")])
-    if not pdfs:
-        print(f"No PDFs found in {PDF_DIR}", file=sys.stderr)
-        sys.exit(1)
+def save_pixmap(pix, out_path: Path, output: str = "jpg") -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target then swap, so an interrupted run never leaves a half-written image
+    tmp_path = out_path.with_name(f".{out_path.name}.tmp")
+    pix.save(tmp_path.as_posix(), output=output)
+    os.replace(tmp_path, out_path)
+
+def render_cover(pdf_path: Path, out_path: Path, zoom: float = 2.0):
+    """Open the PDF once: write the JPG plus its variants and return their metadata with the PDF info."""
+    pix, info = inspect_pdf(pdf_path, zoom=zoom, text_pages=RENDER_SETTINGS["textPages"])
+    save_pixmap(pix, out_path, RENDER_SETTINGS["format"])
+    variants, placeholder = encode_variants(pix, out_path)
+    return OrderedDict([
+        ("width", pix.width),
+        ("height", pix.height),
+        ("bytes", out_path.stat().st_size),
+        ("placeholder", placeholder),
+        ("variants", variants),
+        ("info", info),
+    ])
+
+def render_job(job):
+    """Worker entry point: (pdf path, cover path) -> (cover name, metadata, error or None)."""
+    pdf_path, cover_path = job
+    try:
+        meta = render_cover(Path(pdf_path), Path(cover_path), zoom=RENDER_SETTINGS["zoom"])
+    except Exception as exc:  # reported per cover; the rest of the batch continues
+        return Path(cover_path).name, None, f"{type(exc).__name__}: {exc}"
+    return Path(cover_path).name, meta, None
+
+def load_cover_cache():
+    """(recorded settings, covers); covers is empty when a known setting differs.
+
+    Before load_backends() only the static settings can be compared, so a
+    PyMuPDF/Pillow upgrade is noticed on the next run that renders anything.
+    """
+    try:
+        data = json.loads(COVER_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    settings = data.get("settings") or {}
+    if any(settings.get(key) != value for key, value in RENDER_SETTINGS.items()):
+        return settings, {}
+    return settings, data.get("covers", {})
+
+def save_cover_cache(covers: dict, settings) -> None:
+    write_json(COVER_CACHE, OrderedDict([
+        ("settings", settings),
+        ("covers", OrderedDict(sorted(covers.items()))),
+    ]))
+
+def _is_current(entry: dict, digest: str, cover_path: Path) -> bool:
+    if entry.get("sha256") != digest or not cover_path.exists() or "info" not in entry:
+        return False
+    return all((cover_path.parent / v["file"]).exists() for v in entry["variants"])
+
+def prune_variants(covers: dict) -> None:
+    """Delete variant files that no current cover refers to (old widths, removed books)."""
+    variant_dir = COVERS_DIR / VARIANT_DIR_NAME
+    if not variant_dir.exists():
+        return
+    keep = {v["file"] for entry in covers.values() for v in entry.get("variants", [])}
+    for path in variant_dir.iterdir():
+        if f"{VARIANT_DIR_NAME}/{path.name}" not in keep:
+            path.unlink()
 
+def render_covers(plan, jobs: int, force: bool = False):
+    """Render the covers in ``plan`` [(pdf, cover_path)] that are missing or stale.
+
+    Returns (metadata per cover name, number of failures).
+    """
+    with PROFILE.stage("covers.hash"):
+        digests = {pdf: file_sha256(pdf) for pdf, _ in plan}
+
+    def split(cached):
+        covers = OrderedDict()
+        todo = []
+        for pdf, cover_path in plan:
+            entry = cached.get(cover_path.name, {})
+            if not force and _is_current(entry, digests[pdf], cover_path):
+                covers[cover_path.name] = entry
+                continue
+            covers[cover_path.name] = OrderedDict([("pdf", pdf.name), ("sha256", digests[pdf])])
+            todo.append((str(pdf), str(cover_path)))
+        return covers, todo
+
+    settings, cached = load_cover_cache()
+    covers, todo = split(cached)
+    if todo:
+        # Rendering needs PyMuPDF anyway; with it loaded the library versions are compared too
+        load_backends()
+        settings, cached = load_cover_cache()
+        covers, todo = split(cached)
+        settings = RENDER_SETTINGS
+
+    print(f"Covers: {len(todo)} to render, {len(plan) - len(todo)} up to date")
+    if todo and Image is None:
+        print("Pillow not installed; skipping WebP/AVIF variants (pip install pillow)", file=sys.stderr)
+    with PROFILE.stage("covers.render"):
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                results = list(pool.map(render_job, todo))
+        else:
+            results = [render_job(job) for job in todo]
+    PROFILE.count("covers.rendered", len(todo))
+
+    failures = 0
+    for (pdf_path, _), (cover_name, meta, error) in zip(todo, results):
+        if error:
+            failures += 1
+            covers.pop(cover_name, None)
+            print(f"Failed to render cover: {Path(pdf_path).name} -> {cover_name}: {error}", file=sys.stderr)
+        else:
+            covers[cover_name].update(meta)
+            print(f"Rendered cover: {Path(pdf_path).name} -> {cover_name} ({len(meta['variants'])} variants)")
+    save_cover_cache(covers, settings)
+    prune_variants(covers)
+    return covers, failures
+
+def cover_fields(cover_var: str, meta):
+    """Extra BOOKS fields for one cover (size, placeholder, srcset) and the imports they need."""
+    if not meta or "width" not in meta:
+        return "", []
+    imports = []
+    variants = []
+    srcsets = OrderedDict()
+    for v in meta["variants"]:
+        var = f"{cover_var}_{v['format']}_{v['width']}"
+        imports.append(f"import {var} from '../assets/covers/{v['file']}';")
+        variants.append(
+            f"{{ format: '{v['format']}', width: {v['width']}, height: {v['height']}, bytes: {v['bytes']}, src: {var} }}"
+        )
+        srcsets.setdefault(v["format"], []).append(f"${{{var}}} {v['width']}w")
+    fields = (
+        f", coverWidth: {meta['width']}, coverHeight: {meta['height']}, coverPlaceholder: '{meta['placeholder']}'"
+    )
+    if variants:
+        srcset = ", ".join(f"{fmt}: `{', '.join(items)}`" for fmt, items in srcsets.items())
+        fields += f", coverSrcSet: {{ {srcset} }}, coverVariants: [{', '.join(variants)}]"
+    return fields, imports
+
+def js_str(value: str) -> str:
+    """Escape a value for a single-quoted JS string literal."""
+    return (value.replace("\\", "\\\\").replace("'", "\\'")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def pick_title(idx: int, slug: str, info, total: int) -> str:
+    """The Arabic list wins when it covers every PDF; otherwise prefer the embedded title."""
+    if len(ARABIC_TITLES) == total:
+        return ARABIC_TITLES[idx]
+    meta_title = (info or {}).get("title", "")
+    # Word/Acrobat often leave the source file name as the title; that is no better than the slug
+    if meta_title and not re.search(r"\.(pdf|docx?)$", meta_title, re.IGNORECASE):
+        return meta_title
+    return ARABIC_TITLES[idx] if idx < len(ARABIC_TITLES) else slug
+
+def info_fields(info) -> str:
+    """Extra BOOKS fields from the PDF itself (author, pages, size)."""
+    if not info:
+        return ""
+    fields = []
+    if info["author"]:
+        fields.append(f"author: '{js_str(info['author'])}'")
+    fields.append(f"pages: {info['pages']}")
+    fields.append(f"bytes: {info['bytes']}")
+    return ", " + ", ".join(fields)
+
+def books_json_text(entries) -> str:
+    books = [
+        OrderedDict([
+            ("id", e["id"]),
+            ("title", e["rawTitle"]),
+            ("author", e["info"]["author"]),
+            ("metaTitle", e["info"]["title"]),
+            ("pages", e["info"]["pages"]),
+            ("bytes", e["info"]["bytes"]),
+            ("seriesIndex", e["seriesIndex"]),
+            ("text", e["info"]["text"]),
+            ("searchText", normalize_ar(" ".join([e["rawTitle"], e["info"]["author"], e["info"]["text"]]))),
+        ])
+        for e in entries if e["info"]
+    ]
+    data = OrderedDict([("version", 1), ("textPages", TEXT_PAGES), ("books", books)])
+    return dumps(data) + "\n"
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Leave the file (and its mtime) alone when nothing changed, so Vite does not reload."""
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    write_text_atomic(path, text)
+    return True
+
+def make_plan(pdfs):
+    return [(pdf, COVERS_DIR / f"{slugify(pdf.name)}.jpg") for pdf in pdfs]
+
+def build_books_js(plan, covers):
+    """The books.js text for ``plan`` and the cover metadata; returns (text, entries)."""
     imports_pdf = []
     imports_cover = []
+    imports_variant = []
     entries = []
 
-    for idx, pdf in enumerate(pdfs):
+    for idx, (pdf, cover_path) in enumerate(plan):
         slug = slugify(pdf.name)
-        title = ARABIC_TITLES[idx] if idx < len(ARABIC_TITLES) else slug
-        cover_name = f"{slug}.jpg"
-        cover_path = COVERS_DIR / cover_name
-
-        print(f"Rendering cover: {pdf.name} -> {cover_name}")
-        render_cover(pdf, cover_path)
+        cover_name = cover_path.name
+        info = (covers.get(cover_name) or {}).get("info")
+        title = pick_title(idx, slug, info, len(plan))
 
         pdf_var = f"pdf_{idx}"
         cover_var = f"cover_{idx}"
@@ -92,10 +426,15 @@ def main() -> None:
 
         imports_pdf.append(f"import {pdf_var} from '{rel_pdf}';")
         imports_cover.append(f"import {cover_var} from '{rel_cover}';")
+        extra, variant_imports = cover_fields(cover_var, covers.get(cover_name))
+        imports_variant.extend(variant_imports)
+        extra = info_fields(info) + extra
 
         entry = {
             "id": slug,
-            "title": title,
+            "title": js_str(title),
+            "rawTitle": title,
+            "info": info,
             "category": "الكتب",
             "tags": [],
             "pdfVar": pdf_var,
@@ -104,40 +443,94 @@ def main() -> None:
             "seriesIndex": idx + 1,
             "primaryCategoryId": "series",
             "categoryIds": ["series"],
+            "extra": extra,
         }
         entries.append(entry)
 
-    # Write JS file
-    OUT_JS.parent.mkdir(parents=True, exist_ok=True)
-    with OUT_JS.open("w", encoding="utf-8") as f:
-        f.write("// Auto-generated by scripts/generate_books.py\n")
-        for line in imports_pdf + imports_cover:
-            f.write(line + "\n")
-        # Series and categories
-        f.write("\nexport const SERIES = [\n")
-        f.write("  { id: 'machine-series', title: 'سلسلة \"الآلة التي...\" | Arabic GPT Machine Series', slug: 'machine-series', categoryTitle: 'سلسلة \"الآلة التي...\" | Arabic GPT Machine Series', order: 1, accent: 'from-lime-400 to-emerald-500' }\n")
-        f.write("]\n")
-        f.write("\nexport const CATEGORIES = [\n")
-        f.write("  { id: 'series', title: 'سلاسل الكتب', order: 1 }\n")
-        f.write("]\n")
-
-        # Books
-        f.write("\nexport const BOOKS = [\n")
-        for i, e in enumerate(entries):
-            comma = "," if i < len(entries) - 1 else ""
-            f.write(
-                (
-                    "  { id: '%(id)s', title: '%(title)s', slug: '%(id)s', category: '%(category)s', tags: [], "
-                    "seriesId: '%(seriesId)s', seriesIndex: %(seriesIndex)d, primaryCategoryId: '%(primaryCategoryId)s', categoryIds: ['series'], "
-                    "pdfUrl: %(pdfVar)s, downloadUrl: %(pdfVar)s, coverUrl: %(coverVar)s, viewUrl: %(pdfVar)s }%(comma)s\n"
-                )
-                % {**e, "comma": comma}
+    # Build the JS file; same PDFs in, same bytes out
+    out = ["// Auto-generated by scripts/generate_books.py\n"]
+    for line in imports_pdf + imports_cover + imports_variant:
+        out.append(line + "\n")
+    # Series and categories
+    out.append("\nexport const SERIES = [\n")
+    out.append("  { id: 'machine-series', title: 'سلسلة \"الآلة التي...\" | Arabic GPT Machine Series', slug: 'machine-series', categoryTitle: 'سلسلة \"الآلة التي...\" | Arabic GPT Machine Series', order: 1, accent: 'from-lime-400 to-emerald-500' }\n")
+    out.append("]\n")
+    out.append("\nexport const CATEGORIES = [\n")
+    out.append("  { id: 'series', title: 'سلاسل الكتب', order: 1 }\n")
+    out.append("]\n")
+
+    # Books
+    out.append("\nexport const BOOKS = [\n")
+    for i, e in enumerate(entries):
+        comma = "," if i < len(entries) - 1 else ""
+        out.append(
+            (
+                "  { id: '%(id)s', title: '%(title)s', slug: '%(id)s', category: '%(category)s', tags: [], "
+                "seriesId: '%(seriesId)s', seriesIndex: %(seriesIndex)d, primaryCategoryId: '%(primaryCategoryId)s', categoryIds: ['series'], "
+                "pdfUrl: %(pdfVar)s, downloadUrl: %(pdfVar)s, coverUrl: %(coverVar)s, viewUrl: %(pdfVar)s%(extra)s }%(comma)s\n"
             )
-        f.write(
-            "]\n\n// Exports: SERIES, CATEGORIES, BOOKS\n"
+            % {**e, "comma": comma}
         )
+    out.append(
+        "]\n\n// Exports: SERIES, CATEGORIES, BOOKS\n"
+    )
+    return "".join(out), entries
 
-    print(f"Wrote {OUT_JS}")
+def stale_reasons() -> list:
+    """Why a run would change the covers, books.js or books_text.json; empty when up to date.
+
+    Uses only the PDF hashes and the cover cache, so PyMuPDF is never imported.
+    """
+    pdfs = sorted(PDF_DIR.glob("*.pdf")) if PDF_DIR.exists() else []
+    if not pdfs:
+        return []
+    plan = make_plan(pdfs)
+    _, cached = load_cover_cache()
+    reasons = [f"cover out of date: {pdf.name}" for pdf, cover_path in plan
+               if not _is_current(cached.get(cover_path.name, {}), file_sha256(pdf), cover_path)]
+    if reasons:
+        return reasons
+    text, entries = build_books_js(plan, cached)
+    for path, expected in ((OUT_JS, text), (OUT_JSON, books_json_text(entries))):
+        if not path.exists() or path.read_text(encoding="utf-8") != expected:
+            reasons.append(f"out of date: {path.name}")
+    return reasons
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Generate src/data/books.js and cover images from the PDFs")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes for rendering (default: CPU count, 1 = serial)")
+    parser.add_argument("--force", action="store_true", help="Re-render every cover even if the cache says it is current")
+    parser.add_argument("--check", action="store_true", help="Only report whether any output is stale (exit 1 if so)")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start("generate_books", args.profile, args.profile_out)
+
+    if args.check:
+        reasons = stale_reasons()
+        for reason in reasons:
+            print(f"Stale: {reason}")
+        print("books: stale" if reasons else "books: up to date")
+        sys.exit(1 if reasons else 0)
+
+    if not PDF_DIR.exists():
+        print(f"PDF directory not found: {PDF_DIR}", file=sys.stderr)
+        sys.exit(1)
+
+    pdfs = sorted([p for p in PDF_DIR.glob("*.pdf")])
+    if not pdfs:
+        print(f"No PDFs found in {PDF_DIR}", file=sys.stderr)
+        sys.exit(1)
+
+    plan = make_plan(pdfs)
+    covers, failures = render_covers(plan, args.jobs or os.cpu_count() or 1, force=args.force)
+    with PROFILE.stage("books.build"):
+        text, entries = build_books_js(plan, covers)
+        json_text = books_json_text(entries)
+    with PROFILE.stage("books.write"):
+        print(f"{'Wrote' if write_if_changed(OUT_JS, text) else 'Unchanged'} {OUT_JS}")
+        print(f"{'Wrote' if write_if_changed(OUT_JSON, json_text) else 'Unchanged'} {OUT_JSON}")
+    if failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
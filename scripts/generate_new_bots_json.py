@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 
-import json
+import argparse
 import re
 import sys
 from collections import OrderedDict
@@ -12,19 +12,25 @@ from pathlib import Path
 from typing import Dict, List
 from urllib.parse import urlparse
 
-try:
-    from docx import Document
-except ImportError as exc:  # pragma: no cover
-    print("python-docx is required to parse the metadata document:", exc, file=sys.stderr)
-    sys.exit(1)
-
 REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / 'pytoncode'))
+
+from catalog_model import Bot, Catalog, Category, Package, to_payload  # noqa: E402
+from catalog_schema import ALIASES_KEY, add_aliases, alias_table  # noqa: E402
+from catalog_shards import write_shards  # noqa: E402
+from docx_stream import iter_texts  # noqa: E402
+from json_output import write_json  # noqa: E402
+from line_lexer import BOT, CATEGORY, MODEL_TAG, PACKAGE, TAG_KINDS, TEXT, lex_combined  # noqa: E402
+from profiling import PROFILE, add_profile_argument  # noqa: E402
+from search_index import INDEX_PATH, write_search_index  # noqa: E402
+from text_normalize import model_key as normalize_model_key  # noqa: E402
 DOC_CANDIDATES = [
     REPO_ROOT / 'pytoncode' / 'نبذة - حدود - مثال - روابط.docx',
     REPO_ROOT / 'pytoncode' / 'metadata_doc.docx',
 ]
 DOC_PATH = next((candidate for candidate in DOC_CANDIDATES if candidate.exists()), DOC_CANDIDATES[0])
 OUTPUT_PATH = REPO_ROOT / 'public' / 'new_bots.json'
+SHARD_DIR = REPO_ROOT / 'public' / 'catalog'
 
 PACKAGE_FALLBACK = 'أدوات متنوعة'
 CATEGORY_FALLBACK = 'أدوات دون تصنيف'
@@ -63,10 +69,10 @@ LINK_FIELD_ALIASES = {alias.lower() for alias in (LINKS_FIELD, 'روابط إض
 URL_TOKEN_PATTERN = re.compile(r"https?://[^\s]+", re.IGNORECASE)
 
 
-def iter_chunks(doc: Document):
+def iter_chunks(doc_path: Path):
     """Yield trimmed pieces, splitting internal newlines as standalone chunks."""
-    for para in doc.paragraphs:
-        text = (para.text or '').replace('\r', '\n')
+    for para_text in iter_texts(doc_path):
+        text = (para_text or '').replace('\r', '\n')
         for chunk in text.split('\n'):
             piece = chunk.strip()
             if piece:
@@ -83,212 +89,173 @@ def to_safe_url(value: str) -> str:
     return ''
 
 
-def normalize_model_key(raw: str) -> str:
-    token = (raw or '').strip().lower()
-    token = token.replace('٠', '0').replace('٥', '5')
-    token = token.replace('gpt-', '').replace('gpt', '')
-    token = token.replace('نموذج', '').replace('نمو', '').replace('-', '').replace(' ', '')
-    if token in {'4o', '4'}:
-        return '4o'
-    if token in {'4omini', '4omin', '4mini'}:
-        return '4o-mini'
-    if token in {'5'}:
-        return '5'
-    return token or '4o'
-
-
 def normalize_field(label: str) -> str | None:
     base = label.strip()
     return FIELD_NORMALIZATION.get(base, FIELD_NORMALIZATION.get(base.capitalize(), None))
 
 
-def collapse_lines(lines: List[str]) -> str:
-    compact = '\n'.join(line.strip() for line in lines if line.strip())
-    return compact.strip()
+def bot_entry(bot: Bot, compact: bool = False) -> Dict[str, object]:
+    models: Dict[str, str] = {}
+    for key, value in bot.link_map().items():
+        safe_url = to_safe_url(value)
+        if safe_url:
+            models[key] = safe_url
 
+    extra_links = bot.extra_links or []
+    for idx, link in enumerate(extra_links, start=1):
+        safe = to_safe_url(link)
+        if not safe:
+            continue
+        key = f'link-{idx}'
+        if key not in models:
+            models[key] = safe
 
-def build_payload() -> Dict[str, List[Dict[str, object]]]:
-    if not DOC_PATH.exists():
-        raise FileNotFoundError(f"Metadata document not found: {DOC_PATH}")
+    primary_link = models.get('4o') or models.get('5') or next(iter(models.values()), '')
 
-    doc = Document(str(DOC_PATH))
-    packages: List[Dict[str, object]] = []
-    package_map: Dict[str, Dict[str, object]] = OrderedDict()
-    category_map: Dict[tuple[str, str], Dict[str, object]] = {}
+    entry = OrderedDict([
+        ('botTitle', bot.title),
+        ('النموذج', models.copy()),
+        ('نبذة', bot.about),
+        ('حدود', bot.limits),
+        ('مثال', bot.example),
+    ])
 
-    current_package: Dict[str, object] | None = None
-    current_category: Dict[str, object] | None = None
-    current_bot: Dict[str, object] | None = None
-    current_field: str | None = None
-    pending_model: str | None = None
-    collecting_links = False
+    if primary_link:
+        entry['url'] = primary_link
 
-    def get_package(name: str) -> Dict[str, object]:
-        key = name.strip() or PACKAGE_FALLBACK
-        pkg = package_map.get(key)
-        if not pkg:
-            pkg = OrderedDict([('package', key), ('categories', [])])
-            package_map[key] = pkg
-            packages.append(pkg)
-        return pkg
-
-    def get_category(pkg: Dict[str, object], name: str) -> Dict[str, object]:
-        key = (pkg['package'], name.strip() or CATEGORY_FALLBACK)
-        cat = category_map.get(key)
-        if not cat:
-            cat = OrderedDict([('category', key[1]), ('bots', [])])
-            pkg['categories'].append(cat)
-            category_map[key] = cat
-        return cat
-
-    def flush_bot():
-        nonlocal current_bot, current_field, pending_model, collecting_links
-        if not current_bot or not current_category:
-            current_bot = None
-            current_field = None
-            pending_model = None
-            collecting_links = False
-            return
+    if not compact:
+        add_aliases(entry, skip_empty=False)
+    if extra_links:
+        entry['linksList'] = [to_safe_url(link) for link in extra_links if to_safe_url(link)]
 
-        fields = current_bot.setdefault('fields', {})
-        models_raw: Dict[str, str] = current_bot.setdefault('models', {})
-        extra_links: List[str] = current_bot.get('links_extra', [])
+    entry['hasLink'] = bool(primary_link)
+    return entry
 
-        models: Dict[str, str] = {}
-        for k, v in models_raw.items():
-            safe_url = to_safe_url(v)
-            if safe_url:
-                models[k] = safe_url
 
-        for idx, link in enumerate(extra_links, start=1):
-            safe = to_safe_url(link)
-            if not safe:
-                continue
-            key = f'link-{idx}'
-            if key not in models:
-                models[key] = safe
-
-        about = collapse_lines(fields.get('نبذة', []))
-        limits = collapse_lines(fields.get('حدود', []))
-        example = collapse_lines(fields.get('مثال', []))
-
-        primary_link = models.get('4o') or models.get('5') or next(iter(models.values()), '')
-
-        bot_entry = OrderedDict([
-            ('botTitle', current_bot['title']),
-            ('النموذج', models.copy()),
-            ('نبذة', about),
-            ('حدود', limits),
-            ('مثال', example),
-        ])
-
-        if primary_link:
-            bot_entry['url'] = primary_link
-
-        for alias in ('model', 'models', 'links'):
-            bot_entry[alias] = models.copy()
-        for alias in ('about', 'description'):
-            bot_entry[alias] = about
-        for alias in ('limits', 'constraints'):
-            bot_entry[alias] = limits
-        for alias in ('example', 'examples'):
-            bot_entry[alias] = example
-        if extra_links:
-            bot_entry['linksList'] = [to_safe_url(link) for link in extra_links if to_safe_url(link)]
-
-        bot_entry['hasLink'] = bool(primary_link)
-
-        current_category['bots'].append(bot_entry)
-
-        current_bot = None
-        current_field = None
-        pending_model = None
-        collecting_links = False
-
-    for chunk in iter_chunks(doc):
-        if chunk.startswith('العنوان الرئيسي:'):
-            flush_bot()
-            title = chunk.split(':', 1)[1].strip()
-            current_package = get_package(title)
+def parse_doc(doc_path: Path) -> Catalog:
+    catalog = Catalog()
+    current_package: Package | None = None
+    current_category: Category | None = None
+    current_bot: Bot | None = None
+    current_field: str | None = None
+    pending_model: str | None = None
+    collecting_links = False
+    # أسطر الحقل الجاري فقط؛ تُلحق بالبوت عند تغيّر الحقل أو البوت
+    buffer: List[str] = []
+
+    def get_package(name: str) -> Package:
+        return catalog.package(name.strip() or PACKAGE_FALLBACK)
+
+    def get_category(pkg: Package, name: str) -> Category:
+        return pkg.category(name.strip() or CATEGORY_FALLBACK)
+
+    def flush_text():
+        current_bot.add_text(current_field, '\n'.join(buffer))
+        buffer.clear()
+
+    for chunk in iter_chunks(doc_path):
+        kind, value = lex_combined(chunk)
+        if kind in (PACKAGE, CATEGORY) and not value.startswith(':'):
+            kind = TEXT  # العنوان بلا ":" بعده مباشرة نص عادي في هذه الصيغة
+        if kind == PACKAGE:
+            if buffer:
+                flush_text()
+            current_bot = None
+            current_package = get_package(value[1:])
             current_category = None
             continue
-        if chunk.startswith('العنوان الفرعي:'):
-            flush_bot()
+        if kind == CATEGORY:
+            if buffer:
+                flush_text()
+            current_bot = None
             if current_package is None:
                 current_package = get_package(PACKAGE_FALLBACK)
-            cat_name = chunk.split(':', 1)[1].strip()
-            current_category = get_category(current_package, cat_name)
+            current_category = get_category(current_package, value[1:])
             continue
-        if chunk.startswith('#'):
-            flush_bot()
+        if kind == BOT:
+            if buffer:
+                flush_text()
             if current_package is None:
                 current_package = get_package(PACKAGE_FALLBACK)
             if current_category is None:
                 current_category = get_category(current_package, CATEGORY_FALLBACK)
-            title = chunk.lstrip('#').strip()
-            current_bot = {
-                'title': title,
-                'fields': {field: [] for field in FIELD_NORMALIZATION.values()},
-                'models': {},
-                'links_extra': [],
-            }
+            current_bot = Bot(value.lstrip('#').strip())
+            current_category.bots.append(current_bot)
             current_field = None
             pending_model = None
             collecting_links = False
             continue
-        if chunk.startswith('@'):
+        if kind in TAG_KINDS:
             if current_bot is None:
                 continue
-            label = chunk[1:].strip()
+            if buffer:
+                flush_text()
+            label = value
             pending_model = None
             current_field = None
             collecting_links = False
-            if label.lower().startswith('نموذج'):
+            if kind == MODEL_TAG:
                 parts = label.split(maxsplit=1)
                 model_label = parts[1] if len(parts) > 1 else ''
                 pending_model = normalize_model_key(model_label)
             elif label.lower() in LINK_FIELD_ALIASES:
                 collecting_links = True
             else:
-                field_name = normalize_field(label)
-                if field_name:
-                    current_field = field_name
-                    current_bot['fields'].setdefault(field_name, [])
+                current_field = normalize_field(label)
             continue
 
         if current_bot is None:
             continue
 
         if pending_model:
-            current_bot['models'][pending_model] = chunk
+            # القيمة الخام؛ الروابط غير الصالحة تُسقط في bot_entry
+            current_bot.set_link(pending_model, chunk)
             pending_model = None
             continue
 
         if collecting_links:
-            matches = URL_TOKEN_PATTERN.findall(chunk)
-            for match in matches:
+            for match in URL_TOKEN_PATTERN.findall(chunk):
                 safe = to_safe_url(match)
                 if safe:
-                    current_bot.setdefault('links_extra', []).append(safe)
+                    current_bot.add_extra_link(safe)
             continue
 
         if current_field:
-            current_bot['fields'].setdefault(current_field, []).append(chunk)
+            buffer.append(chunk)
 
-    flush_bot()
+    if buffer:
+        flush_text()
+    return catalog
 
-    for idx, pkg in enumerate(packages, start=1):
-        pkg['packageId'] = idx
 
+def build_payload(compact: bool = False) -> Dict[str, List[Dict[str, object]]]:
+    if not DOC_PATH.exists():
+        raise FileNotFoundError(f"Metadata document not found: {DOC_PATH}")
+
+    packages = to_payload(parse_doc(DOC_PATH), lambda bot: bot_entry(bot, compact=compact), id_last=True)
+    if compact:
+        return {ALIASES_KEY: alias_table(skip_empty=False), 'packages': packages}
     return {'packages': packages}
 
 
-def main() -> int:
-    data = build_payload()
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with OUTPUT_PATH.open('w', encoding='utf-8') as fh:
-        json.dump(data, fh, ensure_ascii=False, indent=2)
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate public/new_bots.json from the metadata DOCX")
+    parser.add_argument('--compact', action='store_true', help="Write each field once plus a top-level alias table")
+    parser.add_argument('--shards', action='store_true', help="Also write one JSON file per package plus index.json")
+    parser.add_argument('--shard-dir', type=Path, default=SHARD_DIR, help="Output directory for --shards")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start('generate_new_bots_json', args.profile, args.profile_out)
+
+    with PROFILE.stage('parse'):
+        data = build_payload(compact=args.compact)
+    write_json(OUTPUT_PATH, data)
     print(f"Wrote {OUTPUT_PATH}")
+    write_search_index(OUTPUT_PATH, INDEX_PATH)
+    print(f"Wrote {INDEX_PATH}")
+    if args.shards:
+        index = write_shards(data, args.shard_dir)
+        print(f"Wrote {len(index['packages'])} package shards to {args.shard_dir}")
     total = sum(len(cat['bots']) for pkg in data['packages'] for cat in pkg['categories'])
     print(f"Bots exported: {total}")
     return 0
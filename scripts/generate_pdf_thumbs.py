@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pre-render first-page thumbnails and page counts for the package PDFs.
+
+Requirements:
+  pip install pymupdf
+
+What it does:
+  - Reads src/data/packagePdfs.json and src/data/packagePdfsManifest.json, whose
+    entries point at PDFs under public/categorysPdf/with-info and manifest
+  - Renders the first page of each PDF (in a process pool) to a JPG under
+    public/categorysPdf/thumbs/<folder>/, reusing the PyMuPDF helpers from
+    generate_books.py
+  - Writes thumb, thumbWidth, thumbHeight and pages back onto each entry, so the
+    site can show the image first and fetch the PDF only on demand
+  - Skips PDFs whose content hash and render settings match the sidecar cache
+    (public/categorysPdf/thumbs/.thumbs-cache.json)
+
+Usage:
+  python scripts/generate_pdf_thumbs.py [--jobs N] [--force] [--check]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from generate_books import ROOT, load_backends, rasterize_first_page, save_pixmap
+from json_output import dumps, write_json, write_text_atomic
+from parse_cache import file_sha256
+from profiling import PROFILE, add_profile_argument
+
+PUBLIC_DIR = ROOT / "public"
+DATA_DIR = ROOT / "src" / "data"
+MANIFESTS = (DATA_DIR / "packagePdfs.json", DATA_DIR / "packagePdfsManifest.json")
+THUMBS_DIR = PUBLIC_DIR / "categorysPdf" / "thumbs"
+THUMB_CACHE = THUMBS_DIR / ".thumbs-cache.json"
+THUMB_FIELDS = ("thumb", "thumbWidth", "thumbHeight", "pages")
+
+# Anything that changes the rendered thumbnails; a mismatch re-renders all of them.
+# The PyMuPDF version is added once something has to be rendered (load_thumb_backend).
+THUMB_SETTINGS = OrderedDict([
+    ("page", 0),
+    ("width", 480),
+    ("format", "jpg"),
+])
+
+def load_thumb_backend() -> None:
+    load_backends()
+    THUMB_SETTINGS["pymupdf"] = sys.modules["fitz"].VersionBind
+
+def thumb_rel_path(pdf_rel: str) -> str:
+    """categorysPdf/with-info/01 X.pdf -> categorysPdf/thumbs/with-info/01 X.jpg"""
+    rel = Path(pdf_rel)
+    folder = rel.parent.name
+    return (THUMBS_DIR.relative_to(PUBLIC_DIR) / folder / f"{rel.stem}.{THUMB_SETTINGS['format']}").as_posix()
+
+def render_thumb(job):
+    """Worker entry point: (pdf rel path, pdf path, thumb path) -> (pdf rel path, metadata, error or None)."""
+    pdf_rel, pdf_path, thumb_path = job
+    try:
+        pix, pages = rasterize_first_page(Path(pdf_path), width=THUMB_SETTINGS["width"])
+        save_pixmap(pix, Path(thumb_path), THUMB_SETTINGS["format"])
+    except Exception as exc:  # reported per PDF; the rest of the batch continues
+        return pdf_rel, None, f"{type(exc).__name__}: {exc}"
+    return pdf_rel, OrderedDict([
+        ("thumb", Path(thumb_path).relative_to(PUBLIC_DIR).as_posix()),
+        ("thumbWidth", pix.width),
+        ("thumbHeight", pix.height),
+        ("pages", pages),
+    ]), None
+
+def load_thumb_cache():
+    """(recorded settings, entries); entries is empty when a known setting differs."""
+    try:
+        data = json.loads(THUMB_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    settings = data.get("settings") or {}
+    if any(settings.get(key) != value for key, value in THUMB_SETTINGS.items()):
+        return settings, {}
+    return settings, data.get("pdfs", {})
+
+def plan_thumbs(pdf_rels, cached: dict, force: bool = False):
+    """Split the PDFs into current cache entries and render jobs; returns (thumbs, todo, missing PDFs)."""
+    thumbs = OrderedDict()
+    todo = []
+    missing = []
+    for pdf_rel in pdf_rels:
+        pdf_path = PUBLIC_DIR / pdf_rel
+        if not pdf_path.exists():
+            missing.append(pdf_rel)
+            continue
+        digest = file_sha256(pdf_path)
+        entry = cached.get(pdf_rel, {})
+        thumb_path = PUBLIC_DIR / thumb_rel_path(pdf_rel)
+        if not force and entry.get("sha256") == digest and thumb_path.exists():
+            thumbs[pdf_rel] = entry
+            continue
+        thumbs[pdf_rel] = OrderedDict([("sha256", digest)])
+        todo.append((pdf_rel, str(pdf_path), str(thumb_path)))
+    return thumbs, todo, missing
+
+def render_thumbs(pdf_rels, jobs: int, force: bool = False):
+    """Render thumbnails for the given public-relative PDF paths; returns (metadata per path, failures)."""
+    settings, cached = load_thumb_cache()
+    with PROFILE.stage("thumbs.plan"):
+        thumbs, todo, missing = plan_thumbs(pdf_rels, cached, force)
+    if todo:
+        # Rendering needs PyMuPDF anyway; with it loaded its version is compared too
+        load_thumb_backend()
+        settings, cached = load_thumb_cache()
+        thumbs, todo, missing = plan_thumbs(pdf_rels, cached, force)
+        settings = THUMB_SETTINGS
+    for pdf_rel in missing:
+        print(f"Missing PDF (no thumbnail): {pdf_rel}", file=sys.stderr)
+
+    print(f"Thumbnails: {len(todo)} to render, {len(thumbs) - len(todo)} up to date, {len(missing)} missing PDFs")
+    with PROFILE.stage("thumbs.render"):
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                results = list(pool.map(render_thumb, todo))
+        else:
+            results = [render_thumb(job) for job in todo]
+    PROFILE.count("thumbs.rendered", len(todo))
+
+    failures = 0
+    for pdf_rel, meta, error in results:
+        if error:
+            failures += 1
+            thumbs.pop(pdf_rel, None)
+            print(f"Failed to render thumbnail: {pdf_rel}: {error}", file=sys.stderr)
+        else:
+            thumbs[pdf_rel].update(meta)
+            print(f"Rendered thumbnail: {pdf_rel} -> {meta['thumb']} ({meta['pages']} pages)")
+
+    write_json(THUMB_CACHE, OrderedDict([
+        ("settings", settings),
+        ("pdfs", OrderedDict(sorted(thumbs.items()))),
+    ]))
+    prune_thumbs(thumbs)
+    return thumbs, failures
+
+def prune_thumbs(thumbs: dict) -> None:
+    """Delete thumbnails that no current PDF refers to (renamed or removed PDFs)."""
+    keep = {meta["thumb"] for meta in thumbs.values() if "thumb" in meta}
+    for path in THUMBS_DIR.rglob(f"*.{THUMB_SETTINGS['format']}"):
+        if path.relative_to(PUBLIC_DIR).as_posix() not in keep:
+            path.unlink()
+
+def manifest_text(original: str, thumbs: dict) -> str:
+    """The manifest with the thumbnail fields set (or cleared) on every entry."""
+    entries = json.loads(original, object_pairs_hook=OrderedDict)
+    for entry in entries:
+        for field in THUMB_FIELDS:
+            entry.pop(field, None)
+        meta = thumbs.get((entry.get("file") or "").strip())
+        if meta and "thumb" in meta:
+            for field in THUMB_FIELDS:
+                entry[field] = meta[field]
+    return dumps(entries) + "\n"
+
+def update_manifest(path: Path, thumbs: dict) -> bool:
+    """Rewrite the manifest if its thumbnail fields changed; returns True when the file changed."""
+    original = path.read_text(encoding="utf-8")
+    text = manifest_text(original, thumbs)
+    if text == original:
+        return False
+    write_text_atomic(path, text)
+    return True
+
+def manifest_pdfs(manifests) -> list:
+    pdf_rels = []
+    for path in manifests:
+        for entry in json.loads(path.read_text(encoding="utf-8")):
+            pdf_rel = (entry.get("file") or "").strip()
+            if pdf_rel and pdf_rel not in pdf_rels:
+                pdf_rels.append(pdf_rel)
+    return pdf_rels
+
+def stale_reasons() -> list:
+    """Why a run would change the thumbnails or the manifests; empty when up to date.
+
+    Uses only the PDF hashes and the sidecar cache, so PyMuPDF is never imported.
+    """
+    manifests = [path for path in MANIFESTS if path.exists()]
+    _, cached = load_thumb_cache()
+    thumbs, todo, _ = plan_thumbs(manifest_pdfs(manifests), cached)
+    reasons = [f"thumbnail out of date: {pdf_rel}" for pdf_rel, _, _ in todo]
+    if not reasons:
+        for path in manifests:
+            original = path.read_text(encoding="utf-8")
+            if manifest_text(original, thumbs) != original:
+                reasons.append(f"out of date: {path.relative_to(ROOT).as_posix()}")
+    return reasons
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-render first-page thumbnails and page counts for the package PDFs")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes for rendering (default: CPU count, 1 = serial)")
+    parser.add_argument("--force", action="store_true", help="Re-render every thumbnail even if the cache says it is current")
+    parser.add_argument("--check", action="store_true", help="Only report whether any output is stale (exit 1 if so)")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    PROFILE.start("generate_pdf_thumbs", args.profile, args.profile_out)
+
+    if args.check:
+        reasons = stale_reasons()
+        for reason in reasons:
+            print(f"Stale: {reason}")
+        print("thumbs: stale" if reasons else "thumbs: up to date")
+        sys.exit(1 if reasons else 0)
+
+    manifests = [path for path in MANIFESTS if path.exists()]
+    thumbs, failures = render_thumbs(manifest_pdfs(manifests), args.jobs or os.cpu_count() or 1, force=args.force)
+    with PROFILE.stage("thumbs.manifests"):
+        for path in manifests:
+            print(f"{'Wrote' if update_manifest(path, thumbs) else 'Unchanged'} {path.relative_to(ROOT)}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
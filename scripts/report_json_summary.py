@@ -2,9 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import json
+import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'pytoncode'))
+
+from catalog_schema import expand_aliases  # noqa: E402
+
 JSON_PATH = ROOT / 'public' / 'new_bots.json'
 
 MODEL_KEYS = ["النموذج", "النماذج", "model", "models", "�?�?�?�?", "�?�?�?�?�?���?"]
@@ -16,7 +21,7 @@ URL_KEYS = ["الرابط", "رابط", "الرابط المباشر", "url", "l
 
 def load():
     with JSON_PATH.open('r', encoding='utf-8') as f:
-        return json.load(f)
+        return expand_aliases(json.load(f))
 
 
 def truncate(s, n=120):
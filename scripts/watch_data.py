@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Watch the pipeline inputs and rebuild only the outputs that depend on a change.
+
+What it does:
+  - Watches pytoncode/*.docx, src/assets/pdfs and public/categorysPdf with
+    inotify (Linux, through ctypes) or, elsewhere, by polling mtimes/sizes
+  - Collects changes until DEBOUNCE seconds pass without a new one (editors
+    often save several times), then runs only the affected stages:
+        حدود/نبذة/مثال.docx          -> catalog   (update_from_docx), then search_index
+        public/categorysPdf/with-info -> pdf_index (build_pdf_search_index)
+        public/categorysPdf/**.pdf    -> thumbs    (generate_pdf_thumbs)
+        src/assets/pdfs/*.pdf         -> books     (generate_books)
+    and artifacts (without the .gz/.br copies) after catalog or pdf_index
+  - Runs every stage in this process, so modules, parsed DOCX lines and PDF
+    page tokens stay in memory between rebuilds; a failing stage is reported
+    and the watcher keeps going
+
+Usage:
+  python scripts/watch_data.py [--poll] [--interval S] [--debounce S] [--initial]
+  npm run data:watch
+"""
+from __future__ import annotations
+import argparse
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "pytoncode"))
+
+PYTONCODE_DIR = ROOT / "pytoncode"
+BOOK_PDF_DIR = ROOT / "src" / "assets" / "pdfs"
+CATEGORY_PDF_DIR = ROOT / "public" / "categorysPdf"
+WITH_INFO_DIR = CATEGORY_PDF_DIR / "with-info"
+THUMBS_DIR = CATEGORY_PDF_DIR / "thumbs"
+CATALOG_DOCS = ("حدود.docx", "نبذة.docx", "مثال.docx")
+
+# (directory, recursive); outputs such as thumbs/ and .cache/ are never watched
+WATCH_ROOTS = (
+    (PYTONCODE_DIR, False),
+    (BOOK_PDF_DIR, False),
+    (CATEGORY_PDF_DIR, True),
+)
+IGNORED_DIRS = (THUMBS_DIR,)
+WATCHED_SUFFIXES = (".docx", ".pdf")
+
+DEBOUNCE = 0.15
+POLL_INTERVAL = 0.25
+
+# Stages run in this order; FOLLOWUPS are stages whose inputs another stage writes
+STAGE_ORDER = ("catalog", "search_index", "pdf_index", "artifacts", "thumbs", "books")
+FOLLOWUPS = {"catalog": ("search_index", "artifacts"), "pdf_index": ("artifacts",)}
+
+def _under(path: Path, directory: Path) -> bool:
+    return path == directory or directory in path.parents
+
+def root_names(present: bool = True) -> list:
+    """Watch roots that exist (or, with present=False, that are still missing), relative to the repo."""
+    return [str(d.relative_to(ROOT)) for d, _ in WATCH_ROOTS if d.is_dir() == present]
+
+def is_watched(path: Path) -> bool:
+    # Skip Word lock files ("~$name.docx") and the atomic writers' ".name.tmp" files
+    if path.suffix.lower() not in WATCHED_SUFFIXES or path.name.startswith(("~$", ".")):
+        return False
+    return not any(_under(path, d) for d in IGNORED_DIRS)
+
+def stages_for(path: Path) -> set:
+    """Stages whose outputs depend on ``path``."""
+    if not is_watched(path):
+        return set()
+    if path.suffix.lower() == ".docx":
+        return {"catalog"} if path.parent == PYTONCODE_DIR and path.name in CATALOG_DOCS else set()
+    if path.parent == BOOK_PDF_DIR:
+        return {"books"}
+    if _under(path, CATEGORY_PDF_DIR):
+        return {"thumbs", "pdf_index"} if path.parent == WITH_INFO_DIR else {"thumbs"}
+    return set()
+
+def plan_stages(paths) -> list:
+    stages = set()
+    for path in paths:
+        stages |= stages_for(path)
+    for stage in list(stages):
+        stages.update(FOLLOWUPS.get(stage, ()))
+    return [stage for stage in STAGE_ORDER if stage in stages]
+
+# ---------- stages (imported lazily: PyMuPDF is only needed for PDF changes) ----------
+
+def run_catalog():
+    import update_from_docx
+    return update_from_docx.main([])
+
+def run_search_index():
+    # Built from whatever public/new_bots.json holds, even when the catalog merge failed
+    import search_index
+    return search_index.main(["--if-stale"])
+
+def run_pdf_index():
+    import build_pdf_search_index
+    return build_pdf_search_index.main([])
+
+def run_artifacts(compress: bool = True):
+    import artifacts
+    return artifacts.main([] if compress else ["--no-compress"])
+
+def run_thumbs():
+    import generate_pdf_thumbs
+    return generate_pdf_thumbs.main([])
+
+def run_books():
+    import generate_books
+    return generate_books.main([])
+
+STAGES = {
+    "catalog": run_catalog,
+    "search_index": run_search_index,
+    "pdf_index": run_pdf_index,
+    "artifacts": run_artifacts,
+    "thumbs": run_thumbs,
+    "books": run_books,
+}
+
+# Cheap staleness checks (hashes and sidecar caches only; no python-docx or PyMuPDF)
+def check_catalog():
+    import update_from_docx
+    return update_from_docx.stale_reasons()
+
+def check_search_index():
+    import search_index
+    return search_index.stale_reasons()
+
+def check_pdf_index():
+    import build_pdf_search_index
+    return build_pdf_search_index.stale_reasons()
+
+def check_artifacts():
+    import artifacts
+    return artifacts.stale_reasons()
+
+def check_thumbs():
+    import generate_pdf_thumbs
+    return generate_pdf_thumbs.stale_reasons()
+
+def check_books():
+    import generate_books
+    return generate_books.stale_reasons()
+
+STALE_CHECKS = {
+    "catalog": check_catalog,
+    "search_index": check_search_index,
+    "pdf_index": check_pdf_index,
+    "artifacts": check_artifacts,
+    "thumbs": check_thumbs,
+    "books": check_books,
+}
+
+def run_stage(stage: str, compress: bool = True) -> bool:
+    """Run one stage; a failure (exit code, SystemExit or exception) is reported and returns False.
+
+    ``compress=False`` (the watch loop only) skips the .gz/.br copies in the artifacts stage.
+    """
+    try:
+        code = STAGES[stage](compress) if stage == "artifacts" else STAGES[stage]()
+    except SystemExit as exc:
+        code = exc.code
+    except Exception:
+        traceback.print_exc()
+        code = 1
+    return code in (None, 0)
+
+def run_stages(stages, compress: bool = True) -> bool:
+    """Run the stages in order; returns False if any of them failed."""
+    ok = True
+    for stage in stages:
+        start = time.perf_counter()
+        stage_ok = run_stage(stage, compress)
+        elapsed = time.perf_counter() - start
+        if not stage_ok:
+            ok = False
+            print(f"[watch] {stage} failed ({elapsed:.2f}s)", file=sys.stderr)
+        else:
+            print(f"[watch] {stage} done ({elapsed:.2f}s)")
+    return ok
+
+# ---------- watchers ----------
+
+class PollingWatcher:
+    """Compares (mtime, size) of the watched files every ``interval`` seconds."""
+
+    name = "polling"
+
+    def __init__(self, roots=WATCH_ROOTS, interval: float = POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict:
+        files = {}
+        for directory, recursive in self.roots:
+            if not directory.is_dir():
+                continue
+            for path in (directory.rglob("*") if recursive else directory.iterdir()):
+                if is_watched(path):
+                    try:
+                        st = path.stat()
+                    except OSError:  # removed while scanning
+                        continue
+                    files[path] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def wait(self, timeout=None) -> list:
+        """Changed paths, or [] once ``timeout`` seconds pass without a change."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+            current = self.scan()
+            changed = [p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)]
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Linux inotify through ctypes; no third-party dependency.
+
+    A root that does not exist (yet) is anchored on its nearest existing ancestor
+    and watched as soon as it is created; a deleted root goes back to that state.
+    """
+
+    name = "inotify"
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots=WATCH_ROOTS):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # watch descriptor -> (directory, recursive)
+        self.anchors = {}  # watch descriptor -> existing ancestor of a missing root
+        self.roots = roots
+        for directory, recursive in roots:
+            if directory.is_dir():
+                self.watch_tree(directory, recursive)
+        self.watch_missing()
+
+    def watch(self, directory: Path, recursive: bool) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.dirs[wd] = (directory, recursive)
+
+    def watch_tree(self, directory: Path, recursive: bool) -> list:
+        """Watch ``directory`` (and its subdirectories); returns the files already inside."""
+        if any(_under(directory, d) for d in IGNORED_DIRS):
+            return []
+        self.watch(directory, recursive)
+        found = []
+        if recursive:
+            for path in directory.iterdir():
+                if path.is_dir():
+                    found += self.watch_tree(path, True)
+                elif is_watched(path):
+                    found.append(path)
+        return found
+
+    def watch_missing(self) -> list:
+        """Watch the roots that appeared and anchor the ones still missing; returns the files found in new roots."""
+        watched = {directory for directory, _ in self.dirs.values()}
+        found, anchors = [], set()
+        for directory, recursive in self.roots:
+            if directory in watched:
+                continue
+            if directory.is_dir():
+                found += self.watch_tree(directory, recursive)
+                if not recursive:
+                    found += [path for path in directory.iterdir() if is_watched(path)]
+                continue
+            ancestor = directory.parent
+            while not ancestor.is_dir() and ancestor != ancestor.parent:
+                ancestor = ancestor.parent
+            anchors.add(ancestor)
+        for wd, ancestor in list(self.anchors.items()):
+            if ancestor not in anchors:
+                del self.anchors[wd]
+                if wd not in self.dirs:  # the same directory may also be a watched root
+                    self._rm_watch(self.fd, wd)
+        for ancestor in anchors - set(self.anchors.values()):
+            wd = self._add_watch(self.fd, os.fsencode(ancestor), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {ancestor}")
+            self.anchors[wd] = ancestor
+        return found
+
+    def wait(self, timeout=None) -> list:
+        """Changed paths, or [] once ``timeout`` seconds pass without an event."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        changed = []
+        try:
+            buf = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        offset = 0
+        rescan = False  # a missing root may have appeared, or a root was removed
+        while offset < len(buf):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(buf, offset)
+            name = os.fsdecode(buf[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0"))
+            offset += self._EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were dropped; treat every watched file as changed
+                changed += PollingWatcher(self.roots).snapshot.keys()
+                rescan = True
+                continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                self.anchors.pop(wd, None)
+                rescan = True
+                continue
+            if mask & self.IN_MOVE_SELF and wd in self.dirs:
+                # The watch would follow the directory to its new name; drop it (a root gets re-anchored)
+                self.dirs.pop(wd)
+                if wd not in self.anchors:
+                    self._rm_watch(self.fd, wd)
+                rescan = True
+                continue
+            if wd in self.anchors:
+                rescan = True
+            directory, recursive = self.dirs.get(wd, (None, False))
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & self.IN_ISDIR:
+                if recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO) and path.is_dir():
+                    changed += self.watch_tree(path, True)
+                continue
+            if mask & self.IN_CREATE:
+                continue  # the content arrives with IN_CLOSE_WRITE
+            changed.append(path)
+        if rescan:
+            changed += self.watch_missing()
+        return [path for path in changed if is_watched(path)]
+
+    def close(self):
+        os.close(self.fd)
+
+def make_watcher(poll: bool, interval: float):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as exc:
+            print(f"[watch] inotify unavailable ({exc}); falling back to polling", file=sys.stderr)
+    return PollingWatcher(interval=interval)
+
+def report_rebuild(pending, stages) -> None:
+    names = ", ".join(sorted(p.name for p in pending))
+    print(f"[watch] changed: {names} -> {', '.join(stages)}")
+    start = time.perf_counter()
+    run_stages(stages, compress=False)
+    print(f"[watch] rebuilt in {time.perf_counter() - start:.2f}s")
+
+def watch(watcher, debounce: float, rebuild=report_rebuild) -> None:
+    """Debounce the watcher's changes and call ``rebuild(changed paths, stages)`` for each batch."""
+    pending = set()
+    while True:
+        changed = watcher.wait(debounce if pending else None)
+        if changed:
+            pending.update(changed)
+            continue
+        stages = plan_stages(pending)
+        if stages:
+            rebuild(sorted(pending), stages)
+        pending.clear()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the data outputs affected by DOCX/PDF changes as they happen")
+    parser.add_argument("--poll", action="store_true", help="Poll file mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, help="Quiet period before rebuilding, in seconds")
+    parser.add_argument("--initial", action="store_true", help="Run every stage once before watching")
+    args = parser.parse_args(argv)
+
+    if args.initial:
+        run_stages(STAGE_ORDER)
+    watcher = make_watcher(args.poll, args.interval)
+    print(f"[watch] watching {', '.join(root_names())} ({watcher.name}); Ctrl+C to stop")
+    missing = root_names(present=False)
+    if missing:
+        print(f"[watch] waiting for {', '.join(missing)} to be created")
+    try:
+        watch(watcher, args.debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+if __name__ == "__main__":
+    main()
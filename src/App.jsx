@@ -99,6 +99,29 @@ const formatModelLabel = (name) => {
 // Arabic-insensitive normalization for search
 const normalizeAr = (s) => stripTashkeel((s || "").toString()).toLowerCase();
 const tokenize = (s) => normalizeAr(s).trim().split(/\s+/).filter(Boolean);
+
+// فهرس البحث المبني مسبقاً (pytoncode/search_index.py): كل مقطع من كلمات العنوان
+// والتصنيف → أرقام البوتات. يعيد مجموعة مرشحين تحوي كل ما يطابقه الفلتر، أو null
+// إن لم يضيّق أي رمز البحث (الفلتر الأصلي يبقى هو الحكم في الحالتين).
+const searchCandidates = (lookup, tokens) => {
+  if (!lookup) return null;
+  const { index, botsByDoc } = lookup;
+  let result = null;
+  for (const tok of tokens) {
+    const term = normalizeAr(tok);
+    if (term.length < index.minPrefix) continue;
+    const ids = Object.prototype.hasOwnProperty.call(index.terms, term)
+      ? index.terms[term]
+      : [];
+    const next = new Set();
+    for (const id of ids) {
+      const bot = botsByDoc[id];
+      if (bot && (!result || result.has(bot))) next.add(bot);
+    }
+    result = next;
+  }
+  return result;
+};
 const getPkgOrder = (name) => {
   const n = stripTashkeel(norm(name));
   if (PACKAGE_ORDER_INDEX.has(n)) return PACKAGE_ORDER_INDEX.get(n);
@@ -124,6 +147,7 @@ const PACKAGE_PDF_LOOKUP = buildPdfLookup(packagePdfEntries);
 const PACKAGE_PDF_MANIFEST_LOOKUP = buildPdfLookup(packagePdfManifestEntries);
 
 // إعادة استخدام نفس الدالة
+// يحفظ المدخل كاملاً (file مع thumb/thumbWidth/thumbHeight/pages من generate_pdf_thumbs.py)
 function buildPdfLookup(entries) {
   const direct = new Map();
   const normalized = new Map();
@@ -131,14 +155,15 @@ function buildPdfLookup(entries) {
     const rawTitle = sanitizeText(entry?.title, 200);
     const file = (entry?.file ?? "").toString().trim();
     if (!rawTitle || !file) continue;
-    direct.set(rawTitle, file);
+    const item = { ...entry, file };
+    direct.set(rawTitle, item);
     const normalizedKey = normalizeKeyName(rawTitle);
-    if (normalizedKey) normalized.set(normalizedKey, file);
+    if (normalizedKey) normalized.set(normalizedKey, item);
   }
   return { direct, normalized };
 }
 
-function getPdfFile(packageName, lookup = PACKAGE_PDF_LOOKUP) {
+function getPdfEntry(packageName, lookup = PACKAGE_PDF_LOOKUP) {
   if (!packageName) return null;
   if (lookup.direct.has(packageName)) return lookup.direct.get(packageName);
   const normalizedKey = normalizeKeyName(packageName);
@@ -146,6 +171,10 @@ function getPdfFile(packageName, lookup = PACKAGE_PDF_LOOKUP) {
   return lookup.normalized.get(normalizedKey) || null;
 }
 
+function getPdfFile(packageName, lookup = PACKAGE_PDF_LOOKUP) {
+  return getPdfEntry(packageName, lookup)?.file || null;
+}
+
 function getPdfUrl(packageName, lookup = PACKAGE_PDF_LOOKUP) {
   const file = getPdfFile(packageName, lookup);
   if (!file) return null;
@@ -545,6 +574,7 @@ export default function App() {
   const [selectedIndex, setSelectedIndex] = useState(0);
   const [progress, setProgress] = useState(0);
   const [bots, setBots] = useState(BOTS);
+  const [searchIndex, setSearchIndex] = useState(null);
   const [botModal, setBotModal] = useState(null); // { type, bot }
 
   // تم إزالة مكونات المفضلة والوسوم من الواجهة
@@ -617,8 +647,27 @@ export default function App() {
     let isMounted = true;
     (async () => {
       try {
-        const res = await fetch(resolvePublicPath("new_bots.json"), {
-          cache: "no-store",
+        // البيان صغير ويُجلب دائماً؛ الملف المجزّأ ثابت الاسم ويُخزَّن في المتصفح
+        let dataPath = "new_bots.json";
+        let dataCache = "no-store";
+        // الفهرس يُستعمل فقط إن جاء من نفس البيان، أي مبنياً من نفس الكتالوج
+        let indexPath = null;
+        try {
+          const manifestRes = await fetch(
+            resolvePublicPath("data/manifest.json"),
+            { cache: "no-store" },
+          );
+          if (manifestRes.ok) {
+            const manifest = await manifestRes.json();
+            if (manifest?.new_bots?.file) {
+              dataPath = manifest.new_bots.file;
+              dataCache = "default";
+              indexPath = manifest?.search_index?.file || null;
+            }
+          }
+        } catch {}
+        const res = await fetch(resolvePublicPath(dataPath), {
+          cache: dataCache,
         });
         if (!res.ok) throw new Error(`HTTP ${res.status}`);
         const data = await res.json();
@@ -648,7 +697,7 @@ export default function App() {
           return total > 1 ? `رابط ${index + 1}` : "رابط";
         };
 
-        Object.entries(packages).forEach(([packageRaw, categoriesObj]) => {
+        Object.entries(packages).forEach(([packageRaw, categoriesObj], p) => {
           if (!categoriesObj || typeof categoriesObj !== "object") return;
           const packageLines = (packageRaw ?? "")
             .toString()
@@ -663,7 +712,7 @@ export default function App() {
           );
           const packageName = packageTitle;
 
-          Object.entries(categoriesObj).forEach(([categoryRaw, botsArr]) => {
+          Object.entries(categoriesObj).forEach(([categoryRaw, botsArr], c) => {
             const category =
               sanitizeText(categoryRaw ?? "", 160) || "غير مصنّف";
             if (!Array.isArray(botsArr)) return;
@@ -737,6 +786,8 @@ export default function App() {
                 badge: "",
                 score: 0,
                 date: 0,
+                // [الباقة، التصنيف، البوت] كما في docs داخل search_index.json
+                docKey: `${p}:${c}:${i}`,
               });
             }
           });
@@ -744,6 +795,22 @@ export default function App() {
 
         const normalized = flat.length ? flat : BOTS;
         if (isMounted) setBots(normalized);
+
+        if (indexPath && flat.length) {
+          try {
+            const indexRes = await fetch(resolvePublicPath(indexPath));
+            const index = indexRes.ok ? await indexRes.json() : null;
+            if (index?.terms && Array.isArray(index.docs) && isMounted) {
+              const byKey = new Map(flat.map((b) => [b.docKey, b]));
+              const botsByDoc = index.docs.map(
+                (doc) => byKey.get(doc.join(":")) || null,
+              );
+              setSearchIndex({ index, botsByDoc });
+            }
+          } catch {
+            // بدون الفهرس يبقى البحث مسحاً كاملاً كما كان
+          }
+        }
       } catch (err) {
         console.error("Failed to load new_bots.json:", err);
         // نبقي على الاحتياطي BOTS إذا فشل التحميل
@@ -809,7 +876,9 @@ export default function App() {
     const tokens = tokenize(q);
     let base = bots;
     if (tokens.length) {
+      const candidates = searchCandidates(searchIndex, tokens);
       base = base.filter((b) => {
+        if (candidates && !candidates.has(b)) return false;
         const title = normalizeAr(b.title);
         const catL = normalizeAr(b.category || "");
         return tokens.every((tok) => title.includes(tok) || catL.includes(tok));
@@ -820,7 +889,7 @@ export default function App() {
       counts.set(c, (counts.get(c) || 0) + 1);
     }
     return counts;
-  }, [bots, q]);
+  }, [bots, q, searchIndex]);
 
   // تأكيد صلاحية الفلتر الحالي عند تغيّر الشرائح
   useEffect(() => {
@@ -897,7 +966,9 @@ export default function App() {
     const tokens = q.trim().toLowerCase().split(/\s+/).filter(Boolean);
     let rows = bots.filter((b) => (cat === "الكل" ? true : b.category === cat));
     if (tokens.length) {
+      const candidates = searchCandidates(searchIndex, tokens);
       rows = rows.filter((b) => {
+        if (candidates && !candidates.has(b)) return false;
         const title = b.title.toLowerCase();
         const catL = (b.category || "").toLowerCase();
         return tokens.every((tok) => title.includes(tok) || catL.includes(tok));
@@ -907,7 +978,7 @@ export default function App() {
     if (sort === "new") rows.sort((a, b) => b.date - a.date);
     if (sort === "az") rows.sort((a, b) => a.title.localeCompare(b.title));
     return rows;
-  }, [q, cat, sort, bots]);
+  }, [q, cat, sort, bots, searchIndex]);
 
   // Titles list for datalist suggestions
   const botTitles = useMemo(() => {
@@ -1479,6 +1550,16 @@ export default function App() {
                   pkg.name,
                   PACKAGE_PDF_MANIFEST_LOOKUP,
                 );
+                // صورة الغلاف: من ملف الشرح الكامل، وإلا من النسخة المختصرة
+                const packageThumb = [
+                  [packagePdfUrl, getPdfEntry(pkg.name, PACKAGE_PDF_LOOKUP)],
+                  [
+                    packagePdfManifestUrl,
+                    getPdfEntry(pkg.name, PACKAGE_PDF_MANIFEST_LOOKUP),
+                  ],
+                ]
+                  .map(([url, entry]) => ({ url, entry }))
+                  .find(({ url, entry }) => url && entry?.thumb);
 
                 const botsCount =
                   pkg.cats?.reduce(
@@ -1689,6 +1770,35 @@ export default function App() {
                           transition={{ duration: 0.35, ease: "easeInOut" }}
                           className="overflow-hidden mt-3 space-y-5"
                         >
+                          {/* غلاف ملف الباقة: صورة مسبقة التوليد، والـ PDF لا يُحمَّل إلا عند النقر */}
+                          {packageThumb && (
+                            <a
+                              href={packageThumb.url}
+                              target="_blank"
+                              rel="noopener noreferrer"
+                              title={
+                                packageThumb.entry.pages
+                                  ? `عرض الملف (${packageThumb.entry.pages} صفحة)`
+                                  : "عرض الملف"
+                              }
+                              className="relative block w-28 md:w-36 overflow-hidden rounded-xl border border-white/10 bg-black/20 shadow hover:ring-2 hover:ring-emerald-400 transition"
+                            >
+                              <img
+                                src={resolvePublicPath(packageThumb.entry.thumb)}
+                                width={packageThumb.entry.thumbWidth}
+                                height={packageThumb.entry.thumbHeight}
+                                alt={`الصفحة الأولى من ملف ${pkg.name}`}
+                                loading="lazy"
+                                decoding="async"
+                                className="block h-auto w-full"
+                              />
+                              {packageThumb.entry.pages ? (
+                                <span className="absolute bottom-1 end-1 rounded-lg bg-black/60 px-2 py-0.5 text-[11px] text-white">
+                                  {packageThumb.entry.pages} صفحة
+                                </span>
+                              ) : null}
+                            </a>
+                          )}
                           {pkg.cats.map((cat, idx) => (
                             <div
                               key={`${pkg.name}-${cat.name}`}
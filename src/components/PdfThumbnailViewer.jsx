@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useState } from 'react';
 import { Worker, Viewer } from '@react-pdf-viewer/core';
 import { thumbnailPlugin } from '@react-pdf-viewer/thumbnail';
 
@@ -15,11 +15,28 @@ const pageThumbnailPlugin = ({ PageThumbnail }) => ({
     },
 });
 
-const PdfThumbnailViewer = ({ pdfUrl, width, height }) => {
+const PdfCoverViewer = ({ pdfUrl }) => {
     const thumbnailPluginInstance = thumbnailPlugin();
     const { Cover } = thumbnailPluginInstance;
     const pageThumbOnly = pageThumbnailPlugin({ PageThumbnail: <Cover getPageIndex={() => 0} /> });
 
+    return (
+        <Worker workerUrl="https://unpkg.com/pdfjs-dist@3.11.174/build/pdf.worker.min.js">
+            <Viewer fileUrl={pdfUrl} plugins={[thumbnailPluginInstance, pageThumbOnly]} />
+        </Worker>
+    );
+};
+
+// thumb/thumbWidth/thumbHeight/pages are the fields scripts/generate_pdf_thumbs.py writes
+// into src/data/packagePdfs*.json (thumb is relative to public/), so an entry can be spread
+// in directly. With a thumbnail, the PDF is only fetched on click.
+const BASE_URL = (import.meta && import.meta.env && import.meta.env.BASE_URL) || '/';
+const resolvePublicPath = (path) =>
+    `${BASE_URL.endsWith('/') ? BASE_URL : `${BASE_URL}/`}${(path || '').toString().replace(/^\/+/, '')}`;
+
+const PdfThumbnailViewer = ({ pdfUrl, thumb, thumbWidth, thumbHeight, pages, width, height }) => {
+    const [showPdf, setShowPdf] = useState(!thumb);
+
     const style = {
         width: width ? `${width}px` : '100%',
         height: height ? `${height}px` : '100%',
@@ -27,12 +44,47 @@ const PdfThumbnailViewer = ({ pdfUrl, width, height }) => {
         overflow: 'hidden',
     };
 
+    if (showPdf) {
+        return (
+            <div style={style}>
+                <PdfCoverViewer pdfUrl={pdfUrl} />
+            </div>
+        );
+    }
+
     return (
-        <div style={style}>
-            <Worker workerUrl="https://unpkg.com/pdfjs-dist@3.11.174/build/pdf.worker.min.js">
-                <Viewer fileUrl={pdfUrl} plugins={[thumbnailPluginInstance, pageThumbOnly]} />
-            </Worker>
-        </div>
+        <button
+            type="button"
+            onClick={() => setShowPdf(true)}
+            title={pages ? `عرض الملف (${pages} صفحة)` : 'عرض الملف'}
+            style={{ ...style, position: 'relative', display: 'block', padding: 0, background: 'none', cursor: 'pointer' }}
+        >
+            <img
+                src={resolvePublicPath(thumb)}
+                width={thumbWidth}
+                height={thumbHeight}
+                alt=""
+                loading="lazy"
+                decoding="async"
+                style={{ width: '100%', height: '100%', objectFit: 'contain' }}
+            />
+            {pages ? (
+                <span
+                    style={{
+                        position: 'absolute',
+                        bottom: 6,
+                        insetInlineEnd: 6,
+                        padding: '1px 8px',
+                        borderRadius: 8,
+                        fontSize: 12,
+                        color: '#fff',
+                        background: 'rgba(0,0,0,0.55)',
+                    }}
+                >
+                    {pages} صفحة
+                </span>
+            ) : null}
+        </button>
     );
 };
 